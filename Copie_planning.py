@@ -1,8 +1,12 @@
-import shutil
 import os
-from datetime import datetime
+from archive_planning import ArchivePlanning, publier
 
-def copier_fichier_ics():
+# False si le flux est servi par serveur_flux.py (ETag, 304, gzip) : plus de copie dans wwwroot,
+# le serveur recharge lui-même planning_fusion.ics quand il change.
+COPIE_WWWROOT = True
+
+def copier_fichier_ics(source=None):
+    # source : chemin du planning à publier (par défaut, planning_fusion.ics à côté du script)
     # Nom du fichier principal
     nom_fichier = "planning_fusion.ics"
 
@@ -16,7 +20,7 @@ def copier_fichier_ics():
     dossier_archive = os.path.join(dossier_source, "Archive_planning")
 
     # Chemins complets
-    source = os.path.join(dossier_source, nom_fichier)
+    source = source or os.path.join(dossier_source, nom_fichier)
     destination = os.path.join(dossier_destination, nom_fichier)
 
     try:
@@ -25,21 +29,22 @@ def copier_fichier_ics():
             print(f"❌ Le fichier {nom_fichier} est introuvable dans {dossier_source}")
             return
 
-        # --- 1️⃣ Copie principale vers wwwroot ---
-        shutil.copy2(source, destination)
-        print(f"✅ Fichier copié avec succès vers : {destination}")
-
-        # --- 2️⃣ Copie d'archive avec date et heure ---
-        # Crée le dossier d'archive s'il n'existe pas
-        os.makedirs(dossier_archive, exist_ok=True)
-
-        # Format de la date pour le nom du fichier
-        date_str = datetime.now().strftime("%Y-%m-%d_%H-%M")
-        nom_archive = f"planning_fusion_{date_str}.ics"
-        destination_archive = os.path.join(dossier_archive, nom_archive)
-
-        shutil.copy2(source, destination_archive)
-        print(f"📦 Copie d’archive créée : {destination_archive}")
+        # --- 1️⃣ Copie principale vers wwwroot (fichier temporaire puis renommage atomique) ---
+        if COPIE_WWWROOT:
+            publier(source, destination)
+            print(f"✅ Fichier copié avec succès vers : {destination}")
+        else:
+            print("✅ Flux servi par serveur_flux.py : pas de copie vers wwwroot")
+
+        # --- 2️⃣ Archive en deltas : seuls les VEVENT ajoutés / supprimés / modifiés sont stockés ---
+        entree, delta = ArchivePlanning(dossier_archive).archiver(source)
+        if delta is None:
+            print(f"📦 Version inchangée (v{entree['version']}) : seule l'entrée d'index est ajoutée")
+        elif entree["version"] == 0:
+            print(f"📦 Première version archivée ({entree['horodatage']})")
+        else:
+            print(f"📦 Version v{entree['version']} archivée : +{len(delta['ajoutes'])} "
+                  f"-{len(delta['supprimes'])} ~{len(delta['modifies'])} événements")
 
     except PermissionError:
         print("⚠️ Erreur : Permission refusée. Exécute le script en tant qu’administrateur.")
@@ -1,124 +1,99 @@
-import re
-import json
-from datetime import datetime, date, time, timedelta
-from icalendar import Calendar, Event, vText
-from pathlib import Path
+import mmap
+from datetime import datetime
 import os
 import pytz 
+from flux_ics import (iter_vevents_positions, evenement_depuis_octets, remplacer_propriete,
+                      remplacement_propriete, patcher_fichier)
+from historique_gele import SegmentsHistorique
+from modele_fusion import make_paris_aware
+from regles_groupes import charger_moteur
 
 # ==========================================
-# CONFIGURATION DES GROUPES
+# CONFIGURATION
 # ==========================================
 
-dates_groupe_A = [
-    "17/01/2034"
-]
-
-dates_groupe_B = [
-    "17/01/2034"
-]
-
-dates_groupe_online = [
-    "17/01/2034"  
-]
-
+# Les dates de chaque groupe (GrA, GrB, Online...) sont dans groupes_cours.json (regles_groupes.py)
 FILENAME = "planning_fusion.ics"
+DOSSIER_HISTORIQUE = "historique_fusion"  # segments gelés de la fusion (voir moteur_fusion.py)
 PARIS_TZ = pytz.timezone("Europe/Paris")
 
 # ==========================================
 # UTILITAIRES
 # ==========================================
 
-def get_event_datetime(event):
-    """Récupère la date de début normalisée en timezone Paris"""
-    dt = event.get('DTSTART').dt
-    
-    # Si c'est juste une date (pas d'heure), on la convertit
-    if not isinstance(dt, datetime):
-        return PARIS_TZ.localize(datetime.combine(dt, time(0, 0)))
-    
-    # Si c'est une datetime naive (sans timezone), on suppose Paris
-    if dt.tzinfo is None:
-        return PARIS_TZ.localize(dt)
-    
-    # Sinon on convertit vers Paris
-    return dt.astimezone(PARIS_TZ)
-
 def format_date_str(dt):
-    """Formate la date pour comparaison avec les listes (JJ/MM/AAAA)"""
+    """Formate la date pour l'affichage (JJ/MM/AAAA)"""
     return dt.strftime("%d/%m/%Y")
 
 # ==========================================
 # MAIN
 # ==========================================
 
+def nouveau_titre(component, now, moteur):
+    """Titre à donner à un cours futur d'après les règles de groupe, ou None."""
+    # 1. Cours visé par au moins une règle ? (évite de lire la date des autres)
+    if not moteur.peut_concerner(component.summary):
+        return None
+
+    # 2. Vérification temporelle (ne pas toucher au passé)
+    dt_start = make_paris_aware(component.dtstart)
+    if not isinstance(dt_start, datetime):  # journée entière : à partir de minuit
+        dt_start = make_paris_aware(datetime.combine(dt_start, datetime.min.time()))
+    if dt_start < now:
+        return None
+
+    # 3. Règles du jour (index par date) appliquées au titre
+    new_summary = moteur.nouveau_titre(component.summary, dt_start.date())
+    if new_summary is not None:
+        print(f"✅ Ajout {new_summary.rsplit(' ', 1)[-1]} pour le {format_date_str(dt_start)}")
+    return new_summary
+
+def etape_anglais(flux):
+    """Étape de transformation (voir transformations.py) : groupes sur le flux des cours futurs."""
+    moteur = charger_moteur()
+    now = datetime.now(PARIS_TZ)
+    compteur_modif = 0
+    if moteur.dernier_jour is not None and moteur.dernier_jour >= now.date():
+        for i, component in enumerate(flux.evenements):
+            new_summary = nouveau_titre(component, now, moteur)
+            if new_summary is not None:
+                # Seule la ligne SUMMARY est remplacée dans le texte de l'événement
+                flux.evenements[i] = evenement_depuis_octets(
+                    remplacer_propriete(component.brut, "SUMMARY", new_summary))
+                compteur_modif += 1
+    print(f"✅ {compteur_modif} cours d'anglais modifiés.")
+
 def main():
     if not os.path.exists(FILENAME):
         print(f"❌ Erreur : Le fichier {FILENAME} est introuvable.")
         return
 
-    print(f"Chargement de {FILENAME} avec la librairie 'icalendar'...")
-
-    # Lecture du fichier
-    with open(FILENAME, 'r', encoding='utf-8') as f:
-        cal = Calendar.from_ical(f.read())
-
+    moteur = charger_moteur()
     now = datetime.now(PARIS_TZ)
-    compteur_modif = 0
+    if moteur.dernier_jour is None or moteur.dernier_jour < now.date():
+        print("\nℹ️ Aucune date de groupe à venir : aucune modification n'était nécessaire.")
+        return
 
     print("Traitement des cours...")
-
-    # Parcours des composants du calendrier
-    for component in cal.walk():
-        if component.name == "VEVENT":
-            # 1. Vérification temporelle (ne pas toucher au passé)
-            dt_start = get_event_datetime(component)
-            if dt_start < now:
-                continue
-
-            # 2. Récupération du titre
-            summary = str(component.get('SUMMARY', '')).strip()
-
-            # 3. Vérifier si c'est le cours d'anglais
-            if summary == "TD ESGT Anglais":
-                date_str = format_date_str(dt_start)
-                new_summary = summary # Par défaut, ne change pas
-
-                # Logique Groupe A
-                if date_str in dates_groupe_A:
-                    if not summary.endswith("GrA"):
-                        new_summary = f"{summary} GrA"
-                        print(f"✅ Ajout GrA pour le {date_str}")
-                        compteur_modif += 1
-
-                # Logique Groupe B
-                elif date_str in dates_groupe_B:
-                    if not summary.endswith("GrB"):
-                        new_summary = f"{summary} GrB"
-                        print(f"✅ Ajout GrB pour le {date_str}")
-                        compteur_modif += 1
-
-                # Logique Online
-                elif date_str in dates_groupe_online:
-                    if not summary.endswith("Online"):
-                        new_summary = f"{summary} Online"
-                        print(f"✅ Ajout Online pour le {date_str}")
-                        compteur_modif += 1
-                
-                # Application de la modification
-                if new_summary != summary:
-                    # vText assure l'encodage correct pour le format ICS
-                    component['SUMMARY'] = vText(new_summary)
+    segments = SegmentsHistorique(os.path.join(os.path.dirname(FILENAME), DOSSIER_HISTORIQUE))
+    remplacements = []
+    with open(FILENAME, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Le passé gelé (en tête de fichier) est sauté : on va directement aux cours récents
+        debut = segments.debut_partie_recente(mm) or 0
+        for pos, fin, component in iter_vevents_positions(mm, debut, champs=("DTSTART", "SUMMARY")):
+            new_summary = nouveau_titre(component, now, moteur)
+            if new_summary is not None:
+                r_debut, r_fin, ligne = remplacement_propriete(mm[pos:fin], "SUMMARY", new_summary)
+                remplacements.append((pos + r_debut, pos + r_fin, ligne))
 
     # ==========================================
     # SAUVEGARDE
     # ==========================================
 
-    if compteur_modif > 0:
-        # On écrit en binaire ('wb') car cal.to_ical() retourne des bytes
-        with open(FILENAME, 'wb') as f:
-            f.write(cal.to_ical())
-        print(f"\n🎉 Terminé ! {compteur_modif} cours ont été modifiés.")
+    if remplacements:
+        # Seules les lignes SUMMARY concernées changent, le reste du fichier est recopié tel quel
+        octets = patcher_fichier(FILENAME, remplacements)
+        print(f"\n🎉 Terminé ! {len(remplacements)} cours ont été modifiés ({octets} octets écrits).")
         print(f"Le fichier {FILENAME} a été mis à jour proprement.")
     else:
         print("\nℹ️ Aucune modification n'était nécessaire.")
@@ -0,0 +1,145 @@
+"""
+appariement.py
+- Moteur d'appariement ADE <-> Hyperplanning utilisé par la fusion.
+- Les cours du JSON sont indexés par jour dans des tableaux triés (minutes de début) :
+  la recherche des candidats se fait par bisect, en O(log n).
+- Deux modes : "tolerance" (début et fin à ±TOLERANCE_MINUTES près) ou "chevauchement"
+  (meilleur recouvrement horaire sur la journée).
+- Les jeux de mots-clés des titres sont calculés une seule fois par cours JSON et par
+  événement ADE, et les compteurs de match / non-match sont tenus à jour.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+MODE_TOLERANCE = "tolerance"
+MODE_CHEVAUCHEMENT = "chevauchement"
+
+STOPWORDS = frozenset({"td", "tp", "cm", "tdc", "esgt", "de", "la", "et", "le", "cours", "groupe", "l1"})
+_MOTS = re.compile(r"[a-zà-ÿ0-9]+")
+
+
+def jetons(texte):
+    """Mots significatifs d'un titre (mêmes règles que l'ancien clean_tokens, voir bench_appariement.py)."""
+    return frozenset(t for t in _MOTS.findall((texte or "").strip().lower())
+                     if t not in STOPWORDS and len(t) > 1)
+
+
+class CoursJSON:
+    """Un cours Hyperplanning prêt pour l'appariement (jetons et prof normalisé précalculés)."""
+
+    __slots__ = ("idx", "entree", "jour", "debut", "fin", "jetons", "prof_norm")
+
+    def __init__(self, idx, entree, debut, fin, jour=None):
+        self.idx = idx
+        self.entree = entree
+        self.jour = jour  # date du cours (déjà lue), pour ne pas la reparser
+        self.debut = debut  # minutes depuis minuit
+        self.fin = fin
+        self.jetons = jetons(entree.get("cours"))
+        self.prof_norm = (entree.get("professeur") or "").strip().lower()
+
+
+class JourIndexe:
+    """Cours d'une journée triés par heure de début."""
+
+    __slots__ = ("debuts", "cours", "duree_max")
+
+    def __init__(self, cours):
+        cours.sort(key=lambda c: (c.debut, c.idx))
+        self.cours = cours
+        self.debuts = [c.debut for c in cours]
+        self.duree_max = max((c.fin - c.debut for c in cours), default=0)
+
+
+class IndexCours:
+    """Index des cours JSON par jour, interrogé par bisect."""
+
+    def __init__(self):
+        self.jours = {}
+
+    @classmethod
+    def construire(cls, cours):
+        """`cours` : itérable de (date, CoursJSON)."""
+        par_jour = {}
+        for d, c in cours:
+            par_jour.setdefault(d, []).append(c)
+        index = cls()
+        index.jours = {d: JourIndexe(liste) for d, liste in par_jour.items()}
+        return index
+
+    def candidats(self, jour, debut, fin, mode=MODE_TOLERANCE, tolerance=0):
+        """Cours du jour compatibles avec [debut, fin], du plus proche au moins proche."""
+        j = self.jours.get(jour)
+        if j is None:
+            return []
+
+        if mode == MODE_CHEVAUCHEMENT:
+            # Tout cours qui commence avant `fin` et finit après `debut`
+            lo = bisect_left(j.debuts, debut - j.duree_max)
+            hi = bisect_left(j.debuts, fin)
+            trouves = []
+            for c in j.cours[lo:hi]:
+                recouvrement = min(fin, c.fin) - max(debut, c.debut)
+                if recouvrement > 0:
+                    trouves.append((-recouvrement, c.idx, c))
+            trouves.sort(key=lambda t: (t[0], t[1]))
+            return [c for _, _, c in trouves]
+
+        lo = bisect_left(j.debuts, debut - tolerance)
+        hi = bisect_right(j.debuts, debut + tolerance)
+        trouves = [(abs(c.debut - debut) + abs(c.fin - fin), c.idx, c)
+                   for c in j.cours[lo:hi] if abs(c.fin - fin) <= tolerance]
+        trouves.sort(key=lambda t: (t[0], t[1]))
+        return [c for _, _, c in trouves]
+
+
+class Apparieur:
+    """Choisit le cours JSON correspondant à un événement ADE et compte les résultats."""
+
+    def __init__(self, index, mode=MODE_TOLERANCE, tolerance=0):
+        self.index = index
+        self.mode = mode
+        self.tolerance = tolerance
+        self.stats = {"match": 0, "sans_match": 0, "ecart_horaire": 0,
+                      "enseignement": 0, "matiere": 0, "prof": 0, "seul_candidat": 0}
+
+    def apparier(self, jour, debut, fin, summary, description):
+        """Renvoie le CoursJSON retenu pour l'événement ADE, ou None."""
+        candidates = self.index.candidats(jour, debut, fin, self.mode, self.tolerance)
+        choix, regle = None, None
+        if candidates:
+            summary_norm = (summary or "").strip().lower()
+            jetons_ade = None
+            desc_norm = None
+            for c in candidates:
+                if "enseignement esgt" in summary_norm:
+                    choix, regle = c, "enseignement"; break
+                if jetons_ade is None:
+                    jetons_ade = jetons(summary)
+                if jetons_ade & c.jetons:
+                    choix, regle = c, "matiere"; break
+                if c.prof_norm:
+                    if desc_norm is None:
+                        desc_norm = (description or "").strip().lower()
+                    if c.prof_norm in desc_norm:
+                        choix, regle = c, "prof"; break
+
+            if choix is None and len(candidates) == 1:
+                choix, regle = candidates[0], "seul_candidat"
+
+        if choix is None:
+            self.stats["sans_match"] += 1
+            return None
+        self.stats["match"] += 1
+        self.stats[regle] += 1
+        if choix.debut != debut or choix.fin != fin:
+            self.stats["ecart_horaire"] += 1
+        return choix
+
+    def rapport(self, orphelins):
+        s = self.stats
+        return (f"📊 Appariement ({self.mode}, ±{self.tolerance} min) : {s['match']} match, "
+                f"{s['sans_match']} sans match, {orphelins} orphelins JSON "
+                f"[enseignement {s['enseignement']}, matière {s['matiere']}, prof {s['prof']}, "
+                f"seul candidat {s['seul_candidat']}, dont {s['ecart_horaire']} avec écart horaire]")
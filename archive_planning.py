@@ -0,0 +1,294 @@
+"""
+archive_planning.py
+- Archive des plannings publiés, stockée en différences au niveau des VEVENT : chaque
+  nouvelle version n'enregistre que les UID ajoutés, supprimés et modifiés par rapport à la
+  précédente (versions/000042.delta.json.gz).
+- Toutes les INTERVALLE_IMAGES versions, une image complète est aussi écrite
+  (versions/000040.image.json.gz) : reconstruire une version ne lit qu'une image et
+  au plus INTERVALLE_IMAGES - 1 deltas.
+- Un petit index (index.jsonl, une ligne par publication) relie l'horodatage à la version :
+  une publication sans changement n'ajoute qu'une ligne. La taille de l'archive suit donc
+  le nombre de changements, pas le nombre de passages.
+- reconstruire(horodatage) rend le planning tel qu'il était publié à cet instant (octet pour
+  octet) ; changements(debut, fin) liste les UID touchés entre deux instants en ne lisant
+  que les deltas de l'intervalle.
+- publier : copie vers la destination par fichier temporaire + renommage atomique, le
+  serveur web ne voit jamais un fichier à moitié écrit.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+from bisect import bisect_right
+from datetime import datetime
+from difflib import SequenceMatcher
+
+from flux_ics import iter_vevents_positions
+
+NOM_INDEX = "index.jsonl"
+DOSSIER_VERSIONS = "versions"
+DOSSIER_OBJETS = "objets"  # ancien format (une copie compressée par contenu), migré au besoin
+INTERVALLE_IMAGES = 20  # une image complète toutes les N versions
+TAILLE_BLOC = 1 << 16
+
+
+def publier(source, destination):
+    """Copie `source` vers `destination` puis la remplace d'un coup (os.replace)."""
+    tmp = destination + ".tmp"
+    shutil.copy2(source, tmp)
+    os.replace(tmp, destination)
+
+
+# ---------------- INSTANTANÉS ----------------
+
+def _texte(octets):
+    return octets.decode("utf-8", "surrogateescape")
+
+
+def _octets(texte):
+    return texte.encode("utf-8", "surrogateescape")
+
+
+class Instantane:
+    """Un planning découpé : en-tête, VEVENT par clé (UID) dans l'ordre du fichier, pied."""
+
+    __slots__ = ("entete", "cles", "evenements", "pied")
+
+    def __init__(self, entete, cles, evenements, pied):
+        self.entete = entete  # str
+        self.cles = cles  # [clé] dans l'ordre du fichier
+        self.evenements = evenements  # {clé: texte du VEVENT (str)}
+        self.pied = pied
+
+    @classmethod
+    def depuis_octets(cls, contenu):
+        """
+        Découpe le contenu brut. Ce qui sépare deux VEVENT reste collé au précédent : le
+        fichier se recompose à l'identique. Les UID en double reçoivent un suffixe #n.
+        """
+        cles, evenements, vus = [], {}, {}
+        positions = [(pos, fin, ev.uid) for pos, fin, ev in iter_vevents_positions(contenu, 0, ("UID",))]
+        if not positions:
+            return cls(_texte(contenu), [], {}, "")
+        for i, (pos, fin, uid) in enumerate(positions):
+            suite = positions[i + 1][0] if i + 1 < len(positions) else fin
+            n = vus.get(uid, 0)
+            vus[uid] = n + 1
+            cle = uid if n == 0 else f"{uid}#{n}"
+            cles.append(cle)
+            evenements[cle] = _texte(contenu[pos:suite])
+        return cls(_texte(contenu[:positions[0][0]]), cles, evenements, _texte(contenu[positions[-1][1]:]))
+
+    def en_octets(self):
+        return _octets(self.entete + "".join(self.evenements[c] for c in self.cles) + self.pied)
+
+    def vers_dict(self):
+        return {"entete": self.entete, "cles": self.cles, "evenements": self.evenements, "pied": self.pied}
+
+    @classmethod
+    def depuis_dict(cls, d):
+        return cls(d["entete"], d["cles"], d["evenements"], d["pied"])
+
+    def difference(self, nouveau):
+        """Delta pour passer de cet instantané à `nouveau` (voir appliquer)."""
+        ancien_ensemble, nouvel_ensemble = set(self.cles), set(nouveau.cles)
+        delta = {
+            "ajoutes": {c: nouveau.evenements[c] for c in nouveau.cles if c not in ancien_ensemble},
+            "supprimes": [c for c in self.cles if c not in nouvel_ensemble],
+            "modifies": {c: nouveau.evenements[c] for c in nouveau.cles
+                         if c in ancien_ensemble and nouveau.evenements[c] != self.evenements[c]},
+            # Ordre : seulement les morceaux de la liste des clés qui changent [i1, i2, clés]
+            "ordre": [[i1, i2, nouveau.cles[j1:j2]] for op, i1, i2, j1, j2
+                      in SequenceMatcher(None, self.cles, nouveau.cles, autojunk=False).get_opcodes()
+                      if op != "equal"],
+        }
+        if nouveau.entete != self.entete: delta["entete"] = nouveau.entete
+        if nouveau.pied != self.pied: delta["pied"] = nouveau.pied
+        return delta
+
+    def appliquer(self, delta):
+        """Applique un delta (en place)."""
+        for c in delta["supprimes"]:
+            del self.evenements[c]
+        self.evenements.update(delta["ajoutes"])
+        self.evenements.update(delta["modifies"])
+        for i1, i2, cles in reversed(delta["ordre"]):
+            self.cles[i1:i2] = cles
+        self.entete = delta.get("entete", self.entete)
+        self.pied = delta.get("pied", self.pied)
+
+
+# ---------------- ARCHIVE ----------------
+
+def _ecrire_json_gz(chemin, donnees):
+    tmp = chemin + ".tmp"
+    with open(tmp, "wb") as brut:
+        with gzip.GzipFile(fileobj=brut, mode="wb", mtime=0) as gz:
+            gz.write(json.dumps(donnees, ensure_ascii=True).encode("ascii"))
+    os.replace(tmp, chemin)
+
+
+def _lire_json_gz(chemin):
+    with gzip.open(chemin, "rb") as f:
+        return json.loads(f.read())
+
+
+class ArchivePlanning:
+    """Versions en deltas + images périodiques, et index (horodatage -> version)."""
+
+    def __init__(self, dossier, intervalle_images=INTERVALLE_IMAGES):
+        self.dossier = dossier
+        self.intervalle_images = intervalle_images
+        self.index_path = os.path.join(dossier, NOM_INDEX)
+        self._entrees = None
+
+    def chemin_version(self, version, genre):
+        return os.path.join(self.dossier, DOSSIER_VERSIONS, f"{version:06d}.{genre}.json.gz")
+
+    def entrees(self):
+        """Publications archivées, de la plus ancienne à la plus récente."""
+        if self._entrees is None:
+            self._entrees = []
+            if os.path.exists(self.index_path):
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self._entrees = [json.loads(ligne) for ligne in f if ligne.strip()]
+            if self._entrees and "version" not in self._entrees[-1]:
+                self._migrer()
+        return self._entrees
+
+    def derniere_version(self):
+        entrees = self.entrees()
+        return entrees[-1]["version"] if entrees else None
+
+    # ---- lecture ----
+
+    def instantane(self, version):
+        """Reconstruit une version : l'image la plus proche en dessous, puis ses deltas."""
+        image = version - version % self.intervalle_images
+        etat = Instantane.depuis_dict(_lire_json_gz(self.chemin_version(image, "image")))
+        for v in range(image + 1, version + 1):
+            etat.appliquer(_lire_json_gz(self.chemin_version(v, "delta")))
+        return etat
+
+    def version_au(self, horodatage):
+        """Entrée d'index en vigueur à cet instant (dernière publication avant), ou None."""
+        entrees = self.entrees()
+        i = bisect_right([e["horodatage"] for e in entrees], horodatage.isoformat(timespec="seconds"))
+        return entrees[i - 1] if i else None
+
+    def reconstruire(self, horodatage):
+        """Planning (bytes) tel qu'il était publié à cet instant, ou None s'il n'y avait rien."""
+        entree = self.version_au(horodatage)
+        if entree is None:
+            return None
+        contenu = self.instantane(entree["version"]).en_octets()
+        if hashlib.sha256(contenu).hexdigest() != entree["empreinte"]:
+            raise ValueError(f"Archive incohérente : la version {entree['version']} ne correspond pas à son empreinte")
+        return contenu
+
+    def changements(self, debut, fin):
+        """
+        UID ajoutés, supprimés et modifiés entre les plannings publiés à `debut` et à `fin`,
+        en ne lisant que les deltas intermédiaires. Un UID supprimé puis recréé compte comme
+        modifié.
+        """
+        a, b = self.version_au(debut), self.version_au(fin)
+        va = -1 if a is None else a["version"]
+        vb = -1 if b is None else b["version"]
+        ajoutes, supprimes, modifies = set(), set(), set()
+        for v in range(va + 1, vb + 1):
+            if v == 0:
+                ajoutes.update(Instantane.depuis_dict(_lire_json_gz(self.chemin_version(0, "image"))).cles)
+                continue
+            delta = _lire_json_gz(self.chemin_version(v, "delta"))
+            for c in delta["supprimes"]:
+                if c in ajoutes:
+                    ajoutes.discard(c)
+                else:
+                    modifies.discard(c)
+                    supprimes.add(c)
+            for c in delta["ajoutes"]:
+                if c in supprimes:
+                    supprimes.discard(c)
+                    modifies.add(c)
+                else:
+                    ajoutes.add(c)
+            modifies.update(c for c in delta["modifies"] if c not in ajoutes)
+        return {"ajoutes": sorted(ajoutes), "supprimes": sorted(supprimes), "modifies": sorted(modifies)}
+
+    # ---- écriture ----
+
+    def _ajouter_entree(self, entree):
+        os.makedirs(self.dossier, exist_ok=True)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entree) + "\n")
+        self.entrees().append(entree)
+
+    def _enregistrer(self, contenu, horodatage):
+        """Archive un contenu. Renvoie (entrée d'index, delta ou None si rien n'a changé)."""
+        empreinte = hashlib.sha256(contenu).hexdigest()
+        entrees = self.entrees()
+        derniere = entrees[-1] if entrees else None
+        entree = {"horodatage": horodatage.isoformat(timespec="seconds"), "taille": len(contenu),
+                  "empreinte": empreinte}
+        if derniere is not None and derniere["empreinte"] == empreinte:
+            entree["version"] = derniere["version"]
+            self._ajouter_entree(entree)
+            return entree, None
+
+        nouveau = Instantane.depuis_octets(contenu)
+        version = 0 if derniere is None else derniere["version"] + 1
+        os.makedirs(os.path.join(self.dossier, DOSSIER_VERSIONS), exist_ok=True)
+        delta = {}
+        if version > 0:
+            delta = self.instantane(version - 1).difference(nouveau)
+            _ecrire_json_gz(self.chemin_version(version, "delta"), delta)
+        if version % self.intervalle_images == 0:
+            _ecrire_json_gz(self.chemin_version(version, "image"), nouveau.vers_dict())
+        entree["version"] = version
+        self._ajouter_entree(entree)
+        return entree, delta
+
+    def archiver(self, source, horodatage=None):
+        """
+        Archive le fichier `source`. Seules les différences avec la version précédente sont
+        écrites. Renvoie (entrée d'index, delta) ; delta vaut None si rien n'a changé.
+        """
+        with open(source, "rb") as f:
+            contenu = f.read()
+        return self._enregistrer(contenu, horodatage or datetime.now())
+
+    def _migrer(self):
+        """Convertit l'ancien format (copies compressées par empreinte) en versions."""
+        anciennes, self._entrees = self._entrees, []
+        os.replace(self.index_path, self.index_path + ".ancien")
+        for e in anciennes:
+            chemin = os.path.join(self.dossier, DOSSIER_OBJETS, e["empreinte"][:2], f"{e['empreinte']}.ics.gz")
+            with gzip.open(chemin, "rb") as f:
+                self._enregistrer(f.read(), datetime.fromisoformat(e["horodatage"]))
+        shutil.rmtree(os.path.join(self.dossier, DOSSIER_OBJETS), ignore_errors=True)
+        os.remove(self.index_path + ".ancien")
+        print(f"📦 Archive convertie en deltas ({len(anciennes)} publications)")
+
+
+if __name__ == "__main__":
+    # python archive_planning.py au 2026-10-01T08:00 > planning.ics
+    # python archive_planning.py changements 2026-10-01T08:00 2026-10-15T08:00
+    archive = ArchivePlanning(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Archive_planning"))
+    if len(sys.argv) == 3 and sys.argv[1] == "au":
+        contenu = archive.reconstruire(datetime.fromisoformat(sys.argv[2]))
+        if contenu is None:
+            print("ℹ️ Aucun planning publié à cette date.", file=sys.stderr)
+        else:
+            sys.stdout.buffer.write(contenu)
+    elif len(sys.argv) == 4 and sys.argv[1] == "changements":
+        diff = archive.changements(datetime.fromisoformat(sys.argv[2]), datetime.fromisoformat(sys.argv[3]))
+        for cle, icone in (("ajoutes", "➕"), ("supprimes", "➖"), ("modifies", "✏️")):
+            print(f"{icone} {len(diff[cle])} {cle}")
+            for uid in diff[cle]:
+                print(f"    {uid}")
+    else:
+        print("Usage : archive_planning.py au <horodatage> | changements <début> <fin>")
@@ -0,0 +1,123 @@
+"""
+bench_appariement.py
+- Compare l'ancien appariement (clé exacte + clean_tokens recalculé pour chaque candidat)
+  et le moteur d'appariement.py sur une année synthétique de cours.
+- Une partie des cours du JSON est décalée de quelques minutes par rapport à l'ADE, comme
+  on le voit parfois entre les deux plannings.
+Usage : python bench_appariement.py [nb_jours]
+"""
+
+import random
+import re
+import sys
+import time
+from datetime import date, timedelta
+
+from appariement import Apparieur, CoursJSON, IndexCours, MODE_TOLERANCE, MODE_CHEVAUCHEMENT
+from moteur_fusion import normalize_text
+
+MATIERES = ["Thermodynamique 1", "Statistiques Descriptives", "Mathématiques pour la physique",
+            "Algorithmique et programmation 2", "Géométrie 2", "Electronique 1", "Analyse",
+            "Mécanique 2", "Anglais", "Topographie", "Droit foncier"]
+CRENEAUX = [(8 * 60, 10 * 60), (10 * 60 + 15, 12 * 60 + 15), (13 * 60 + 30, 15 * 60 + 30),
+            (15 * 60 + 45, 17 * 60 + 45), (18 * 60, 19 * 60)]
+
+
+def generer(nb_jours, graine=42):
+    """Renvoie (evenements_ade, json_data) : ADE = [(jour, debut, fin, summary, description)]."""
+    rnd = random.Random(graine)
+    ade, js = [], []
+    debut_annee = date(2025, 9, 1)
+    for n in range(nb_jours):
+        jour = debut_annee + timedelta(days=n)
+        if jour.weekday() >= 5:
+            continue
+        for debut, fin in CRENEAUX:
+            matiere = rnd.choice(MATIERES)
+            prof = f"M. Prof{rnd.randint(1, 30)}"
+            ade.append((jour, debut, fin, f"TD ESGT {matiere}", f"L1 Prépa\n{prof}"))
+            if rnd.random() < 0.8:
+                decalage = rnd.choice([0, 0, 0, 5, -5])
+                d, f = debut + decalage, fin + decalage
+                js.append({"date": jour.isoformat(), "cours": matiere, "professeur": prof,
+                           "salle": "Salle C03", "horaire": f"de {d // 60}h{d % 60:02d} à {f // 60}h{f % 60:02d}",
+                           "_debut": d, "_fin": f})
+    return ade, js
+
+
+# ---------------- ANCIEN APPARIEMENT (référence) ----------------
+# Celui de fusion_planning-V2.py avant appariement.py, gardé ici pour comparer.
+
+def clean_tokens(text):
+    stopwords = {"td", "tp", "cm", "tdc", "esgt", "de", "la", "et", "le", "cours", "groupe", "l1"}
+    text = normalize_text(text)
+    tokens = re.findall(r"[a-zà-ÿ0-9]+", text)
+    return set(t for t in tokens if t not in stopwords and len(t) > 1)
+
+def subjects_match(title_ics, title_json):
+    s1 = clean_tokens(title_ics)
+    s2 = clean_tokens(title_json)
+    return len(s1.intersection(s2)) > 0
+
+
+def ancien_choix(ade, js):
+    """Indice du cours JSON retenu pour chaque événement ADE (ou None)."""
+    index = {}
+    for idx, j in enumerate(js):
+        key = (date.fromisoformat(j["date"]), j["_debut"] // 60, j["_debut"] % 60, j["_fin"] // 60, j["_fin"] % 60)
+        index.setdefault(key, []).append((idx, j))
+    choix = []
+    for jour, debut, fin, summary, desc in ade:
+        candidates = index.get((jour, debut // 60, debut % 60, fin // 60, fin % 60), [])
+        trouve = None
+        for idx, j in candidates:
+            if "enseignement esgt" in normalize_text(summary) or subjects_match(summary, j["cours"]) \
+                    or (j["professeur"] and normalize_text(j["professeur"]) in normalize_text(desc)):
+                trouve = idx; break
+        if trouve is None and len(candidates) == 1:
+            trouve = candidates[0][0]
+        choix.append(trouve)
+    return choix
+
+
+def ancien(ade, js):
+    return sum(c is not None for c in ancien_choix(ade, js))
+
+
+def construire_index(js):
+    return IndexCours.construire(
+        (date.fromisoformat(j["date"]), CoursJSON(idx, j, j["_debut"], j["_fin"])) for idx, j in enumerate(js))
+
+
+def nouveau(ade, index, mode, tolerance):
+    apparieur = Apparieur(index, mode, tolerance)
+    for jour, debut, fin, summary, desc in ade:
+        apparieur.apparier(jour, debut, fin, summary, desc)
+    return apparieur.stats["match"]
+
+
+def chrono(fonction, *args, repetitions=5):
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        resultat = fonction(*args)
+        meilleur = min(meilleur, time.perf_counter() - t0)
+    return meilleur, resultat
+
+
+if __name__ == "__main__":
+    nb_jours = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    ade, js = generer(nb_jours)
+    print(f"📅 {nb_jours} jours : {len(ade)} événements ADE, {len(js)} cours JSON")
+
+    duree, index = chrono(construire_index, js)
+    print(f"  construction de l'index  {duree * 1000:8.1f} ms (une fois par chargement du JSON)")
+
+    for nom, fonction, args in [
+        ("ancien (clé exacte)", ancien, (ade, js)),
+        ("index ±0 min", nouveau, (ade, index, MODE_TOLERANCE, 0)),
+        ("index ±5 min", nouveau, (ade, index, MODE_TOLERANCE, 5)),
+        ("index chevauchement", nouveau, (ade, index, MODE_CHEVAUCHEMENT, 0)),
+    ]:
+        duree, match = chrono(fonction, *args)
+        print(f"  {nom:<22} {duree * 1000:8.1f} ms  {match:6d} match / {len(ade)}")
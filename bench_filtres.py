@@ -0,0 +1,104 @@
+"""
+bench_filtres.py
+- Compare les anciens filtres de lignes (listes parcourues pour chaque ligne) et le moteur
+  compilé de filtres_texte.py, sur de grosses descriptions synthétiques.
+- Vérifie que les lignes gardées sont les mêmes.
+Usage : python bench_filtres.py [nb_lignes]
+"""
+
+import random
+import sys
+import time
+
+from filtres_texte import regles_description, regles_restaurant
+
+HEADERS_BLACKLIST = ["--- petit vaurouze", "--- kiosque", "sur place ou à emporter"]
+EXACT_LINES_BLACKLIST = {
+    "• pizza margherita", "• pizza 4 fromages", "• pizza poulet curry",
+    "• pizza kebab", "• pasta box", "• pasta box carbonara",
+    "• pasta box poulet curry", "• beignet", "• french touch burger boeuf",
+    "• tacos poulet curry", "• frites", "• menu non communiqué", "menu non communiqué"
+}
+VAUROUZE_GLOBAL_BANLIST = [
+    "pizza margherita", "pizza 4 fromages", "pizza poulet curry", "pizza kebab",
+    "pasta box", "pasta box carbonara", "pasta box poulet curry",
+    "beignet", "french touch burger boeuf", "tacos poulet curry", "frites",
+    "--- kiosque ou etage (à emporter ou sur place) ---",
+    "--- kiosque ou etage à emporter ou sur place ---",
+    "--- petit vaurouze rdc sur place ou à emporter ---"
+]
+BARTHOLDI_INFO_BANLIST = [
+    "--- information ---", "rappel :", "3 éléments (entrée +plat +dessert) et 1 morceau de pain",
+    "pas de pichet à disposition possibilité de prendre une gourde",
+    "nous n'acceptons pas la nourriture personnelle",
+    "moyen de paiement est votre compte izly", "merci de votre compréhension"
+]
+
+LIGNES = ["• Carottes râpées", "• Poulet rôti", "• Pizza margherita", "• Frites", "--- PLATS ---",
+          "--- KIOSQUE OU ETAGE À EMPORTER OU SUR PLACE ---", "--- PETIT VAUROUZE RDC SUR PLACE OU À EMPORTER ---",
+          "• Menu non communiqué", "L1 Prépa", "M. Dupont", "", "  • Yaourt nature  ",
+          "--- INFORMATION ---", "• Rappel : 3 éléments (entrée +plat +dessert) et 1 morceau de pain",
+          "• Merci de votre compréhension", "• Lasagnes bolognaise"]
+
+
+def ancien_description(text):
+    kept_lines = []
+    for line in text.splitlines():
+        original_line = line.strip()
+        lower_line = original_line.lower()
+        if not original_line: continue
+        is_header = False
+        for h in HEADERS_BLACKLIST:
+            if h in lower_line: is_header = True; break
+        if is_header: continue
+        if lower_line in EXACT_LINES_BLACKLIST: continue
+        kept_lines.append(original_line)
+    return "\n".join(kept_lines)
+
+
+def ancien_menu(raw_lines, nom, meal_type):
+    final_lines = []
+    stop_processing = False
+    for line in raw_lines:
+        line_lower = line.lower()
+        line_content = line.replace('•', '').strip().lower()
+        if "vaurouzé" in nom.lower():
+            if line_content in VAUROUZE_GLOBAL_BANLIST: continue
+            if "petit vaurouze" in line_lower: continue
+        if "vaurouzé" in nom.lower() and meal_type == "midi":
+            if "salle personnels administratifs" in line_lower: stop_processing = True
+        if stop_processing: break
+        if "bartholdi" in nom.lower():
+            if any(b in line_lower for b in BARTHOLDI_INFO_BANLIST): continue
+        final_lines.append(line)
+    return final_lines
+
+
+def chrono(fonction, *args, repetitions=5):
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        resultat = fonction(*args)
+        meilleur = min(meilleur, time.perf_counter() - t0)
+    return meilleur, resultat
+
+
+if __name__ == "__main__":
+    nb_lignes = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rnd = random.Random(42)
+    lignes = [rnd.choice(LIGNES) for _ in range(nb_lignes)]
+    texte = "\n".join(lignes)
+    print(f"📝 {nb_lignes} lignes")
+
+    regles = regles_description()
+    duree_a, res_a = chrono(ancien_description, texte)
+    duree_n, res_n = chrono(lambda t: "\n".join(regles.filtrer(t.splitlines())), texte)
+    print(f"  description ADE      ancien {duree_a * 1000:7.1f} ms  moteur {duree_n * 1000:7.1f} ms  "
+          f"(x{duree_a / duree_n:.1f})  {'identiques' if res_a == res_n else 'DIFFÉRENTS'}")
+
+    for nom, repas in [("Resto U' Vaurouzé", "soir"), ("Resto U' Bartholdi", "midi")]:
+        regles = regles_restaurant(nom, repas)
+        duree_a, res_a = chrono(ancien_menu, lignes, nom, repas)
+        duree_n, res_n = chrono(regles.filtrer, lignes)
+        print(f"  {nom + ' ' + repas:<22} ancien {duree_a * 1000:7.1f} ms  moteur {duree_n * 1000:7.1f} ms  "
+              f"(x{duree_a / duree_n:.1f})  {'identiques' if res_a == res_n else 'DIFFÉRENTS'}")
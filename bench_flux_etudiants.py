@@ -0,0 +1,110 @@
+"""
+bench_flux_etudiants.py
+- Génère les flux de N étudiants synthétiques (groupes, options masquées, restaurants tirés
+  au hasard) à partir d'une base, avec flux_etudiants.py.
+- Compare à l'approche « un passage complet par étudiant » (chaque événement de la base
+  relu et réécrit pour chaque étudiant) et vérifie que les flux sont identiques.
+- Affiche le temps et la mémoire par étudiant.
+Usage : python bench_flux_etudiants.py [nb_etudiants] [base.ics]
+"""
+
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from flux_etudiants import (BasePlanning, Etudiant, FICHIER_BASE, MARQUE_MENU, PARIS_TZ,
+                            ecrire_flux, generer_flux)
+from flux_ics import DEBUT_VEVENT, ecrire_ics, iter_vevents, remplacer_propriete
+from modele_fusion import make_paris_aware
+from regles_groupes import FORMAT_DATE
+
+
+def etudiants_synthetiques(base, nombre, rnd):
+    jours = sorted({j for j, indices in base.par_jour.items()
+                    if any("Anglais" in base.titres[i] for i in indices)})
+    titres = sorted(t for t in base.par_titre if not t.startswith(MARQUE_MENU))
+    restaurants = sorted(base.menus)
+    etudiants = []
+    for n in range(nombre):
+        dates = rnd.sample(jours, min(len(jours), rnd.randint(2, 8)))
+        moitie = len(dates) // 2
+        etudiants.append(Etudiant({
+            "id": f"etudiant-{n:04d}",
+            "groupes": [{"cours": "TD ESGT Anglais", "groupes": [
+                {"suffixe": rnd.choice(["GrA", "GrB"]), "dates": [j.strftime(FORMAT_DATE) for j in dates[:moitie]]},
+                {"suffixe": "Online", "dates": [j.strftime(FORMAT_DATE) for j in dates[moitie:]]}]}],
+            "masquer": ["^" + re.escape(t) + "$" for t in rnd.sample(titres, min(len(titres), rnd.randint(0, 2)))],
+            "restaurants": rnd.sample(restaurants, rnd.randint(1, len(restaurants))) if restaurants else None,
+        }))
+    return etudiants
+
+
+def passage_complet(chemin_base, etudiant, chemin, now):
+    """Référence : chaque événement de la base est relu et réécrit pour cet étudiant."""
+    evenements = []
+    for ev in iter_vevents(chemin_base, champs=("DTSTART", "SUMMARY", "LOCATION")):
+        titre = ev.summary.strip()
+        if any(re.search(m, titre) for m in etudiant.masquer):
+            continue
+        if titre.startswith(MARQUE_MENU):
+            if etudiant.restaurants is not None and not any(r in ev.location.lower() for r in etudiant.restaurants):
+                continue
+            evenements.append(ev.brut)
+            continue
+        debut = make_paris_aware(ev.dtstart)
+        if not isinstance(debut, datetime):
+            debut = make_paris_aware(datetime.combine(debut, datetime.min.time()))
+        nouveau = etudiant.groupes.nouveau_titre(titre, debut.date()) if debut >= now else None
+        evenements.append(remplacer_propriete(ev.brut, "SUMMARY", nouveau) if nouveau else ev.brut)
+    with open(chemin_base, "rb") as f:
+        contenu = f.read()
+    ecrire_ics(chemin, None, evenements, entete=contenu[:contenu.find(DEBUT_VEVENT)])
+
+
+if __name__ == "__main__":
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    chemin_base = sys.argv[2] if len(sys.argv) > 2 else FICHIER_BASE
+    now = datetime.now(PARIS_TZ)
+    rnd = random.Random(7)
+    dossier = tempfile.mkdtemp(prefix="flux_etudiants_")
+    try:
+        t0 = time.perf_counter()
+        base = BasePlanning(chemin_base, now)
+        t_base = time.perf_counter() - t0
+        etudiants = etudiants_synthetiques(base, nombre, rnd)
+        t0 = time.perf_counter()
+        stats = generer_flux(base, etudiants, os.path.join(dossier, "surcouches"))
+        t_flux = time.perf_counter() - t0
+        # Mémoire : pic au-dessus de la base, sur une seconde génération (mesure à part, tracemalloc ralentit)
+        tracemalloc.start()
+        generer_flux(base, etudiants, os.path.join(dossier, "memoire"))
+        pic = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        t0 = time.perf_counter()
+        generer_flux(base, etudiants, os.path.join(dossier, "surcouches"))
+        t_inchanges = time.perf_counter() - t0
+
+        os.makedirs(os.path.join(dossier, "complet"))
+        t0 = time.perf_counter()
+        for e in etudiants:
+            passage_complet(chemin_base, e, os.path.join(dossier, "complet", f"{e.id}.ics"), now)
+        t_complet = time.perf_counter() - t0
+
+        identiques = all(open(os.path.join(dossier, "surcouches", f"{e.id}.ics"), "rb").read()
+                         == open(os.path.join(dossier, "complet", f"{e.id}.ics"), "rb").read() for e in etudiants)
+        print(f"📅 Base : {len(base.positions)} événements ({len(base.contenu)} octets), indexée en {t_base * 1000:.1f} ms")
+        print(f"👥 {nombre} étudiants, {stats['evenements_changes'] / nombre:.1f} événements personnalisés en moyenne")
+        print(f"  surcouches      : {t_flux * 1000:7.1f} ms ({t_flux / nombre * 1000:.2f} ms/étudiant), "
+              f"pic mémoire {pic / 1024:.0f} Ko")
+        print(f"  déjà à jour     : {t_inchanges * 1000:7.1f} ms (aucun flux réécrit)")
+        print(f"  passage complet : {t_complet * 1000:7.1f} ms ({t_complet / nombre * 1000:.2f} ms/étudiant)  "
+              f"x{t_complet / t_flux:.1f}")
+        print(f"  flux {'identiques' if identiques else 'DIFFÉRENTS'}")
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
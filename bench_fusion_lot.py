@@ -0,0 +1,60 @@
+"""
+bench_fusion_lot.py
+- Construit une promo synthétique (N paires, quelques flux ADE partagés) à partir d'un
+  ADECal.ics et d'un JSON, puis lance fusion_lot.py avec 1, 2, ... processus (dossiers de
+  sortie neufs à chaque fois, sans état incrémental) et affiche l'accélération.
+- Compare aussi avec une lecture du flux ADE par paire (sans partage).
+Usage : python bench_fusion_lot.py [paires] [ADECal.ics] [edt.json]
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from modele_fusion import lire_ade
+from fusion_lot import executer_lot
+
+if __name__ == "__main__":
+    nb_paires = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    ade = sys.argv[2] if len(sys.argv) > 2 else "ADECal.ics"
+    edt = sys.argv[3] if len(sys.argv) > 3 else "edt_IG1_complet.json"
+    nb_ade = max(1, nb_paires // 8)
+    dossier = tempfile.mkdtemp(prefix="fusion_lot_")
+    try:
+        for a in range(nb_ade):
+            shutil.copy(ade, os.path.join(dossier, f"ade_{a}.ics"))
+        paires = []
+        for k in range(nb_paires):
+            shutil.copy(edt, os.path.join(dossier, f"classe_{k}.json"))
+            paires.append({"id": f"classe-{k:03d}", "ade": f"ade_{k % nb_ade}.ics", "json": f"classe_{k}.json"})
+
+        t0 = time.perf_counter()
+        for p in paires:
+            lire_ade(os.path.join(dossier, p["ade"]))
+        t_par_paire = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for a in range(nb_ade):
+            lire_ade(os.path.join(dossier, f"ade_{a}.ics"))
+        t_partage = time.perf_counter() - t0
+        print(f"📚 {nb_paires} paires, {nb_ade} flux ADE : lecture ADE {t_par_paire * 1000:.0f} ms par paire "
+              f"-> {t_partage * 1000:.0f} ms partagée")
+
+        processus = sorted({1, 2, os.cpu_count() or 1})
+        reference = None
+        for n in processus:
+            manifeste = os.path.join(dossier, f"lot_{n}.json")
+            with open(manifeste, "w", encoding="utf-8") as f:
+                json.dump({"dossier_sortie": f"fusions_{n}", "paires": paires}, f)
+            with contextlib.redirect_stdout(io.StringIO()):
+                resume = executer_lot(manifeste, n)
+            reference = reference or resume["duree_totale"]
+            print(f"  {n:2d} processus : {resume['duree_totale']:6.2f} s  x{reference / resume['duree_totale']:.2f}  "
+                  f"({resume['reussies']}/{resume['paires']} fusions)")
+        print(f"🖥️ {os.cpu_count()} cœur(s) disponible(s)")
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
@@ -0,0 +1,70 @@
+"""
+bench_menus.py
+- Compare l'ancienne extraction des menus (arbre complet html.parser + re-parsing du titre
+  de chaque catégorie) et extraction_menus.py sur les pages enregistrées de fixtures_crous/.
+- Vérifie que les deux donnent les mêmes menus et affiche le temps de parsing par page.
+Usage : python bench_menus.py [repetitions]
+"""
+
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from extraction_menus import PARSEUR, extraire, clean_text, parse_date
+
+DOSSIER_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures_crous")
+
+
+def ancien(contenu):
+    soup = BeautifulSoup(contenu, 'html.parser')
+    menus = []
+    for menu_div in soup.find_all('div', class_='menu'):
+        date_node = menu_div.find('time', class_='menu_date_title')
+        if not date_node: continue
+        current_date = parse_date(date_node.text)
+        if not current_date: continue
+        for meal in menu_div.find_all('div', class_='meal'):
+            title_node = meal.find('div', class_='meal_title')
+            if not title_node: continue
+            foodies = meal.find('ul', class_='meal_foodies')
+            if not foodies: continue
+            categories = []
+            for cat in foodies.find_all('li', recursive=False):
+                cat_title = ""
+                if cat.contents: cat_title = BeautifulSoup(str(cat.contents[0]), "html.parser").get_text().strip()
+                items = [it for it in (clean_text(item.text) for item in cat.find_all('li')) if it]
+                categories.append([cat_title, items])
+            menus.append({"date": current_date.strftime('%Y-%m-%d'),
+                          "repas": clean_text(title_node.text).lower(), "categories": categories})
+    return menus
+
+
+def nouveau(contenu):
+    return [m.vers_dict() for m in extraire(contenu)]
+
+
+def chrono(fonction, *args, repetitions=5):
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        resultat = fonction(*args)
+        meilleur = min(meilleur, time.perf_counter() - t0)
+    return meilleur, resultat
+
+
+if __name__ == "__main__":
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"🍽️ Parseur : {PARSEUR}")
+    for nom in sorted(os.listdir(DOSSIER_FIXTURES)):
+        if not nom.endswith(".html"):
+            continue
+        with open(os.path.join(DOSSIER_FIXTURES, nom), "rb") as f:
+            contenu = f.read()
+        duree_a, menus_a = chrono(ancien, contenu, repetitions=repetitions)
+        duree_n, menus_n = chrono(nouveau, contenu, repetitions=repetitions)
+        identique = "identiques" if menus_a == menus_n else "DIFFÉRENTS"
+        print(f"  {nom:<28} {len(contenu) // 1024:4d} Ko  ancien {duree_a * 1000:7.2f} ms  "
+              f"nouveau {duree_n * 1000:7.2f} ms  (x{duree_a / duree_n:.1f})  "
+              f"{len(menus_n)} repas {identique}")
@@ -0,0 +1,146 @@
+"""
+bench_modele_fusion.py
+- Génère une année synthétique (ADECal.ics + JSON Hyperplanning : cours en semaine,
+  vacances, descriptions ADE avec date d'export) et mesure la fusion dessus :
+    * chargement des sources : durée et mémoire gardée par le moteur, juste après le
+      chargement puis après une première fusion (ce qu'un démon garde entre deux passages) ;
+    * fusion complète (cache vide : chaque événement est sérialisé) ;
+    * fusion avec le cache plein (coût de la fusion elle-même, sans to_ical) ;
+    * pic mémoire pendant la fusion.
+Usage : python bench_modele_fusion.py [cours_par_jour]
+"""
+
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import pytz
+
+from cache_ics import CacheICS
+from moteur_fusion import MoteurFusion
+
+PARIS_TZ = pytz.timezone("Europe/Paris")
+DEBUT_ANNEE = date(2026, 9, 1)
+MATIERES = ["Statistiques Descriptives", "Anglais", "Analyse", "Algèbre", "Topographie",
+            "Géodésie", "Droit Foncier", "Informatique", "Physique", "Urbanisme"]
+SALLES = [f"Salle C{n:02d}" for n in range(1, 15)]
+PROFS = [f"M. Prof{n}" for n in range(25)]
+CRENEAUX = [(8, 0, 10, 0), (10, 15, 12, 15), (13, 30, 15, 30), (15, 45, 17, 45), (18, 0, 19, 0)]
+
+
+def annee_synthetique(dossier, cours_par_jour, rnd):
+    lignes = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//ADE//FR"]
+    entrees = []
+    n = 0
+    vacances = {DEBUT_ANNEE + timedelta(days=d) for d in list(range(50, 59)) + list(range(112, 126))}
+    for d in range(365):
+        jour = DEBUT_ANNEE + timedelta(days=d)
+        if jour in vacances:
+            n += 1
+            lignes += ["BEGIN:VEVENT", f"UID:ADE{n}", "SUMMARY:Vacances", f"DTSTART;VALUE=DATE:{jour:%Y%m%d}",
+                       f"DTEND;VALUE=DATE:{jour + timedelta(days=1):%Y%m%d}", "END:VEVENT"]
+            continue
+        if jour.weekday() >= 5:
+            continue
+        for h1, m1, h2, m2 in rnd.sample(CRENEAUX, min(cours_par_jour, len(CRENEAUX))):
+            n += 1
+            matiere, prof, salle = rnd.choice(MATIERES), rnd.choice(PROFS), rnd.choice(SALLES)
+            debut = PARIS_TZ.localize(datetime.combine(jour, datetime.min.time().replace(hour=h1, minute=m1)))
+            fin = PARIS_TZ.localize(datetime.combine(jour, datetime.min.time().replace(hour=h2, minute=m2)))
+            description = (f"\\nL1 Prépa\\n{prof}\\n--- KIOSQUE OU ETAGE À EMPORTER OU SUR PLACE ---\\n"
+                           f"• frites\\n• Carottes râpées\\n(Exporté le:01/09/2026 08:00)")
+            lignes += ["BEGIN:VEVENT", f"SUMMARY:TD ESGT {matiere}",
+                       f"DTSTART:{debut.astimezone(pytz.utc):%Y%m%dT%H%M%SZ}",
+                       f"DTEND:{fin.astimezone(pytz.utc):%Y%m%dT%H%M%SZ}", f"UID:ADE{n}",
+                       f"DESCRIPTION:{description}", "LOCATION:Salle X", "END:VEVENT"]
+            if rnd.random() < 0.85:
+                decale = rnd.random() < 0.1
+                entrees.append({"semaine": d // 7 + 1, "jour": "", "date": f"{jour:%Y-%m-%d}",
+                                "horaire": f"de {h1}h{m1:02d} à {h2}h{m2 + (5 if decale else 0):02d}",
+                                "cours": matiere, "professeur": prof, "salle": salle})
+        # Quelques cours uniquement dans le JSON (orphelins)
+        if rnd.random() < 0.2:
+            entrees.append({"semaine": d // 7 + 1, "jour": "", "date": f"{jour:%d/%m/%Y}",
+                            "horaire": "de 19h15 à 20h15", "cours": "Soutien", "professeur": "", "salle": "Amphi"})
+    lignes.append("END:VCALENDAR")
+    with open(os.path.join(dossier, "ADECal.ics"), "w", encoding="utf-8", newline="") as f:
+        f.write("\r\n".join(lignes) + "\r\n")
+    with open(os.path.join(dossier, "edt.json"), "w", encoding="utf-8") as f:
+        json.dump(entrees, f, ensure_ascii=False)
+    return n, len(entrees)
+
+
+def mesurer(fonction):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    resultat = fonction()
+    duree = time.perf_counter() - t0
+    courant, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultat, duree, courant, pic
+
+
+def chronometrer(fonction, fois=5):
+    """Meilleure durée sur `fois` exécutions, sans tracemalloc (qui ralentit beaucoup)."""
+    durees = []
+    for _ in range(fois):
+        t0 = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - t0)
+    return min(durees)
+
+
+if __name__ == "__main__":
+    cours_par_jour = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    dossier = tempfile.mkdtemp(prefix="modele_fusion_")
+    try:
+        nb_ade, nb_json = annee_synthetique(dossier, cours_par_jour, random.Random(3))
+        taille = os.path.getsize(os.path.join(dossier, "ADECal.ics"))
+        print(f"📅 Année synthétique : {nb_ade} événements ADE ({taille // 1024} Ko), {nb_json} cours JSON")
+
+        moteur = MoteurFusion(dossier=dossier, json_file="edt.json", incremental=False)
+        moteur.charger_etat()
+
+        def charger():
+            moteur.charger_ade()
+            moteur.charger_json()
+
+        def charger_et_fusionner():
+            charger()
+            moteur.fusionner(DEBUT_ANNEE)
+        _, _, mem_sources, _ = mesurer(charger)
+
+        def garde_apres_fusion():
+            charger_et_fusionner()
+            # Le cache de sérialisation n'est pas compté (le même quel que soit le modèle)
+            moteur.cache = CacheICS(os.path.join(dossier, "cache_vide.json.gz"))
+            gc.collect()
+        _, _, mem_apres, _ = mesurer(garde_apres_fusion)
+        t_ade = chronometrer(charger)
+        t_premiere = chronometrer(charger_et_fusionner)
+        print(f"  chargement         : {t_ade * 1000:7.1f} ms, {mem_sources / 1024:7.0f} Ko gardés en mémoire")
+        print(f"  chargement + 1re fusion (cache plein) : {t_premiere * 1000:7.1f} ms, "
+              f"{mem_apres / 1024:7.0f} Ko gardés en mémoire (hors cache)")
+
+        def fusion_froide():
+            moteur.cache = CacheICS(os.path.join(dossier, "cache_vide.json.gz"))
+            return moteur.fusionner(DEBUT_ANNEE)
+        (cours, _), _, _, pic = mesurer(fusion_froide)
+        t_froid = chronometrer(fusion_froide, 3)
+        t_chaud = chronometrer(lambda: moteur.fusionner(DEBUT_ANNEE))
+        print(f"  fusion (cache vide): {t_froid * 1000:7.1f} ms, pic {pic / 1024:7.0f} Ko, {len(cours)} événements")
+        print(f"  fusion (cache plein): {t_chaud * 1000:6.1f} ms")
+        # En cours d'année : la moitié des événements sont passés
+        mi_annee = DEBUT_ANNEE + timedelta(days=182)
+        t_mi = chronometrer(lambda: moteur.fusionner(mi_annee))
+        print(f"  fusion au {mi_annee:%d/%m} (cache plein): {t_mi * 1000:6.1f} ms")
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
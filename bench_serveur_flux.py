@@ -0,0 +1,78 @@
+"""
+bench_serveur_flux.py
+- Test de charge local de serveur_flux.py : des clients simulés interrogent le flux en
+  boucle, comme un agenda qui se synchronise (If-None-Match avec le dernier ETag reçu).
+- Au milieu du test, une nouvelle version est publiée : chaque client doit la recevoir
+  une fois (200) puis repasser en 304.
+- Affiche les requêtes par seconde, la part de 304 et les octets transférés, comparés à
+  un téléchargement complet à chaque interrogation (copie statique sans ETag).
+Usage : python bench_serveur_flux.py [clients] [secondes] [fichier.ics]
+"""
+
+import http.client
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from serveur_flux import CHEMIN_URL, FICHIER_PUBLIE, FluxCalendrier, creer_serveur
+
+
+def client(port, fin, compteurs, verrou, gzip_accepte=True):
+    connexion = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    etag = None
+    statuts, octets = Counter(), 0
+    while time.perf_counter() < fin:
+        entetes = {"Accept-Encoding": "gzip"} if gzip_accepte else {}
+        if etag:
+            entetes["If-None-Match"] = etag
+        connexion.request("GET", CHEMIN_URL, headers=entetes)
+        reponse = connexion.getresponse()
+        corps = reponse.read()
+        statuts[reponse.status] += 1
+        octets += len(corps)
+        if reponse.status == 200:
+            etag = reponse.getheader("ETag")
+    connexion.close()
+    with verrou:
+        compteurs["statuts"].update(statuts)
+        compteurs["octets"] += octets
+
+
+if __name__ == "__main__":
+    nb_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    duree = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    chemin = sys.argv[3] if len(sys.argv) > 3 else FICHIER_PUBLIE
+    with open(chemin, "rb") as f:
+        contenu = f.read()
+
+    flux = FluxCalendrier(chemin)
+    flux.publier(contenu)
+    serveur = creer_serveur(flux, hote="127.0.0.1", port=0, journaliser=False)
+    port = serveur.server_address[1]
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+
+    compteurs, verrou = {"statuts": Counter(), "octets": 0}, threading.Lock()
+    debut = time.perf_counter()
+    fin = debut + duree
+    threads = [threading.Thread(target=client, args=(port, fin, compteurs, verrou)) for _ in range(nb_clients)]
+    for t in threads:
+        t.start()
+    # Publication d'une nouvelle version à mi-parcours (remplacement à chaud)
+    time.sleep(duree / 2)
+    flux.publier(contenu.replace(b"END:VCALENDAR", b"X-PUBLIE-LE:" + str(time.time()).encode() + b"\r\nEND:VCALENDAR"))
+    for t in threads:
+        t.join()
+    ecoule = time.perf_counter() - debut
+    serveur.shutdown()
+
+    total = sum(compteurs["statuts"].values())
+    n304 = compteurs["statuts"][304]
+    n200 = compteurs["statuts"][200]
+    print(f"📅 {os.path.basename(chemin)} : {len(contenu)} octets, gzip {len(flux.version.gzip)} octets")
+    print(f"👥 {nb_clients} clients pendant {ecoule:.1f} s : {total} requêtes, {total / ecoule:.0f} req/s")
+    print(f"  200 : {n200} (attendu {2 * nb_clients} : 1re requête + nouvelle version)  304 : {n304} "
+          f"({100 * n304 / total:.1f} %)  autres : {total - n200 - n304}")
+    print(f"  octets transférés : {compteurs['octets']} (sans ETag ni gzip : {total * len(contenu)}, "
+          f"x{total * len(contenu) / max(compteurs['octets'], 1):.0f})")
@@ -0,0 +1,122 @@
+"""
+cache_ics.py
+- Cache des VEVENT déjà sérialisés, indexé par une empreinte des propriétés normalisées
+  (ou des entrées qui déterminent entièrement l'événement).
+- Sur un hit, on recopie les octets en cache ; seul un miss construit l'événement icalendar
+  et appelle to_ical().
+- Stocké sur disque en JSON compressé (gzip), taille bornée : les entrées les moins
+  récemment utilisées sont évincées.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from datetime import date, datetime
+
+from icalendar import Event
+
+TAILLE_MAX_CACHE = 8 * 1024 * 1024  # octets de texte ICS gardés au maximum
+VERSION_CACHE = 1
+
+
+def _normaliser(valeur):
+    if isinstance(valeur, datetime):
+        return f"{valeur.isoformat()}|{getattr(valeur.tzinfo, 'zone', '')}"
+    if isinstance(valeur, date):
+        return valeur.isoformat()
+    return str(valeur)
+
+
+def empreinte_proprietes(proprietes):
+    """Empreinte d'une liste [(nom, valeur)] de propriétés (l'ordre compte, comme pour Event.add)."""
+    h = hashlib.sha1()
+    for nom, valeur in proprietes:
+        h.update(f"{nom.upper()}\x1e{_normaliser(valeur)}\x1f".encode("utf-8"))
+    return h.hexdigest()
+
+
+class CacheICS:
+    """Texte ICS par empreinte, avec éviction LRU quand la taille dépasse `taille_max`."""
+
+    def __init__(self, chemin, taille_max=TAILLE_MAX_CACHE):
+        self.chemin = chemin
+        self.taille_max = taille_max
+        self.entrees = OrderedDict()  # empreinte -> bytes, du moins au plus récemment utilisé
+        self.taille = 0
+        self.modifie = False
+        self.stats = {"hits": 0, "misses": 0, "evinces": 0, "octets_serialises": 0}
+        self.charger()
+
+    def charger(self):
+        if not os.path.exists(self.chemin):
+            return
+        try:
+            with gzip.open(self.chemin, "rt", encoding="utf-8") as f:
+                contenu = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cache ICS illisible, il repart de zéro : {e}")
+            return
+        if contenu.get("version") != VERSION_CACHE:
+            return
+        for cle, ics in contenu.get("entrees", []):
+            brut = ics.encode("utf-8")
+            self.entrees[cle] = brut
+            self.taille += len(brut)
+
+    def sauver(self):
+        """Réécrit le fichier (remplacement atomique), seulement si le cache a changé."""
+        if not self.modifie:
+            return
+        dossier = os.path.dirname(self.chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        tmp = self.chemin + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump({"version": VERSION_CACHE,
+                       "entrees": [[cle, brut.decode("utf-8")] for cle, brut in self.entrees.items()]},
+                      f, ensure_ascii=False)
+        os.replace(tmp, self.chemin)
+        self.modifie = False
+
+    def serialiser(self, cle, construire):
+        """Texte ICS pour `cle` ; `construire()` (-> Event) n'est appelé que sur un miss."""
+        brut = self.entrees.get(cle)
+        if brut is not None:
+            self.entrees.move_to_end(cle)
+            self.stats["hits"] += 1
+            return brut
+
+        brut = construire().to_ical()
+        self.stats["misses"] += 1
+        self.stats["octets_serialises"] += len(brut)
+        self.entrees[cle] = brut
+        self.taille += len(brut)
+        self.modifie = True
+        while self.taille > self.taille_max and len(self.entrees) > 1:
+            _, ancien = self.entrees.popitem(last=False)
+            self.taille -= len(ancien)
+            self.stats["evinces"] += 1
+        return brut
+
+    def evenement(self, proprietes):
+        """Texte ICS d'un Event construit avec les propriétés [(nom, valeur)], dans cet ordre."""
+        def construire():
+            ev = Event()
+            for nom, valeur in proprietes:
+                ev.add(nom, valeur)
+            return ev
+        return self.serialiser(empreinte_proprietes(proprietes), construire)
+
+    def rapport(self, octets_ecrits=None):
+        s = self.stats
+        total = s["hits"] + s["misses"]
+        taux = s["hits"] / total if total else 0.0
+        ligne = (f"🗃️ Cache ICS : {s['hits']}/{total} hits ({taux:.0%}), "
+                 f"{s['octets_serialises']} octets sérialisés")
+        if octets_ecrits is not None:
+            ligne += f", {octets_ecrits} octets écrits"
+        if s["evinces"]:
+            ligne += f", {s['evinces']} entrées évincées"
+        return ligne
@@ -0,0 +1,92 @@
+"""
+cache_menus.py
+- Cache des pages des restaurants CROUS, indexé par URL.
+- Chaque page est stockée avec son ETag / Last-Modified, le hash de son contenu et les
+  menus déjà extraits (un enregistrement par jour et par repas) : une page inchangée
+  (304, ou même contenu) ne repasse pas par BeautifulSoup.
+- Expiration : une entrée trop vieille est re-téléchargée sans requête conditionnelle,
+  et les menus des jours passés sont retirés.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta
+
+# Au-delà, la page est re-téléchargée en entier (pas de requête conditionnelle)
+DUREE_VALIDITE = timedelta(days=7)
+# Version du format des menus extraits : à incrémenter si l'extraction change
+VERSION_EXTRACTION = 2
+
+
+def hash_contenu(contenu):
+    return hashlib.sha256(contenu).hexdigest()
+
+
+def charger_cache(chemin):
+    if not os.path.exists(chemin):
+        return {}
+    try:
+        with open(chemin, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Cache des menus illisible, on repart de zéro : {e}")
+        return {}
+
+
+def sauver_cache(cache, chemin):
+    """Écriture atomique (fichier temporaire puis remplacement)."""
+    dossier = os.path.dirname(chemin)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    tmp = chemin + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, chemin)
+
+
+def entree_valide(entree, maintenant=None):
+    """Vrai si l'entrée peut servir (format d'extraction à jour, pas trop vieille)."""
+    if not entree or entree.get("version") != VERSION_EXTRACTION:
+        return False
+    maintenant = maintenant or datetime.now()
+    telecharge_le = datetime.fromisoformat(entree["telecharge_le"])
+    return maintenant - telecharge_le <= DUREE_VALIDITE
+
+
+def entetes_conditionnels(entree):
+    entetes = {}
+    if entree.get("etag"):
+        entetes["If-None-Match"] = entree["etag"]
+    if entree.get("last_modified"):
+        entetes["If-Modified-Since"] = entree["last_modified"]
+    return entetes
+
+
+def nouvelle_entree(reponse, contenu, menus, maintenant=None):
+    maintenant = (maintenant or datetime.now()).isoformat(timespec="seconds")
+    return {
+        "version": VERSION_EXTRACTION,
+        "etag": reponse.headers.get("ETag"),
+        "last_modified": reponse.headers.get("Last-Modified"),
+        "sha256": hash_contenu(contenu),
+        "telecharge_le": maintenant,
+        "verifie_le": maintenant,
+        "menus": menus,
+    }
+
+
+def menus_a_venir(entree, aujourdhui=None):
+    """Menus de l'entrée dont la date n'est pas passée."""
+    aujourdhui = (aujourdhui or date.today()).isoformat()
+    return [m for m in entree.get("menus", []) if m["date"] >= aujourdhui]
+
+
+def purger(cache, aujourdhui=None):
+    """Retire les menus des jours passés ; renvoie le nombre de menus retirés."""
+    retires = 0
+    for entree in cache.values():
+        gardes = menus_a_venir(entree, aujourdhui)
+        retires += len(entree.get("menus", [])) - len(gardes)
+        entree["menus"] = gardes
+    return retires
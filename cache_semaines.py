@@ -0,0 +1,125 @@
+"""
+cache_semaines.py
+- Cache des semaines Hyperplanning, indexé par le lundi de chaque semaine.
+- Chaque semaine est stockée avec un hash de son contenu et la date du scraping.
+- Politique de rafraîchissement : la semaine courante et la suivante sont toujours
+  re-scrapées, les suivantes seulement si leur copie est plus vieille que TTL_SEMAINES.
+- Le JSON consommé par la fusion est reconstruit à partir des semaines en cache, sur la
+  fenêtre scrapée seulement (n_semaines à partir de la semaine courante) : une semaine
+  restée d'un passage plus long n'y figure plus et est retirée du cache.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta
+
+# Semaines toujours re-scrapées (0 = semaine courante, 1 = semaine suivante)
+SEMAINES_TOUJOURS_FRAICHES = 2
+# Durée de validité d'une semaine plus lointaine
+TTL_SEMAINES = timedelta(hours=24)
+# Les semaines passées depuis plus longtemps que ça sont retirées du cache
+CONSERVATION_PASSE = timedelta(weeks=4)
+
+
+def lundi(d):
+    return d - timedelta(days=d.weekday())
+
+
+def cle_semaine(dates_jours):
+    """Clé 'YYYY-MM-DD' du lundi de la semaine, à partir du dict {jour: date} lu sur la page."""
+    dates = sorted(v for v in dates_jours.values() if v)
+    if not dates:
+        return None
+    return lundi(datetime.strptime(dates[0], "%Y-%m-%d").date()).isoformat()
+
+
+def hash_cours(cours):
+    """Hash du contenu d'une semaine (le numéro de semaine relatif est ignoré)."""
+    normalise = [{k: v for k, v in c.items() if k != "semaine"} for c in cours]
+    normalise.sort(key=lambda c: json.dumps(c, sort_keys=True, ensure_ascii=False))
+    brut = json.dumps(normalise, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(brut).hexdigest()
+
+
+def charger_cache(chemin):
+    if not os.path.exists(chemin):
+        return {}
+    try:
+        with open(chemin, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Cache des semaines illisible, on repart de zéro : {e}")
+        return {}
+
+
+def sauver_cache(cache, chemin):
+    """Écriture atomique (fichier temporaire puis remplacement)."""
+    dossier = os.path.dirname(chemin)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    tmp = chemin + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, chemin)
+
+
+def doit_rescraper(cache, cle, aujourdhui=None, maintenant=None):
+    """Vrai si la semaine `cle` doit être re-scrapée selon la politique de rafraîchissement."""
+    aujourdhui = aujourdhui or date.today()
+    maintenant = maintenant or datetime.now()
+    entree = cache.get(cle)
+    if entree is None:
+        return True
+
+    rang = (date.fromisoformat(cle) - lundi(aujourdhui)).days // 7
+    if 0 <= rang < SEMAINES_TOUJOURS_FRAICHES:
+        return True
+    if rang < 0:
+        # Semaine passée : elle ne bougera plus
+        return False
+    return maintenant - datetime.fromisoformat(entree["scrape_le"]) > TTL_SEMAINES
+
+
+def enregistrer_semaine(cache, cle, cours, maintenant=None):
+    """Met à jour une semaine dans le cache. Renvoie True si son contenu a changé."""
+    maintenant = maintenant or datetime.now()
+    nouveau_hash = hash_cours(cours)
+    ancien = cache.get(cle)
+    change = ancien is None or ancien["hash"] != nouveau_hash
+    cache[cle] = {
+        "hash": nouveau_hash,
+        "scrape_le": maintenant.isoformat(timespec="seconds"),
+        "modifie_le": maintenant.isoformat(timespec="seconds") if change else ancien.get("modifie_le"),
+        "cours": cours,
+    }
+    return change
+
+
+def fin_fenetre(n_semaines, aujourdhui=None):
+    """Lundi qui suit la dernière semaine scrapée (None : pas de limite)."""
+    if n_semaines is None:
+        return None
+    return lundi(aujourdhui or date.today()) + timedelta(weeks=n_semaines)
+
+
+def purger(cache, aujourdhui=None, n_semaines=None):
+    """Retire les semaines trop anciennes et celles au-delà des `n_semaines` scrapées."""
+    limite = lundi(aujourdhui or date.today()) - CONSERVATION_PASSE
+    fin = fin_fenetre(n_semaines, aujourdhui)
+    for cle in [c for c in cache if date.fromisoformat(c) < limite
+                or (fin is not None and date.fromisoformat(c) >= fin)]:
+        del cache[cle]
+
+
+def reconstruire_edt(cache, aujourdhui=None, n_semaines=None):
+    """Liste de cours à plat (format edt_IG1_complet.json), de la semaine courante à la fin de la fenêtre."""
+    debut = lundi(aujourdhui or date.today())
+    fin = fin_fenetre(n_semaines, aujourdhui)
+    edt = []
+    semaines = sorted(c for c in cache if date.fromisoformat(c) >= debut
+                      and (fin is None or date.fromisoformat(c) < fin))
+    for num, cle in enumerate(semaines, start=1):
+        for c in cache[cle]["cours"]:
+            edt.append(dict(c, semaine=num))
+    return edt
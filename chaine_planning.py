@@ -0,0 +1,48 @@
+"""
+chaine_planning.py
+- Remplace l'enchaînement fusion -> menu_cantine.py -> anglais_planning.py -> Copie_planning.py,
+  où chaque script relisait et réécrivait planning_fusion.ics.
+- Ici la fusion produit le flux d'événements en mémoire, les menus et les groupes d'anglais
+  sont des étapes sur ce flux, le fichier est écrit une seule fois puis publié.
+- Chaque étape peut être désactivée ci-dessous ; sa durée est affichée à la fin.
+- Avec FLUX_ETUDIANTS_ACTIFS, un flux par étudiant est généré après l'écriture
+  (flux_etudiants.py) et l'étape anglais est coupée : la base reste sans groupes,
+  chaque flux reçoit ceux de son étudiant.
+"""
+
+from moteur_fusion import MoteurFusion
+from transformations import Transformation
+from menu_cantine import etape_menus
+from anglais_planning import etape_anglais
+from Copie_planning import copier_fichier_ics
+from flux_etudiants import etape_flux_etudiants
+
+# ---------------- CONFIG ----------------
+MENUS_ACTIFS = True
+ANGLAIS_ACTIF = True
+PUBLICATION_ACTIVE = True
+FLUX_ETUDIANTS_ACTIFS = False  # True : coupe l'étape anglais (voir flux_etudiants.py)
+
+
+def publier(flux):
+    copier_fichier_ics(flux.chemin_sortie)
+
+
+def transformations_par_defaut():
+    return [
+        Transformation("menus", etape_menus, active=MENUS_ACTIFS),
+        Transformation("anglais", etape_anglais, active=ANGLAIS_ACTIF and not FLUX_ETUDIANTS_ACTIFS),
+        Transformation("publication", publier, active=PUBLICATION_ACTIVE, apres_ecriture=True),
+        Transformation("flux_etudiants", etape_flux_etudiants, active=FLUX_ETUDIANTS_ACTIFS,
+                       apres_ecriture=True),
+    ]
+
+
+def executer_chaine(moteur=None, transformations=None):
+    moteur = moteur or MoteurFusion()
+    return moteur.executer(transformations=transformations_par_defaut()
+                           if transformations is None else transformations)
+
+
+if __name__ == "__main__":
+    executer_chaine()
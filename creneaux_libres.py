@@ -0,0 +1,112 @@
+"""
+creneaux_libres.py
+- Moteur de créneaux libres : les intervalles occupés sont stockés en minutes depuis
+  l'epoch, triés et fusionnés (deux tableaux : débuts et fins).
+- « Première fenêtre libre d'au moins X minutes dans [ouverture, fermeture], à M minutes
+  des événements voisins » se résout par bisect : seuls les intervalles de la fenêtre
+  demandée sont regardés, pas toute la journée.
+- Activite décrit une règle de placement (repas, bloc de révision, temps de trajet...) ;
+  placer_sur_periode répond pour chaque jour d'une période.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+
+def en_minutes(dt):
+    """datetime avec fuseau -> minutes depuis l'epoch."""
+    return int(dt.timestamp()) // 60
+
+
+def depuis_minutes(minutes, tz):
+    return datetime.fromtimestamp(minutes * 60, tz)
+
+
+class Occupation:
+    """Intervalles occupés [début, fin[ en minutes depuis l'epoch, triés et fusionnés."""
+
+    def __init__(self, intervalles=()):
+        self.debuts = []
+        self.fins = []
+        self.ajouter(intervalles)
+
+    @classmethod
+    def depuis_datetimes(cls, paires):
+        """`paires` : itérable de (début, fin) datetimes avec fuseau."""
+        return cls((en_minutes(d), en_minutes(f)) for d, f in paires)
+
+    def ajouter(self, intervalles):
+        """Ajoute des intervalles (minutes) et refusionne le tout."""
+        tous = sorted(list(zip(self.debuts, self.fins)) + [(d, f) for d, f in intervalles if f > d])
+        self.debuts, self.fins = [], []
+        for d, f in tous:
+            if self.fins and d <= self.fins[-1]:
+                self.fins[-1] = max(self.fins[-1], f)
+            else:
+                self.debuts.append(d)
+                self.fins.append(f)
+
+    def fenetre_libre(self, debut, fin, duree, marge=0, duree_min=None):
+        """
+        Première fenêtre libre dans [debut, fin] (minutes), à `marge` minutes au moins des
+        intervalles occupés. Renvoie (d, f) de `duree` minutes, ou plus courte si l'espace
+        libre ne le permet pas (mais d'au moins `duree_min`), ou None.
+        """
+        duree_min = duree if duree_min is None else duree_min
+        # Premier intervalle qui peut gêner : celui dont la fin (+ marge) dépasse `debut`
+        i = bisect_right(self.fins, debut - marge)
+        curseur = debut
+        while curseur < fin:
+            prochain = self.debuts[i] - marge if i < len(self.debuts) else fin
+            if prochain <= curseur:
+                curseur = max(curseur, self.fins[i] + marge)
+                i += 1
+                continue
+            libre_fin = min(prochain, fin)
+            if libre_fin - curseur >= duree_min:
+                return curseur, min(curseur + duree, libre_fin)
+            if i >= len(self.debuts):
+                break
+            curseur = max(curseur, self.fins[i] + marge)
+            i += 1
+        return None
+
+
+class Activite:
+    """Règle de placement : durée voulue dans [ouverture, fermeture], à `marge` min des événements."""
+
+    __slots__ = ("nom", "ouverture", "fermeture", "duree", "marge", "au_plus_tot", "duree_min")
+
+    def __init__(self, nom, ouverture, fermeture, duree, marge=0, au_plus_tot=None, duree_min=None):
+        self.nom = nom
+        self.ouverture = ouverture  # time
+        self.fermeture = fermeture  # time
+        self.duree = duree  # minutes
+        self.marge = marge
+        self.au_plus_tot = au_plus_tot  # time : début souhaité au plus tôt (sinon l'ouverture)
+        self.duree_min = duree if duree_min is None else duree_min
+
+    def fenetre(self, jour, occupation, tz):
+        """(début, fin) datetimes du créneau retenu pour `jour`, ou None."""
+        debut = tz.localize(datetime.combine(jour, max(self.ouverture, self.au_plus_tot or self.ouverture)))
+        fin = tz.localize(datetime.combine(jour, self.fermeture))
+        trouve = occupation.fenetre_libre(en_minutes(debut), en_minutes(fin), self.duree,
+                                          self.marge, self.duree_min)
+        if trouve is None:
+            return None
+        return depuis_minutes(trouve[0], tz), depuis_minutes(trouve[1], tz)
+
+
+def placer_sur_periode(activite, occupation, premier_jour, dernier_jour, tz, jours_semaine=None):
+    """
+    Créneau de l'activité pour chaque jour de [premier_jour, dernier_jour].
+    `jours_semaine` : numéros de jour (0 = lundi) à considérer, tous par défaut.
+    Renvoie {date: (début, fin) ou None}.
+    """
+    resultats = {}
+    jour = premier_jour
+    while jour <= dernier_jour:
+        if jours_semaine is None or jour.weekday() in jours_semaine:
+            resultats[jour] = activite.fenetre(jour, occupation, tz)
+        jour += timedelta(days=1)
+    return resultats
@@ -0,0 +1,10 @@
+"""
+demon_fusion.py
+- Lance la fusion en mode démon : les calendriers restent en mémoire et la fusion est
+  relancée dès que ADECal.ics ou edt_IG1_complet.json change (voir moteur_fusion.surveiller).
+"""
+
+from moteur_fusion import MoteurFusion, surveiller
+
+if __name__ == "__main__":
+    surveiller(MoteurFusion())
@@ -0,0 +1,124 @@
+"""
+extraction_menus.py
+- Extraction des menus d'une page restaurant du CROUS, sans construire l'arbre de toute la
+  page : le HTML qui précède le premier bloc div.menu (en-tête, styles, scripts, navigation)
+  n'est pas parsé, et un SoupStrainer ne garde que les blocs div.menu de la suite.
+- Le titre de chaque catégorie est lu directement sur le nœud, sans re-parser du HTML.
+- Parseur lxml s'il est installé (plus rapide), sinon html.parser.
+- Résultat : des enregistrements MenuRepas (restaurant, date, repas, type, catégories).
+"""
+
+import importlib.util
+import re
+from datetime import datetime
+
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
+
+PARSEUR = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+MOIS = {
+    "janvier": 1, "février": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
+    "juillet": 7, "août": 8, "septembre": 9, "octobre": 10, "novembre": 11, "décembre": 12
+}
+
+_ESPACES = re.compile(r"\s+")
+_BLOCS_MENU = SoupStrainer("div", class_="menu")
+_DEBUT_MENUS = re.compile(r"""<div\b[^>]*\bclass\s*=\s*["'](?:[^"']*\s)?menu[\s"']""")
+
+
+def clean_text(text):
+    return _ESPACES.sub(" ", text).strip()
+
+
+def parse_date(date_text):
+    """'Menu du lundi 20 octobre 2025' -> datetime(2025, 10, 20), ou None."""
+    parts = date_text.lower().replace("menu du", "").replace(",", "").split()
+    for i, p in enumerate(parts):
+        if p.isdigit() and 1 <= int(p) <= 31:
+            try:
+                mois = MOIS.get(parts[i + 1])
+                if mois is None:
+                    return None
+                return datetime(int(parts[i + 2]), mois, int(p))
+            except (IndexError, ValueError):
+                return None
+    return None
+
+
+def type_repas(nom):
+    """'midi' ou 'soir' d'après le titre du repas."""
+    return "soir" if ("dîner" in nom or "diner" in nom or "soir" in nom) else "midi"
+
+
+class MenuRepas:
+    """Un repas d'un jour : catégories = [(titre, [plats])]."""
+
+    __slots__ = ("restaurant", "date", "repas", "type_repas", "categories")
+
+    def __init__(self, restaurant, date, repas, categories):
+        self.restaurant = restaurant
+        self.date = date  # "AAAA-MM-JJ"
+        self.repas = repas  # titre du repas, en minuscules (ex : "déjeuner")
+        self.type_repas = type_repas(repas)
+        self.categories = categories
+
+    @property
+    def plats(self):
+        return [p for _, plats in self.categories for p in plats]
+
+    def vers_dict(self):
+        return {"date": self.date, "repas": self.repas,
+                "categories": [[titre, list(plats)] for titre, plats in self.categories]}
+
+    @classmethod
+    def depuis_dict(cls, d, restaurant=None):
+        return cls(restaurant, d["date"], d["repas"], [(t, p) for t, p in d["categories"]])
+
+
+def _titre_categorie(li):
+    """Texte du premier nœud de la catégorie (le titre, avant la liste des plats)."""
+    if not li.contents:
+        return ""
+    premier = li.contents[0]
+    if isinstance(premier, NavigableString):
+        return str(premier).strip()
+    return premier.get_text().strip()
+
+
+def extraire(contenu, restaurant=None):
+    """Menus d'une page (bytes ou str) -> [MenuRepas], dans l'ordre de la page."""
+    if isinstance(contenu, bytes):
+        try:
+            contenu = contenu.decode("utf-8")
+        except UnicodeDecodeError:
+            pass  # BeautifulSoup détectera l'encodage
+    if isinstance(contenu, str):
+        debut = _DEBUT_MENUS.search(contenu)
+        if debut:
+            contenu = contenu[debut.start():]
+    soup = BeautifulSoup(contenu, PARSEUR, parse_only=_BLOCS_MENU)
+
+    menus = []
+    for menu_div in soup.find_all("div", class_="menu"):
+        date_node = menu_div.find("time", class_="menu_date_title")
+        if not date_node:
+            continue
+        jour = parse_date(date_node.get_text())
+        if not jour:
+            continue
+        jour = jour.strftime("%Y-%m-%d")
+
+        for meal in menu_div.find_all("div", class_="meal"):
+            title_node = meal.find("div", class_="meal_title")
+            if not title_node:
+                continue
+            foodies = meal.find("ul", class_="meal_foodies")
+            if not foodies:
+                continue
+
+            categories = []
+            for cat in foodies.find_all("li", recursive=False):
+                plats = [p for p in (clean_text(item.get_text()) for item in cat.find_all("li")) if p]
+                categories.append((_titre_categorie(cat), plats))
+            menus.append(MenuRepas(restaurant, jour, clean_text(title_node.get_text()).lower(), categories))
+    return menus
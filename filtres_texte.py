@@ -0,0 +1,120 @@
+"""
+filtres_texte.py
+- Moteur de filtrage de lignes partagé par le nettoyage des descriptions ADE (fusion) et
+  celui des menus CROUS (menu_cantine.py).
+- Les règles sont lues dans filtres_texte.json : lignes exactes à retirer, sous-chaînes à
+  retirer, et sous-chaînes après lesquelles on arrête (par restaurant et par repas).
+- Compilées une seule fois : les lignes exactes dans un ensemble (hash), les sous-chaînes
+  dans une seule expression régulière par type de règle. Chaque ligne est filtrée en une
+  passe, quel que soit le nombre de règles.
+- Pour quelques sous-chaînes seulement (descriptions ADE), des tests `in` sont plus
+  rapides que la regex : elle ne sert qu'au-delà de MAX_SOUS_CHAINES_SIMPLES.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+FICHIER_REGLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "filtres_texte.json")
+
+MAX_SOUS_CHAINES_SIMPLES = 4
+
+_regles_brutes = {}  # chemin -> (mtime, dict)
+_compilees = {}  # (chemin, mtime, clé) -> ReglesFiltre
+
+
+def _alternative(motifs):
+    """Une seule regex pour toutes les sous-chaînes (None s'il n'y en a pas)."""
+    motifs = sorted({m.lower() for m in motifs if m}, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, motifs))) if motifs else None
+
+
+class ReglesFiltre:
+    """Règles compilées. Les comparaisons se font en minuscules, sur la ligne sans espaces autour."""
+
+    def __init__(self, exactes=(), exactes_sans_puce=(), sous_chaines=(), arret=(), ignorer_vides=False):
+        self.exactes = frozenset(e.strip().lower() for e in exactes)
+        # Comparées à la ligne dont les puces (•) ont été retirées
+        self.exactes_sans_puce = frozenset(e.replace("•", "").strip().lower() for e in exactes_sans_puce)
+        self.sous_chaines = _alternative(sous_chaines)
+        # Peu de sous-chaînes : testées une à une (voir MAX_SOUS_CHAINES_SIMPLES)
+        motifs = {m.lower() for m in sous_chaines if m}
+        self.sous_chaines_simples = tuple(sorted(motifs)) if 0 < len(motifs) <= MAX_SOUS_CHAINES_SIMPLES else None
+        self.arret = _alternative(arret)
+        self.ignorer_vides = ignorer_vides
+        self.signature = hashlib.sha1(repr((sorted(self.exactes), sorted(self.exactes_sans_puce),
+                                            self.sous_chaines and self.sous_chaines.pattern,
+                                            self.arret and self.arret.pattern,
+                                            ignorer_vides)).encode("utf-8")).hexdigest()
+
+    def filtrer(self, lignes):
+        """
+        Lignes gardées, dans l'ordre. Avec ignorer_vides, les lignes sont renvoyées sans les
+        espaces autour et les lignes vides sont retirées. Une ligne d'arrêt termine le filtrage.
+        """
+        gardees = []
+        exactes, sans_puce = self.exactes, self.exactes_sans_puce
+        sous_chaines, arret = self.sous_chaines, self.arret
+        simples, ignorer_vides = self.sous_chaines_simples, self.ignorer_vides
+        if simples is not None:
+            sous_chaines = None
+        for ligne in lignes:
+            nette = ligne.strip()
+            if ignorer_vides:
+                if not nette: continue
+                ligne = nette
+            minuscule = nette.lower()
+            if minuscule in exactes: continue
+            if sans_puce and minuscule.replace("•", "").strip() in sans_puce: continue
+            if simples is not None:
+                for motif in simples:
+                    if motif in minuscule: break
+                else:
+                    motif = None
+                if motif is not None: continue
+            elif sous_chaines is not None and sous_chaines.search(minuscule): continue
+            if arret is not None and arret.search(minuscule): break
+            gardees.append(ligne)
+        return gardees
+
+
+def charger_regles(chemin=FICHIER_REGLES):
+    """Contenu du fichier de règles (relu seulement s'il a changé)."""
+    mtime = os.path.getmtime(chemin)
+    connu = _regles_brutes.get(chemin)
+    if connu is None or connu[0] != mtime:
+        with open(chemin, "r", encoding="utf-8") as f:
+            _regles_brutes[chemin] = (mtime, json.load(f))
+    return _regles_brutes[chemin]
+
+
+def _compiler(ensembles, type_repas=None, ignorer_vides=False):
+    exactes, sans_puce, sous_chaines, arret = [], [], [], []
+    for r in ensembles:
+        (sans_puce if r.get("ignorer_puce") else exactes).extend(r.get("exactes", []))
+        sous_chaines.extend(r.get("sous_chaines", []))
+        if type_repas is not None:
+            arret.extend(r.get("arret", {}).get(type_repas, []))
+        ignorer_vides = ignorer_vides or r.get("ignorer_vides", False)
+    return ReglesFiltre(exactes, sans_puce, sous_chaines, arret, ignorer_vides)
+
+
+def regles_description(chemin=FICHIER_REGLES):
+    """Règles de nettoyage des descriptions ADE (clean_menu_description)."""
+    mtime, brutes = charger_regles(chemin)
+    cle = (chemin, mtime, "description_ade")
+    if cle not in _compilees:
+        _compilees[cle] = _compiler([brutes.get("description_ade", {})])
+    return _compilees[cle]
+
+
+def regles_restaurant(nom, type_repas, chemin=FICHIER_REGLES):
+    """Règles d'un restaurant (toutes celles dont la clé apparaît dans son nom) pour ce repas."""
+    mtime, brutes = charger_regles(chemin)
+    cle = (chemin, mtime, "restaurant", nom, type_repas)
+    if cle not in _compilees:
+        nom_min = nom.lower()
+        ensembles = [r for k, r in brutes.get("restaurants", {}).items() if k.lower() in nom_min]
+        _compilees[cle] = _compiler(ensembles, type_repas)
+    return _compilees[cle]
@@ -0,0 +1,226 @@
+"""
+flux_etudiants.py
+- Génère un flux ICS par étudiant à partir d'une seule base fusionnée (planning_fusion.ics) :
+  chaque étudiant n'est décrit que par une surcouche (etudiants.json) :
+    * "groupes" : ses règles de groupe, au format de groupes_cours.json (GrA, GrB, Online...)
+    * "masquer" : motifs des cours qu'il ne suit pas (options), retirés de son flux
+    * "restaurants" : restaurants dont il veut les menus (tous si absent)
+- La base est lue et indexée une seule fois (titres, jours des cours futurs, menus par
+  restaurant). Un flux est écrit en recopiant des tranches des octets de la base ; seuls
+  les événements que la surcouche change sont réécrits (ligne SUMMARY remplacée) ou retirés.
+  Le coût d'un étudiant de plus suit donc la taille de sa surcouche.
+- Un flux dont la base et la surcouche n'ont pas changé n'est pas réécrit.
+- La base doit être produite sans l'étape anglais : les titres y restent sans suffixe et
+  chaque flux reçoit les groupes de son étudiant. Avec chaine_planning.FLUX_ETUDIANTS_ACTIFS,
+  les flux sont une étape de la chaîne et l'étape anglais est coupée. Une base dont les cours
+  à venir portent déjà un suffixe de groupes_cours.json est refusée (verifier_base).
+Usage : python flux_etudiants.py
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+import pytz
+
+from flux_ics import iter_vevents_positions, remplacer_propriete
+from historique_gele import SegmentsHistorique
+from modele_fusion import make_paris_aware
+from regles_groupes import FICHIER_REGLES, MoteurGroupes, charger_moteur
+
+# ---------------- CONFIG ----------------
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+FICHIER_BASE = os.path.join(DOSSIER, "planning_fusion.ics")
+FICHIER_ETUDIANTS = os.path.join(DOSSIER, "etudiants.json")
+DOSSIER_FLUX = os.path.join(DOSSIER, "flux_etudiants")
+DOSSIER_HISTORIQUE = os.path.join(DOSSIER, "historique_fusion")
+ETAT_FILE = "etat.json"  # empreinte de chaque flux écrit (dans DOSSIER_FLUX)
+PARIS_TZ = pytz.timezone("Europe/Paris")
+MARQUE_MENU = "🍽️"
+
+
+class BasePlanning:
+    """Planning commun en mémoire (un seul bloc d'octets) et ses index."""
+
+    def __init__(self, chemin=FICHIER_BASE, now=None, dossier_historique=DOSSIER_HISTORIQUE):
+        now = now or datetime.now(PARIS_TZ)
+        with open(chemin, "rb") as f:
+            self.contenu = f.read()
+        self.vue = memoryview(self.contenu)
+        self.signature = hashlib.sha256(self.contenu).hexdigest()
+        self.positions = []  # [(début, fin)] de chaque VEVENT
+        self.titres = []  # titre de chaque VEVENT
+        self.par_titre = {}  # titre -> [i]
+        self.par_jour = {}  # date -> [i], cours futurs seulement (les groupes ne touchent pas au passé)
+        self.menus = {}  # restaurant -> [i]
+        self._masques = {}  # motif -> [i] (partagé entre étudiants)
+
+        # Le passé gelé (en tête de fichier) ne reçoit pas de groupes : ses dates ne sont pas lues
+        recent = SegmentsHistorique(dossier_historique).debut_partie_recente(self.contenu) or 0
+        for pos, fin, ev in iter_vevents_positions(self.contenu, 0, champs=("DTSTART", "SUMMARY", "LOCATION")):
+            i = len(self.positions)
+            titre = ev.summary.strip()
+            self.positions.append((pos, fin))
+            self.titres.append(titre)
+            self.par_titre.setdefault(titre, []).append(i)
+            if titre.startswith(MARQUE_MENU):
+                self.menus.setdefault(ev.location, []).append(i)
+            elif pos >= recent:
+                debut = make_paris_aware(ev.dtstart)
+                if not isinstance(debut, datetime):  # journée entière : à partir de minuit
+                    debut = make_paris_aware(datetime.combine(debut, datetime.min.time()))
+                if debut >= now:
+                    self.par_jour.setdefault(debut.date(), []).append(i)
+
+    def bloc(self, i):
+        debut, fin = self.positions[i]
+        return self.contenu[debut:fin]
+
+    def masques(self, motif):
+        """Événements dont le titre correspond au motif (calculé une fois pour tous les étudiants)."""
+        if motif not in self._masques:
+            regex = re.compile(motif)
+            self._masques[motif] = [i for titre, indices in self.par_titre.items()
+                                    if regex.search(titre) for i in indices]
+        return self._masques[motif]
+
+
+class Etudiant:
+    """Surcouche d'un étudiant : groupes, options masquées, restaurants."""
+
+    def __init__(self, donnees):
+        self.id = donnees["id"]
+        self.groupes = MoteurGroupes({"regles": donnees.get("groupes", [])})
+        self.masquer = donnees.get("masquer", [])
+        restaurants = donnees.get("restaurants")
+        self.restaurants = None if restaurants is None else [r.lower() for r in restaurants]
+
+    def changements(self, base):
+        """{i: nouveaux octets} pour les événements de la base que la surcouche change (b"" = retiré)."""
+        changes = {}
+        for motif in self.masquer:
+            for i in base.masques(motif):
+                changes[i] = b""
+        if self.restaurants is not None:
+            for lieu, indices in base.menus.items():
+                if not any(r in lieu.lower() for r in self.restaurants):
+                    for i in indices:
+                        changes[i] = b""
+        # Index des dates de l'étudiant x index des jours de la base : seuls ses jours sont lus
+        for jour in self.groupes.index:
+            for i in base.par_jour.get(jour, ()):
+                if i in changes:
+                    continue
+                titre = self.groupes.nouveau_titre(base.titres[i], jour)
+                if titre is not None:
+                    changes[i] = remplacer_propriete(base.bloc(i), "SUMMARY", titre)
+        return changes
+
+
+def empreinte_flux(base, changes):
+    h = hashlib.sha256(base.signature.encode("ascii"))
+    for i in sorted(changes):
+        h.update(f"{i}:{len(changes[i])}:".encode("ascii"))
+        h.update(changes[i])
+    return h.hexdigest()
+
+
+def ecrire_flux(chemin, base, changes):
+    """Tranches de la base entre les événements changés + leurs nouveaux octets. Renvoie la taille."""
+    tmp = chemin + ".tmp"
+    with open(tmp, "wb") as f:
+        pos = 0
+        for i in sorted(changes):
+            debut, fin = base.positions[i]
+            f.write(base.vue[pos:debut])
+            f.write(changes[i])
+            pos = fin
+        f.write(base.vue[pos:])
+        taille = f.tell()
+    os.replace(tmp, chemin)
+    return taille
+
+
+def verifier_base(base, fichier_regles=FICHIER_REGLES):
+    """
+    Lève ValueError si l'étape anglais est passée sur la base : un cours à venir porte déjà
+    le suffixe que groupes_cours.json lui donne ce jour-là.
+    """
+    if not os.path.exists(fichier_regles):
+        return
+    moteur = charger_moteur(fichier_regles)
+    for jour, regles in moteur.index.items():
+        for i in base.par_jour.get(jour, ()):
+            titre = base.titres[i]
+            for r in regles:
+                if titre.endswith(" " + r.suffixe) and r.concerne(titre[:-len(r.suffixe)].strip()):
+                    raise ValueError(f"la base contient déjà les groupes d'anglais ({titre!r} "
+                                     f"le {jour:%d/%m/%Y}) : produisez-la sans l'étape anglais")
+
+
+def charger_etudiants(chemin=FICHIER_ETUDIANTS):
+    with open(chemin, "r", encoding="utf-8") as f:
+        return [Etudiant(d) for d in json.load(f).get("etudiants", [])]
+
+
+def generer_flux(base, etudiants, dossier=DOSSIER_FLUX):
+    """Écrit (ou laisse tel quel s'il est à jour) le flux de chaque étudiant. Renvoie les stats."""
+    os.makedirs(dossier, exist_ok=True)
+    etat_path = os.path.join(dossier, ETAT_FILE)
+    etat = {}
+    if os.path.exists(etat_path):
+        with open(etat_path, "r", encoding="utf-8") as f:
+            etat = json.load(f)
+
+    stats = {"ecrits": 0, "inchanges": 0, "evenements_changes": 0}
+    for etudiant in etudiants:
+        changes = etudiant.changements(base)
+        stats["evenements_changes"] += len(changes)
+        chemin = os.path.join(dossier, f"{etudiant.id}.ics")
+        empreinte = empreinte_flux(base, changes)
+        if etat.get(etudiant.id) == empreinte and os.path.exists(chemin):
+            stats["inchanges"] += 1
+            continue
+        ecrire_flux(chemin, base, changes)
+        etat[etudiant.id] = empreinte
+        stats["ecrits"] += 1
+
+    tmp = etat_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(etat, f, indent=2)
+    os.replace(tmp, etat_path)
+    return stats
+
+
+def generer(chemin_base=FICHIER_BASE):
+    debut = time.perf_counter()
+    base = BasePlanning(chemin_base)
+    verifier_base(base)
+    etudiants = charger_etudiants()
+    print(f"📅 Base : {len(base.positions)} événements, indexée en {(time.perf_counter() - debut) * 1000:.0f} ms")
+    stats = generer_flux(base, etudiants)
+    duree = time.perf_counter() - debut
+    print(f"✅ {len(etudiants)} flux en {duree * 1000:.0f} ms : {stats['ecrits']} écrits, "
+          f"{stats['inchanges']} inchangés, {stats['evenements_changes']} événements personnalisés.")
+
+
+def etape_flux_etudiants(flux):
+    """Étape de chaine_planning (après l'écriture) : flux de chaque étudiant depuis la sortie."""
+    generer(flux.chemin_sortie)
+
+
+def main():
+    if not os.path.exists(FICHIER_BASE):
+        print(f"❌ Erreur : Le fichier {FICHIER_BASE} est introuvable.")
+        return
+    try:
+        generer()
+    except ValueError as e:
+        print(f"❌ Erreur : {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+flux_ics.py
+- Lecture en flux des VEVENT d'un fichier ICS (fichier mappé en mémoire), sans construire
+  l'arbre complet de Calendar.from_ical : la mémoire reste stable quand le flux grossit.
+- Chaque VEVENT est un enregistrement léger : seules les propriétés utiles (UID, DTSTART,
+  DTEND, SUMMARY, LOCATION, DESCRIPTION) sont gardées, et décodées à la demande.
+- Le texte brut du VEVENT est conservé pour pouvoir le réécrire tel quel.
+- ecrire_ics : écrit un calendrier à partir d'événements bruts (bytes) ou icalendar.
+- remplacer_propriete / patcher_fichier : changent une propriété (ex: SUMMARY) directement
+  dans le texte ICS, sans re-sérialiser l'événement ni le reste du fichier.
+"""
+
+import mmap
+import os
+import re
+from datetime import datetime
+
+import pytz
+
+CHAMPS_PAR_DEFAUT = ("UID", "DTSTART", "DTEND", "SUMMARY", "LOCATION", "DESCRIPTION")
+
+DEBUT_VEVENT = b"BEGIN:VEVENT"
+FIN_VEVENT = b"END:VEVENT"
+
+_ECHAPPEMENTS = re.compile(r"\\([\\;,nN])")
+
+
+def _desechapper(valeur):
+    """Décode un texte ICS (\\n, \\, \\; \\\\)."""
+    return _ECHAPPEMENTS.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), valeur)
+
+
+def _fin_tete(ligne):
+    """Position du ':' qui sépare 'NOM;PARAM=X' de la valeur (hors guillemets), ou -1."""
+    entre_guillemets = False
+    for i, c in enumerate(ligne):
+        if c == '"':
+            entre_guillemets = not entre_guillemets
+        elif c == ":" and not entre_guillemets:
+            return i
+    return -1
+
+
+def _decouper_ligne(ligne):
+    """'NOM;PARAM=X:valeur' -> ('NOM', {'PARAM': 'X'}, 'valeur'). Gère les paramètres entre guillemets."""
+    i = _fin_tete(ligne)
+    if i == -1:
+        return ligne.upper(), {}, ""
+    tete, valeur = ligne[:i], ligne[i + 1:]
+    morceaux = tete.split(";")
+    params = {}
+    for p in morceaux[1:]:
+        cle, _, val = p.partition("=")
+        params[cle.upper()] = val.strip('"')
+    return morceaux[0].upper(), params, valeur
+
+
+def _date_heure(valeur):
+    """AAAAMMJJTHHMMSS -> datetime naïve (découpage direct : strptime est lent)."""
+    if len(valeur) == 15 and valeur[8] == "T":
+        return datetime(int(valeur[:4]), int(valeur[4:6]), int(valeur[6:8]),
+                        int(valeur[9:11]), int(valeur[11:13]), int(valeur[13:15]))
+    return datetime.strptime(valeur, "%Y%m%dT%H%M%S")
+
+
+def _parser_date(valeur, params):
+    """Valeur DTSTART/DTEND -> date, datetime UTC, datetime localisée (TZID) ou naïve."""
+    valeur = valeur.strip()
+    if params.get("VALUE") == "DATE" or len(valeur) == 8:
+        return datetime.strptime(valeur, "%Y%m%d").date()
+    if valeur.endswith("Z"):
+        return pytz.utc.localize(_date_heure(valeur[:-1]))
+    naive = _date_heure(valeur)
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            return pytz.timezone(tzid).localize(naive)
+        except pytz.UnknownTimeZoneError:
+            pass
+    return naive
+
+
+def decoder_texte(ligne):
+    """Ligne brute d'une propriété texte (bytes) -> valeur décodée ("" si None)."""
+    if ligne is None:
+        return ""
+    return _desechapper(_decouper_ligne(ligne.decode("utf-8", "replace"))[2])
+
+
+class EvenementICS:
+    """Un VEVENT lu en flux : propriétés brutes, décodées seulement quand on les lit."""
+
+    __slots__ = ("brut", "_lignes", "_decode")
+
+    def __init__(self, brut, lignes):
+        self.brut = brut  # texte ICS complet du VEVENT (bytes, fins de ligne CRLF)
+        self._lignes = lignes  # {NOM: ligne déplié non décodée}
+        self._decode = {}
+
+    def _propriete(self, nom):
+        if nom not in self._decode:
+            ligne = self._lignes.get(nom)
+            self._decode[nom] = None if ligne is None else _decouper_ligne(ligne.decode("utf-8", "replace"))
+        return self._decode[nom]
+
+    def texte(self, nom):
+        p = self._propriete(nom)
+        return _desechapper(p[2]) if p else ""
+
+    def ligne(self, nom):
+        """Ligne brute (dépliée, non décodée) de la propriété, ou None (voir decoder_texte)."""
+        return self._lignes.get(nom)
+
+    def date(self, nom):
+        p = self._propriete(nom)
+        return _parser_date(p[2], p[1]) if p else None
+
+    @property
+    def uid(self):
+        return self.texte("UID")
+
+    @property
+    def summary(self):
+        return self.texte("SUMMARY")
+
+    @property
+    def location(self):
+        return self.texte("LOCATION")
+
+    @property
+    def description(self):
+        return self.texte("DESCRIPTION")
+
+    @property
+    def dtstart(self):
+        return self.date("DTSTART")
+
+    @property
+    def dtend(self):
+        return self.date("DTEND")
+
+
+def _lire_bloc(bloc, champs):
+    """Extrait les lignes des propriétés voulues d'un bloc VEVENT (hors sous-composants, ex: VALARM)."""
+    deplie = bloc.replace(b"\r\n ", b"").replace(b"\r\n\t", b"")
+    lignes = {}
+    profondeur = 0
+    for ligne in deplie.split(b"\r\n")[1:]:
+        if ligne.startswith(b"BEGIN:"):
+            profondeur += 1
+            continue
+        if ligne.startswith(b"END:"):
+            profondeur -= 1
+            continue
+        if profondeur:
+            continue
+        fin_nom = len(ligne)
+        for sep in (b";", b":"):
+            i = ligne.find(sep)
+            if 0 <= i < fin_nom:
+                fin_nom = i
+        nom = ligne[:fin_nom].upper().decode("ascii", "replace")
+        if nom in champs and nom not in lignes:
+            lignes[nom] = ligne
+    return lignes
+
+
+def iter_vevents_depuis(mm, debut=0, champs=CHAMPS_PAR_DEFAUT):
+    """Itère sur les VEVENT d'un contenu déjà mappé (ou bytes), à partir de la position `debut`."""
+    for _, _, ev in iter_vevents_positions(mm, debut, champs):
+        yield ev
+
+
+def iter_vevents_positions(mm, debut=0, champs=CHAMPS_PAR_DEFAUT):
+    """Comme iter_vevents_depuis, avec la plage (début, fin) de chaque VEVENT dans `mm`."""
+    champs = frozenset(c.upper() for c in champs)
+    crlf = mm.find(b"\r\n") != -1
+    pos = mm.find(DEBUT_VEVENT, debut)
+    while pos != -1:
+        fin = mm.find(FIN_VEVENT, pos)
+        if fin == -1:
+            break
+        fin_ligne = mm.find(b"\n", fin)
+        fin_ligne = len(mm) if fin_ligne == -1 else fin_ligne + 1
+        bloc = mm[pos:fin_ligne]
+        if not crlf:
+            bloc = bloc.replace(b"\n", b"\r\n")
+        elif not bloc.endswith(b"\r\n"):
+            bloc = bloc.rstrip(b"\r\n") + b"\r\n"
+        yield pos, fin_ligne, EvenementICS(bloc, _lire_bloc(bloc, champs))
+        pos = mm.find(DEBUT_VEVENT, fin_ligne)
+
+
+def evenement_depuis_octets(brut, champs=CHAMPS_PAR_DEFAUT):
+    """Enregistrement léger pour le texte ICS d'un seul VEVENT (bytes)."""
+    return next(iter_vevents_depuis(brut, 0, champs))
+
+
+def iter_vevents(chemin, champs=CHAMPS_PAR_DEFAUT):
+    """Itère sur les VEVENT du fichier un par un (mmap : le fichier n'est pas chargé en entier)."""
+    if not os.path.exists(chemin) or os.path.getsize(chemin) == 0:
+        return
+    with open(chemin, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from iter_vevents_depuis(mm, 0, champs)
+
+
+# ---------------- ÉCRITURE ----------------
+
+TAILLE_LIGNE_MAX = 75  # octets par ligne, au-delà la ligne est pliée (RFC 5545)
+
+
+def position_propriete(bloc, nom):
+    """
+    Plage (début, fin) de la propriété `nom` dans le texte d'un VEVENT (lignes de continuation
+    et fin de ligne comprises), hors sous-composants (VALARM...) ; None si elle n'y est pas.
+    """
+    nom = nom.upper().encode("ascii")
+    profondeur = 0
+    trouve = None
+    pos = bloc.find(b"\n") + 1  # après BEGIN:VEVENT
+    while pos < len(bloc):
+        fin = bloc.find(b"\n", pos)
+        fin = len(bloc) if fin == -1 else fin + 1
+        continuation = bloc[pos:pos + 1] in (b" ", b"\t")
+        if trouve is not None and not continuation:
+            return trouve, pos
+        if not continuation:
+            if bloc.startswith(b"BEGIN:", pos):
+                profondeur += 1
+            elif bloc.startswith(b"END:", pos):
+                profondeur -= 1
+            elif (profondeur == 0 and bloc[pos:pos + len(nom)].upper() == nom
+                  and bloc[pos + len(nom):pos + len(nom) + 1] in (b":", b";")):
+                trouve = pos
+        pos = fin
+    return None if trouve is None else (trouve, len(bloc))
+
+
+def _plier(ligne):
+    """Plie une ligne de contenu (bytes) à 75 octets, sans couper un caractère UTF-8."""
+    morceaux = []
+    limite = TAILLE_LIGNE_MAX
+    while len(ligne) > limite:
+        coupe = limite
+        while coupe > 0 and 0x80 <= ligne[coupe] < 0xC0:
+            coupe -= 1
+        morceaux.append(ligne[:coupe])
+        ligne = ligne[coupe:]
+        limite = TAILLE_LIGNE_MAX - 1  # l'espace de continuation compte
+    morceaux.append(ligne)
+    return b"\r\n ".join(morceaux)
+
+
+def remplacement_propriete(bloc, nom, valeur):
+    """
+    (début, fin, nouvelle_ligne) pour donner la valeur texte `valeur` à la propriété `nom`
+    du VEVENT `bloc` : les paramètres (;LANGUAGE=...) et la fin de ligne sont conservés.
+    Si la propriété manque, elle est ajoutée avant les sous-composants (ou END:VEVENT).
+    """
+    from icalendar import vText
+    crlf = b"\r\n" in bloc
+    position = position_propriete(bloc, nom)
+    if position is None:
+        sous_composant = bloc.find(b"\nBEGIN:")
+        debut = fin = sous_composant + 1 if sous_composant != -1 else bloc.rfind(FIN_VEVENT)
+        tete = nom.upper()
+    else:
+        debut, fin = position
+        ancienne = re.sub(rb"\r?\n[ \t]", b"", bloc[debut:fin]).decode("utf-8", "replace")
+        i = _fin_tete(ancienne)
+        tete = ancienne[:i] if i != -1 else nom.upper()
+    ligne = _plier(tete.encode("utf-8") + b":" + vText(valeur).to_ical()) + b"\r\n"
+    if not crlf:
+        ligne = ligne.replace(b"\r\n", b"\n")
+    return debut, fin, ligne
+
+
+def remplacer_propriete(bloc, nom, valeur):
+    """Texte du VEVENT avec la propriété `nom` remplacée (voir remplacement_propriete)."""
+    debut, fin, ligne = remplacement_propriete(bloc, nom, valeur)
+    return bloc[:debut] + ligne + bloc[fin:]
+
+
+def patcher_fichier(chemin, remplacements, taille_bloc=1 << 16):
+    """
+    Réécrit `chemin` en remplaçant seulement les plages d'octets données
+    [(début, fin, nouveaux_octets)] ; tout le reste est recopié tel quel, par blocs.
+    Fichier temporaire puis remplacement atomique. Renvoie le nombre d'octets écrits.
+    """
+    tmp = chemin + ".tmp"
+    with open(chemin, "rb") as src, open(tmp, "wb") as dst:
+        pos = 0
+        for debut, fin, octets in sorted(remplacements, key=lambda r: r[0]):
+            reste = debut - pos
+            while reste > 0:
+                bloc = src.read(min(taille_bloc, reste))
+                if not bloc:
+                    break
+                dst.write(bloc)
+                reste -= len(bloc)
+            dst.write(octets)
+            src.seek(fin)
+            pos = fin
+        while True:
+            bloc = src.read(taille_bloc)
+            if not bloc:
+                break
+            dst.write(bloc)
+        taille = dst.tell()
+    os.replace(tmp, chemin)
+    return taille
+
+def entete_calendrier(prodid):
+    """Lignes d'en-tête d'un VCALENDAR (jusqu'avant le premier composant)."""
+    from icalendar import Calendar
+    cal = Calendar()
+    cal.add("prodid", prodid)
+    cal.add("version", "2.0")
+    return cal.to_ical().rsplit(b"END:VCALENDAR", 1)[0]
+
+
+def en_octets(evenement):
+    """Un événement brut (bytes ou EvenementICS) ou icalendar -> texte ICS."""
+    if isinstance(evenement, (bytes, bytearray)):
+        return bytes(evenement)
+    if isinstance(evenement, EvenementICS):
+        return evenement.brut
+    return evenement.to_ical()
+
+
+def ecrire_ics(chemin, prodid, evenements, entete=None):
+    """
+    Écrit le calendrier au fil de l'eau (fichier temporaire puis remplacement atomique).
+    `entete` : en-tête déjà sérialisé à réutiliser à la place de celui construit avec `prodid`.
+    Renvoie le nombre d'octets écrits.
+    """
+    tmp = chemin + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(entete if entete is not None else entete_calendrier(prodid))
+        for ev in evenements:
+            f.write(en_octets(ev))
+        f.write(b"END:VCALENDAR\r\n")
+        taille = f.tell()
+    os.replace(tmp, chemin)
+    return taille
@@ -0,0 +1,137 @@
+"""
+fusion_lot.py
+- Fusion en lot pour toute une promo : un manifeste (fusion_lot.json) liste les paires
+  (flux ADE d'une ressource, JSON Hyperplanning d'une classe) ; chaque paire est fusionnée
+  par MoteurFusion dans son propre dossier (sortie, historique gelé, état incrémental).
+- Les fusions tournent dans un pool de processus (un par cœur par défaut).
+- Un flux ADE partagé par plusieurs paires n'est lu qu'une fois, dans le processus
+  principal : les événements sont transmis une seule fois à chaque processus du pool
+  (initializer), pas à chaque fusion.
+- Un résumé (durée, événements, taux d'appariement) est affiché et écrit dans resume_lot.json.
+Usage : python fusion_lot.py [manifeste.json] [processus]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from modele_fusion import lire_ade
+from moteur_fusion import MoteurFusion
+
+# ---------------- CONFIG ----------------
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+MANIFESTE = os.path.join(DOSSIER, "fusion_lot.json")
+DOSSIER_SORTIE = "fusions"  # relatif au manifeste, sauf s'il en donne un autre
+RESUME_FILE = "resume_lot.json"
+JOURNAL_FILE = "sortie_fusion.txt"  # ce que la fusion d'une paire a affiché (dans son dossier)
+PROCESSUS = None  # None = un par cœur
+
+_ade_partages = {}  # dans chaque processus du pool : chemin ADE -> [CoursADE]
+
+
+def charger_manifeste(chemin=MANIFESTE):
+    """Paires du manifeste, chemins rendus absolus (relatifs au dossier du manifeste)."""
+    with open(chemin, "r", encoding="utf-8") as f:
+        manifeste = json.load(f)
+    racine = os.path.dirname(os.path.abspath(chemin))
+    paires = []
+    for p in manifeste["paires"]:
+        paires.append({"id": p["id"],
+                       "ade": os.path.join(racine, p["ade"]),
+                       "json": os.path.join(racine, p["json"])})
+    ids = [p["id"] for p in paires]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Manifeste : chaque paire doit avoir un id différent")
+    return paires, os.path.join(racine, manifeste.get("dossier_sortie", DOSSIER_SORTIE))
+
+
+def lire_ade_partages(paires):
+    """Chaque flux ADE distinct, lu une seule fois."""
+    return {chemin: lire_ade(chemin) for chemin in sorted({p["ade"] for p in paires})}
+
+
+def _initialiser(ade_partages):
+    _ade_partages.update(ade_partages)
+
+
+def fusionner_paire(paire, dossier_sortie):
+    """Fusion d'une paire dans son dossier ; renvoie la ligne de résumé (jamais d'exception)."""
+    dossier = os.path.join(dossier_sortie, paire["id"])
+    os.makedirs(dossier, exist_ok=True)
+    debut = time.perf_counter()
+    journal = io.StringIO()
+    resultat = {"id": paire["id"], "ade": os.path.basename(paire["ade"]),
+                "json": os.path.basename(paire["json"]), "pid": os.getpid()}
+    try:
+        with contextlib.redirect_stdout(journal):
+            moteur = MoteurFusion(dossier=dossier, ics_file=paire["ade"], json_file=paire["json"])
+            moteur.charger_ade(_ade_partages.get(paire["ade"]))
+            # Toujours fusionner : le résumé a besoin des statistiques d'appariement
+            moteur.executer(forcer=True)
+        s = moteur.stats_appariement
+        ades = s["match"] + s["sans_match"]
+        resultat.update(statut="ok", evenements=s["evenements"], match=s["match"],
+                        sans_match=s["sans_match"], orphelins=s["orphelins"],
+                        taux_match=round(s["match"] / ades, 4) if ades else None)
+    except Exception as e:
+        journal.write(traceback.format_exc())
+        resultat.update(statut="echec", erreur=f"{type(e).__name__}: {e}")
+    resultat["duree"] = round(time.perf_counter() - debut, 3)
+    with open(os.path.join(dossier, JOURNAL_FILE), "w", encoding="utf-8") as f:
+        f.write(journal.getvalue())
+    return resultat
+
+
+def executer_lot(manifeste=MANIFESTE, processus=PROCESSUS):
+    debut = time.perf_counter()
+    paires, dossier_sortie = charger_manifeste(manifeste)
+    ade_partages = lire_ade_partages(paires)
+    duree_lecture = time.perf_counter() - debut
+    print(f"📚 {len(paires)} paires, {len(ade_partages)} flux ADE distincts lus en {duree_lecture * 1000:.0f} ms")
+
+    resultats = []
+    with ProcessPoolExecutor(max_workers=processus, initializer=_initialiser,
+                             initargs=(ade_partages,)) as pool:
+        futurs = [pool.submit(fusionner_paire, p, dossier_sortie) for p in paires]
+        for futur in as_completed(futurs):
+            r = futur.result()
+            resultats.append(r)
+            if r["statut"] == "ok":
+                taux = "-" if r["taux_match"] is None else f"{100 * r['taux_match']:.1f} %"
+                print(f"  ✅ {r['id']:<16} {r['duree'] * 1000:7.0f} ms  {r['evenements']:5d} cours  match {taux}")
+            else:
+                print(f"  ❌ {r['id']:<16} {r['erreur']}")
+
+    resultats.sort(key=lambda r: r["id"])
+    duree = time.perf_counter() - debut
+    ok = [r for r in resultats if r["statut"] == "ok"]
+    resume = {
+        "duree_totale": round(duree, 3),
+        "duree_lecture_ade": round(duree_lecture, 3),
+        "processus": len({r["pid"] for r in resultats}),
+        "paires": len(paires),
+        "reussies": len(ok),
+        "match": sum(r["match"] for r in ok),
+        "sans_match": sum(r["sans_match"] for r in ok),
+        "resultats": resultats,
+    }
+    os.makedirs(dossier_sortie, exist_ok=True)
+    with open(os.path.join(dossier_sortie, RESUME_FILE), "w", encoding="utf-8") as f:
+        json.dump(resume, f, ensure_ascii=False, indent=2)
+
+    total_ade = resume["match"] + resume["sans_match"]
+    taux = f"{100 * resume['match'] / total_ade:.1f} %" if total_ade else "-"
+    print(f"\n📊 {len(ok)}/{len(paires)} fusions réussies en {duree:.2f} s "
+          f"({resume['processus']} processus), appariement global {taux}")
+    print(f"📝 Résumé : {os.path.join(dossier_sortie, RESUME_FILE)}")
+    return resume
+
+
+if __name__ == "__main__":
+    executer_lot(sys.argv[1] if len(sys.argv) > 1 else MANIFESTE,
+                 int(sys.argv[2]) if len(sys.argv) > 2 else PROCESSUS)
@@ -0,0 +1,124 @@
+"""
+historique_gele.py
+- Historique de la fusion gelé en segments mensuels : les VEVENT passés sont stockés une fois
+  pour toutes, déjà sérialisés, dans un fichier par mois (AAAA-MM.ics.part).
+- Les segments ne font que grossir (ajout en fin de fichier) ; la sortie est écrite en
+  recopiant leurs octets, sans jamais les relire ni les re-sérialiser.
+- La sortie commence toujours par les segments : on peut donc sauter directement à la
+  partie récente d'un planning_fusion.ics déjà écrit (voir debut_partie_recente).
+"""
+
+import json
+import mmap
+import os
+
+from flux_ics import DEBUT_VEVENT, iter_vevents_depuis
+
+TAILLE_QUEUE = 64  # octets de fin de segment gardés pour reconnaître une sortie déjà écrite
+
+
+class SegmentsHistorique:
+    """Segments mensuels de VEVENT passés + petit index (mois, taille, queue)."""
+
+    def __init__(self, dossier):
+        self.dossier = dossier
+        self.index_path = os.path.join(dossier, "index.json")
+        self.index = {"mois": [], "taille": 0, "queue": ""}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.index = json.load(f)
+                self.index.pop("gel_jusqu_au", None)  # ancien index : date de gel jamais relue
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Index de l'historique illisible, il sera reconstruit : {e}")
+
+    def reinitialiser(self):
+        """Oublie tous les segments (ils seront reconstruits depuis la sortie complète)."""
+        self.index = {"mois": [], "taille": 0, "queue": ""}
+        if os.path.isdir(self.dossier):
+            for nom in os.listdir(self.dossier):
+                if nom.endswith(".ics.part"):
+                    os.remove(os.path.join(self.dossier, nom))
+
+    def chemin_mois(self, mois):
+        return os.path.join(self.dossier, f"{mois}.ics.part")
+
+    def fichiers(self):
+        return [self.chemin_mois(m) for m in self.index["mois"]]
+
+    def signature(self):
+        """Identifie le contenu des segments sans les relire."""
+        return f"{self.index['taille']}|{self.index['queue']}"
+
+    def debut_partie_recente(self, mm):
+        """
+        Position, dans une sortie déjà écrite (mmap), du premier VEVENT après les segments,
+        ou None si la sortie ne commence pas par les segments actuels.
+        """
+        debut = mm.find(DEBUT_VEVENT)
+        if debut == -1:
+            return None if self.index["taille"] else len(mm)
+        fin = debut + self.index["taille"]
+        queue = bytes.fromhex(self.index["queue"])
+        if fin > len(mm) or mm[fin - len(queue):fin] != queue:
+            return None
+        suite = mm[fin:fin + len(DEBUT_VEVENT)]
+        if suite != DEBUT_VEVENT and not suite.startswith(b"END:"):
+            return None
+        return fin
+
+    def geler(self, evenements):
+        """Ajoute aux segments les événements passés [(date, texte ICS brut)], dans l'ordre."""
+        os.makedirs(self.dossier, exist_ok=True)
+        par_mois = {}
+        for d, brut in evenements:
+            par_mois.setdefault(f"{d:%Y-%m}", []).append(brut)
+
+        for mois in sorted(par_mois):
+            with open(self.chemin_mois(mois), "ab") as f:
+                for brut in par_mois[mois]:
+                    f.write(brut)
+            self.index["taille"] += sum(len(b) for b in par_mois[mois])
+            if mois not in self.index["mois"]:
+                self.index["mois"].append(mois)
+        self.index["mois"].sort()
+
+        if self.index["mois"]:
+            with open(self.chemin_mois(self.index["mois"][-1]), "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - TAILLE_QUEUE))
+                self.index["queue"] = f.read().hex()
+        self.sauver()
+        return sum(len(v) for v in par_mois.values())
+
+    def sauver(self):
+        os.makedirs(self.dossier, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self.index_path)
+
+    def octets(self, taille_bloc=1 << 16):
+        """Itère sur les octets des segments, mois par mois (pour l'écriture de la sortie)."""
+        for chemin in self.fichiers():
+            with open(chemin, "rb") as f:
+                while True:
+                    bloc = f.read(taille_bloc)
+                    if not bloc:
+                        break
+                    yield bloc
+
+
+def lire_partie_recente(chemin, segments):
+    """
+    Renvoie (partie_recente, complet) : les VEVENT de la sortie `chemin` qui suivent les
+    segments gelés. Si la sortie ne commence pas par les segments actuels, elle est lue en
+    entier et complet=True (les segments doivent alors être reconstruits).
+    """
+    if not os.path.exists(chemin) or os.path.getsize(chemin) == 0:
+        return [], False
+    with open(chemin, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        debut = segments.debut_partie_recente(mm)
+        complet = debut is None
+        evenements = list(iter_vevents_depuis(mm, 0 if complet else debut, champs=("DTSTART",)))
+    return evenements, complet
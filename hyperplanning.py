@@ -0,0 +1,504 @@
+"""
+hyperplanning.py
+- Scraping de l'emploi du temps Hyperplanning (hpesgt.cnam.fr) pour une ou plusieurs classes.
+- SessionHyperplanning : toute la logique liée à un navigateur (attentes, lecture des dates,
+  extraction des blocs), sans variable globale, pour pouvoir en faire tourner plusieurs.
+- PoolNavigateurs : pool borné de Chrome headless réutilisés d'un job à l'autre.
+- scraper_classes : répartit des jobs (classe, plage de semaines) sur le pool et écrit
+  un JSON par classe (edt_<classe>_complet.json).
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from cache_semaines import (
+    charger_cache, sauver_cache, cle_semaine, doit_rescraper,
+    enregistrer_semaine, purger, reconstruire_edt,
+)
+
+URL_HYPERPLANNING = "https://hpesgt.cnam.fr/hp/invite"
+
+# Attentes : on attend des conditions concrètes avec des timeouts courts
+TIMEOUT_ATTENTE = 10  # secondes max pour une condition
+INTERVALLE_POLL = 0.2  # secondes entre deux vérifications
+POLLS_STABLES = 3  # nb de vérifications identiques pour considérer la grille stable
+
+ID_CHAMP_CLASSE = "GInterface.Instances[1].Instances[1].bouton_Edit"
+ID_CALENDRIER = "GInterface.Instances[1].Instances[3]_Div_Calendrier"
+SELECTEUR_ENTETES = "div[id^='id_38_titreTranche']"
+SELECTEUR_BLOCS = "div.EmploiDuTemps_Element"
+
+jours_map = {
+    -1: "Lundi",
+    304: "Mardi",
+    609: "Mercredi",
+    914: "Jeudi",
+    1219: "Vendredi"
+}
+
+jours_ordres = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi"]
+
+mois_map = {
+    "janvier": 1, "février": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
+    "juillet": 7, "août": 8, "septembre": 9, "octobre": 10,
+    "novembre": 11, "décembre": 12
+}
+
+# Extraction groupée : un seul execute_script renvoie, en JSON, tous les blocs de la
+# semaine (horaire, style, label, lignes de contenu) et les textes des entêtes de jours.
+# Évite des centaines d'allers-retours WebDriver (find_element / get_attribute / .text).
+EXTRACTION_GROUPEE = True
+
+JS_EXTRACTION_SEMAINE = """
+const texte = e => (e && e.innerText) || '';
+const blocs = [];
+for (const bloc of document.querySelectorAll(arguments[0])) {
+    const cs = bloc.querySelector('div.cours-simple');
+    if (!cs) continue;
+    blocs.push({
+        horaire: (cs.getAttribute('title') || '').trim(),
+        style: bloc.getAttribute('style') || '',
+        label: texte(cs.querySelector('label')).trim(),
+        contenus: Array.from(cs.querySelectorAll('div.contenu')).map(c => texte(c).trim())
+    });
+}
+const entetes = Array.from(document.querySelectorAll(arguments[1])).map(texte);
+return JSON.stringify({blocs: blocs, entetes: entetes});
+"""
+
+
+def creer_driver():
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--start-maximized")
+    return webdriver.Chrome(options=options)
+
+
+# ---------------- TRAITEMENT PYTHON (sans navigateur) ----------------
+
+def trouver_jour(style):
+    match = re.search(r"left:\s*(-?\d+)px", style)
+    if match:
+        left_val = int(match.group(1))
+        for val, jour in jours_map.items():
+            if abs(left_val - val) <= 15:
+                return jour
+    return "Inconnu"
+
+def classer_contenus(nom_cours, contenus):
+    """Sépare les lignes de contenu d'un bloc en (prof, salle)."""
+    prof = ""
+    salle = ""
+    for txt in contenus:
+        txt = txt.strip()
+        if not txt or txt == nom_cours:
+            continue
+        if re.search(r"\b(Salle|Amphi)\b", txt, re.I):
+            salle = txt
+        elif not prof:
+            prof = txt
+    return prof, salle
+
+def construire_cours(semaine_num, dates_jours, horaire, style, nom_cours, contenus):
+    jour = trouver_jour(style)
+    prof, salle = classer_contenus(nom_cours, contenus)
+    return {
+        "semaine": semaine_num,
+        "jour": jour,
+        "date": dates_jours.get(jour, ""),
+        "horaire": horaire,
+        "cours": nom_cours,
+        "professeur": prof,
+        "salle": salle
+    }
+
+
+# ---------------- SESSION (un navigateur) ----------------
+
+class SessionHyperplanning:
+    """Pilote un navigateur sur Hyperplanning. L'état de passage d'année est propre à la session."""
+
+    def __init__(self, driver, prefixe=""):
+        self.driver = driver
+        self.prefixe = prefixe  # préfixe des messages (utile quand plusieurs sessions tournent)
+        self.annee_courante = None
+        self.dernier_mois = None
+
+    def log(self, *args):
+        if self.prefixe:
+            args = (self.prefixe,) + args
+        print(*args)
+
+    # --- Attentes ---
+
+    def attendre(self, condition, timeout=TIMEOUT_ATTENTE, message=""):
+        """WebDriverWait avec un poll court ; renvoie None au lieu de lever en cas de timeout."""
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=INTERVALLE_POLL).until(condition, message)
+        except TimeoutException:
+            self.log(f"⚠️ Timeout ({timeout}s) : {message}")
+            return None
+
+    def attendre_champ_classe(self):
+        """Attend que le champ de saisie de la classe soit présent."""
+        return self.attendre(EC.presence_of_element_located((By.ID, ID_CHAMP_CLASSE)),
+                             message="champ de sélection de classe")
+
+    def textes_entetes(self):
+        """Textes des entêtes de jours (un seul aller-retour WebDriver)."""
+        return tuple(self.driver.execute_script(
+            "return Array.from(document.querySelectorAll(arguments[0]))"
+            ".map(e => (e.innerText || '').trim());",
+            SELECTEUR_ENTETES,
+        ) or ())
+
+    def attendre_entetes(self, anciennes=None):
+        """Attend que les entêtes de jours soient affichés et différents de `anciennes`."""
+        def pretes(_):
+            actuelles = self.textes_entetes()
+            if any(actuelles) and actuelles != anciennes:
+                return actuelles
+            return False
+        return self.attendre(pretes, message="dates de la semaine dans les entêtes")
+
+    def attendre_blocs_stables(self):
+        """Attend que le nombre de blocs de cours ne change plus pendant POLLS_STABLES polls."""
+        etat = {"dernier": -1, "stables": 0}
+        def stable(_):
+            n = self.driver.execute_script(
+                "return document.querySelectorAll(arguments[0]).length;", SELECTEUR_BLOCS)
+            if n == etat["dernier"]:
+                etat["stables"] += 1
+            else:
+                etat["dernier"], etat["stables"] = n, 0
+            return etat["stables"] >= POLLS_STABLES
+        self.attendre(stable, message="stabilisation des blocs de cours")
+        return etat["dernier"]
+
+    # --- Navigation ---
+
+    def ouvrir_classe(self, classe):
+        """Charge la page d'accueil et sélectionne la classe. Renvoie les entêtes affichés."""
+        self.log("-> Ouverture du site...")
+        self.driver.get(URL_HYPERPLANNING)
+        self.annee_courante = None
+        self.dernier_mois = None
+        champ = self.attendre_champ_classe() or self.driver.find_element(By.ID, ID_CHAMP_CLASSE)
+
+        self.log(f"-> Sélection de la classe {classe}...")
+        champ.clear()
+        champ.send_keys(classe)
+        self.attendre(lambda d: champ.get_attribute("value") == classe, timeout=2,
+                      message="saisie de la classe")
+        champ.send_keys(Keys.ENTER)
+        return self.attendre_entetes()
+
+    def semaine_suivante(self, entetes):
+        """Passe à la semaine suivante et attend que les entêtes affichent ses dates."""
+        try:
+            self.driver.find_element(By.ID, ID_CALENDRIER).send_keys(Keys.ARROW_RIGHT)
+            self.log("→ Passage à la semaine suivante...")
+        except Exception:
+            self.log("⚠️ ARROW_RIGHT échoué, tentative via body")
+            try:
+                body = self.driver.find_element(By.TAG_NAME, "body")
+                body.send_keys(Keys.ARROW_RIGHT)
+            except Exception as e:
+                self.log("Échec du changement de semaine :", e)
+        return self.attendre_entetes(entetes) or entetes
+
+    # --- Lecture ---
+
+    def extraire_donnees_semaine(self):
+        """Récupère blocs et entêtes de la semaine affichée en un seul aller-retour."""
+        brut = self.driver.execute_script(JS_EXTRACTION_SEMAINE, SELECTEUR_BLOCS, SELECTEUR_ENTETES)
+        return json.loads(brut or '{"blocs": [], "entetes": []}')
+
+    def lire_dates_semaine(self, textes_titres=None):
+        """Associe chaque jour affiché à sa date. `textes_titres` : textes des entêtes déjà lus."""
+        dates = {}
+        try:
+            if textes_titres is None:
+                titres = self.driver.find_elements(By.CSS_SELECTOR, SELECTEUR_ENTETES)
+                textes_titres = [titre.text for titre in titres]
+
+            if self.annee_courante is None:
+                self.annee_courante = datetime.now().year
+                self.dernier_mois = None
+
+            for titre_txt in textes_titres:
+                txt = titre_txt.strip().replace("\n", " ")
+                if not txt:
+                    continue
+
+                m = re.search(r"(\d{1,2})\s+([a-zéû]+)", txt, re.I)
+                if not m:
+                    continue
+
+                jour_num, mois_txt = m.groups()
+                mois_num = mois_map.get(mois_txt.lower())
+                if mois_num is None:
+                    continue
+
+                # ✅ passage décembre → janvier (UNE SEULE FOIS)
+                if self.dernier_mois is not None and mois_num < self.dernier_mois:
+                    self.annee_courante += 1
+
+                self.dernier_mois = mois_num
+
+                date_obj = datetime(self.annee_courante, mois_num, int(jour_num))
+
+                jour_nom = titre_txt.split('.')[0].capitalize()
+                jour_complet = next(
+                    (j for j in jours_ordres if j.lower().startswith(jour_nom.lower())),
+                    jour_nom
+                )
+
+                dates[jour_complet] = date_obj.strftime("%Y-%m-%d")
+
+            self.log("Dates détectées pour la semaine :", dates)
+
+        except Exception as e:
+            self.log("⚠️ Erreur lors de la lecture des dates :", e)
+
+        return dates
+
+    def extraire_cours_pour_semaine(self, edt_list, semaine_num, dates_jours=None):
+        """Extrait les cours de la semaine affichée (dates_jours : dates déjà lues, sinon lues ici)"""
+        # Descend en bas de la grille pour forcer le rendu, puis attend qu'elle soit stable
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        self.attendre_blocs_stables()
+
+        if EXTRACTION_GROUPEE:
+            try:
+                donnees = self.extraire_donnees_semaine()
+            except Exception as e:
+                self.log("⚠️ Extraction groupée échouée, passage en mode élément par élément :", e)
+            else:
+                if dates_jours is None:
+                    dates_jours = self.lire_dates_semaine(donnees["entetes"])
+                self.log(f"-> {len(donnees['blocs'])} blocs détectés pour la semaine {semaine_num}")
+                for b in donnees["blocs"]:
+                    edt_list.append(construire_cours(
+                        semaine_num, dates_jours, b["horaire"], b["style"], b["label"], b["contenus"]
+                    ))
+                return
+
+        if dates_jours is None:
+            dates_jours = self.lire_dates_semaine()
+
+        cours_elements = self.driver.find_elements(By.CSS_SELECTOR, SELECTEUR_BLOCS)
+        self.log(f"-> {len(cours_elements)} blocs détectés pour la semaine {semaine_num}")
+
+        for bloc in cours_elements:
+            try:
+                cours_simple = bloc.find_element(By.CSS_SELECTOR, "div.cours-simple")
+                horaire = cours_simple.get_attribute("title").strip()
+                style = bloc.get_attribute("style")
+                contenus = cours_simple.find_elements(By.CSS_SELECTOR, "div.contenu")
+                labels = cours_simple.find_elements(By.TAG_NAME, "label")
+
+                nom_cours = labels[0].text.strip() if labels else ""
+
+                edt_list.append(construire_cours(
+                    semaine_num, dates_jours, horaire, style, nom_cours, [c.text for c in contenus]
+                ))
+
+            except Exception:
+                continue
+
+    # --- Plage de semaines ---
+
+    def scraper_semaines(self, classe, debut, nb, cache, verrou=None):
+        """
+        Scrape les semaines [debut, debut + nb) de la classe (0 = semaine courante),
+        en s'appuyant sur le cache. Renvoie (cours_sans_date, durees_par_semaine).
+        """
+        verrou = verrou or threading.Lock()
+        entetes = self.ouvrir_classe(classe)
+
+        # On avance jusqu'à la première semaine du job en suivant le passage d'année
+        for _ in range(debut):
+            self.lire_dates_semaine(entetes)
+            entetes = self.semaine_suivante(entetes)
+
+        cours_sans_date = []
+        durees = {}
+        for i in range(debut, debut + nb):
+            debut_semaine = time.perf_counter()
+            if i > debut:
+                entetes = self.semaine_suivante(entetes)
+            self.log(f"\n=== {classe} : récupération de la semaine {i+1} ===")
+            dates_jours = self.lire_dates_semaine(self.textes_entetes())
+            cle = cle_semaine(dates_jours)
+
+            with verrou:
+                fraiche = cle and not doit_rescraper(cache, cle)
+            if fraiche:
+                self.log(f"💾 Semaine du {cle} encore fraîche dans le cache, pas de scraping.")
+            else:
+                cours_semaine = []
+                self.extraire_cours_pour_semaine(cours_semaine, i+1, dates_jours)
+                if cle:
+                    with verrou:
+                        change = enregistrer_semaine(cache, cle, cours_semaine)
+                    self.log(f"🔄 Semaine du {cle} modifiée." if change else f"= Semaine du {cle} inchangée.")
+                else:
+                    # Dates illisibles : on garde les cours mais sans les mettre en cache
+                    cours_sans_date.extend(cours_semaine)
+
+            durees[i+1] = time.perf_counter() - debut_semaine
+            self.log(f"⏱️ Semaine {i+1} chargée et extraite en {durees[i+1]:.2f}s")
+
+        return cours_sans_date, durees
+
+
+# ---------------- POOL DE NAVIGATEURS ----------------
+
+class PoolNavigateurs:
+    """
+    Pool borné de drivers Chrome, créés à la demande et réutilisés d'un job à l'autre.
+    Un driver dont le job a levé une exception (navigateur planté ou bloqué) est fermé
+    au lieu d'être rendu : sa place est libérée et un nouveau driver sera créé.
+    """
+
+    def __init__(self, taille, fabrique=creer_driver):
+        self.taille = taille
+        self.fabrique = fabrique
+        self.libres = queue.Queue()  # drivers disponibles ; None = place libre, driver à créer
+        self.tous = []
+        self.verrou = threading.Lock()
+
+    def _creer(self):
+        with self.verrou:
+            driver = self.fabrique()
+            self.tous.append(driver)
+        return driver
+
+    def _jeter(self, driver):
+        with self.verrou:
+            if driver in self.tous:
+                self.tous.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self.libres.put(None)
+
+    @contextmanager
+    def acquerir(self):
+        driver = None
+        try:
+            driver = self.libres.get_nowait()
+        except queue.Empty:
+            with self.verrou:
+                if len(self.tous) < self.taille:
+                    driver = self.fabrique()
+                    self.tous.append(driver)
+            if driver is None:
+                driver = self.libres.get()
+        if driver is None:
+            # Place laissée par un driver jeté
+            try:
+                driver = self._creer()
+            except BaseException:
+                self.libres.put(None)
+                raise
+        try:
+            yield driver
+        except BaseException:
+            self._jeter(driver)
+            raise
+        self.libres.put(driver)
+
+    def fermer(self):
+        for driver in self.tous:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.tous = []
+
+
+# ---------------- PLUSIEURS CLASSES ----------------
+
+def chemin_sortie(dossier, classe):
+    return os.path.join(dossier, f"edt_{classe}_complet.json")
+
+def chemin_cache(dossier, classe):
+    return os.path.join(dossier, f"cache_semaines_{classe}.json")
+
+def decouper_jobs(classes, n_semaines, semaines_par_job):
+    """Liste des jobs (classe, première semaine, nb de semaines)."""
+    jobs = []
+    for classe in classes:
+        for debut in range(0, n_semaines, semaines_par_job):
+            jobs.append((classe, debut, min(semaines_par_job, n_semaines - debut)))
+    return jobs
+
+def scraper_classes(classes, dossier_sortie, n_semaines=8, taille_pool=3, semaines_par_job=4):
+    """
+    Scrape plusieurs classes en parallèle sur un pool de `taille_pool` navigateurs.
+    Écrit un JSON par classe dans `dossier_sortie`. Renvoie {classe: nb de cours}.
+    """
+    jobs = decouper_jobs(classes, n_semaines, semaines_par_job)
+    caches = {c: charger_cache(chemin_cache(dossier_sortie, c)) for c in classes}
+    verrous = {c: threading.Lock() for c in classes}
+    sans_date = {c: [] for c in classes}
+    pool = PoolNavigateurs(min(taille_pool, len(jobs)) or 1)
+
+    def executer(job):
+        classe, debut, nb = job
+        with pool.acquerir() as driver:
+            session = SessionHyperplanning(driver, prefixe=f"[{classe} S{debut+1}-{debut+nb}]")
+            return session.scraper_semaines(classe, debut, nb, caches[classe], verrous[classe])
+
+    debut_total = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=pool.taille) as executeur:
+            futurs = {executeur.submit(executer, job): job for job in jobs}
+            for fut in as_completed(futurs):
+                classe, debut, nb = futurs[fut]
+                try:
+                    cours, durees = fut.result()
+                    sans_date[classe].extend(cours)
+                    print(f"✅ {classe} semaines {debut+1}-{debut+nb} en {sum(durees.values()):.1f}s")
+                except Exception as e:
+                    print(f"⚠️ Échec du job {classe} semaines {debut+1}-{debut+nb} : {e}")
+    finally:
+        pool.fermer()
+
+    os.makedirs(dossier_sortie, exist_ok=True)
+    resultats = {}
+    for classe in classes:
+        purger(caches[classe], n_semaines=n_semaines)
+        sauver_cache(caches[classe], chemin_cache(dossier_sortie, classe))
+
+        # Le JSON de la fusion est reconstruit à partir des semaines en cache
+        edt_total = reconstruire_edt(caches[classe], n_semaines=n_semaines) + sans_date[classe]
+        with open(chemin_sortie(dossier_sortie, classe), "w", encoding="utf-8") as f:
+            json.dump(edt_total, f, ensure_ascii=False, indent=2)
+        resultats[classe] = len(edt_total)
+        print(f"💾 {classe} : {len(edt_total)} cours enregistrés dans {chemin_sortie(dossier_sortie, classe)}")
+
+    print(f"⏱️ {len(jobs)} jobs sur {pool.taille} navigateur(s) en {time.perf_counter() - debut_total:.1f}s")
+    return resultats
@@ -1,263 +1,252 @@
 import requests
-from bs4 import BeautifulSoup
-from icalendar import Calendar, Event
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta, time, date
 import re
 import os
+import time as chrono
+from concurrent.futures import ThreadPoolExecutor
+import sys
 import pytz
+from flux_ics import iter_vevents, ecrire_ics, evenement_depuis_octets
+from cache_ics import CacheICS
+from extraction_menus import extraire, clean_text, parse_date, type_repas
+from creneaux_libres import Activite, Occupation
+from filtres_texte import regles_restaurant
+from cache_menus import (charger_cache, sauver_cache, entree_valide, entetes_conditionnels,
+                         nouvelle_entree, hash_contenu, menus_a_venir, purger, VERSION_EXTRACTION)
 
 # --- CONFIGURATION ---
 WORK_DIR = r"C:\Users\Administrateur\Desktop\Script_Hyperplanning"
 ICS_FILE = os.path.join(WORK_DIR, "planning_fusion.ics")
+CACHE_ICS_FILE = os.path.join(WORK_DIR, "cache_ics_menus.json.gz")  # repas déjà sérialisés
+CACHE_MENUS_FILE = os.path.join(WORK_DIR, "cache_menus.json")  # pages CROUS + menus extraits
+MODE_HORS_LIGNE = False  # True (ou --hors-ligne) : menus construits uniquement depuis le cache
 
 TZ = pytz.timezone('Europe/Paris')
-TODAY = datetime.now(TZ).date()
+# La date du jour est lue à chaque passage (etape_menus / main), pas à l'import :
+# l'étape tourne aussi dans des processus qui passent minuit (démon, fusion_lot)
 
 RESTAURANTS = [
     { "name": "Resto U' Vaurouzé", "url": "https://www.crous-nantes.fr/restaurant/resto-u-vaurouze/" },
     { "name": "Resto U' Bartholdi", "url": "https://www.crous-nantes.fr/restaurant/resto-u-bartholdi/" }
 ]
 
-MOIS = {
-    "janvier": 1, "février": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
-    "juillet": 7, "août": 8, "septembre": 9, "octobre": 10, "novembre": 11, "décembre": 12
+# Téléchargement des pages : toutes en parallèle, avec une session partagée (keep-alive)
+TIMEOUT_HTTP = (5, 15)  # (connexion, lecture) en secondes
+TENTATIVES_MAX = 3  # nouvelles tentatives après une erreur réseau ou une réponse 429 / 5xx
+BACKOFF_SECONDES = 1.0  # urllib3 : 1er nouvel essai immédiat, puis 2 s, 4 s... entre les essais
+TELECHARGEMENTS_SIMULTANES = 8
+
+session = requests.Session()
+session.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=TELECHARGEMENTS_SIMULTANES,
+    max_retries=Retry(total=TENTATIVES_MAX, backoff_factor=BACKOFF_SECONDES,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",),
+                      raise_on_status=False)))
+session.headers.update({'User-Agent': 'Mozilla/5.0'})
+
+# Placement des repas (voir creneaux_libres.py) : 45 min, à 5 min des cours voisins,
+# raccourci s'il le faut pour tenir avant le cours suivant
+ACTIVITES_REPAS = {
+    "midi": Activite("midi", time(11, 0), time(13, 45), duree=45, marge=5, au_plus_tot=time(11, 45), duree_min=1),
+    "soir": Activite("soir", time(18, 30), time(20, 0), duree=45, marge=5, duree_min=1),
 }
 
-# --- LISTES DE FILTRAGE (BANLISTS) ---
-
-# 1. Éléments à supprimer pour Vaurouzé (Midi et Soir)
-# J'ai ajouté les variantes avec et sans parenthèses pour être sûr
-VAUROUZE_GLOBAL_BANLIST = [
-    "pizza margherita", "pizza 4 fromages", "pizza poulet curry", "pizza kebab",
-    "pasta box", "pasta box carbonara", "pasta box poulet curry",
-    "beignet", "french touch burger boeuf", "tacos poulet curry", "frites", 
-    "--- kiosque ou etage (à emporter ou sur place) ---", # Ancienne version
-    "--- kiosque ou etage à emporter ou sur place ---",   # NOUVELLE VERSION (SANS PARENTHÈSES)
-    "--- petit vaurouze rdc sur place ou à emporter ---" 
-]
-
-# 2. Information Bartholdi
-BARTHOLDI_INFO_BANLIST = [
-    "--- information ---", "rappel :", "3 éléments (entrée +plat +dessert) et 1 morceau de pain",
-    "pas de pichet à disposition possibilité de prendre une gourde",
-    "nous n'acceptons pas la nourriture personnelle",
-    "moyen de paiement est votre compte izly", "merci de votre compréhension"
-]
-
-def clean_text(text):
-    return re.sub(r'\s+', ' ', text).strip()
-
 def get_aware_datetime(dt):
     if not isinstance(dt, datetime): dt = datetime.combine(dt, time.min)
     if dt.tzinfo is None or dt.tzinfo.utcoffset(dt) is None: return TZ.localize(dt)
     return dt.astimezone(TZ)
 
-def parse_date(date_text):
-    text = date_text.lower().replace("menu du", "").replace(",", "").strip()
-    parts = text.split()
+def load_calendar_data(filepath, today):
+    if not os.path.exists(filepath): return Occupation(), [], set()
+
+    # Lecture en flux : les événements conservés sont recopiés tels quels (texte ICS brut)
     try:
-        day_index = -1
-        for i, p in enumerate(parts):
-            if p.isdigit() and 1 <= int(p) <= 31:
-                day_index = i
-                break
-        if day_index == -1: return None
-        day = int(parts[day_index])
-        month_str = parts[day_index + 1]
-        year = int(parts[day_index + 2])
-        if month_str not in MOIS: return None
-        return datetime(year, MOIS[month_str], day)
-    except: return None
-
-def load_calendar_data(filepath):
-    busy_slots = {} 
+        return analyser_evenements(iter_vevents(filepath, champs=("SUMMARY", "DTSTART", "DTEND")), today)
+    except: return Occupation(), [], set()
+
+def analyser_evenements(components, today):
+    """Créneaux occupés (Occupation), événements à garder (repas futurs retirés) et jours de vacances."""
+    busy_slots = []
     existing_events = []
     vacation_days = set()
 
-    if not os.path.exists(filepath): return busy_slots, existing_events, vacation_days
-
-    with open(filepath, 'rb') as f:
-        try: cal = Calendar.from_ical(f.read())
-        except: return busy_slots, existing_events, vacation_days
-
-    for component in cal.walk():
-        if component.name == "VEVENT":
-            summary = str(component.get('summary', '')).lower()
+    for component in components:
+        summary = component.summary.lower()
+        
+        # Gestion Vacances
+        if "vacances" in summary:
+            dtstart = component.dtstart
+            dtend = component.dtend
+            if isinstance(dtstart, datetime): start_d = dtstart.date()
+            else: start_d = dtstart
+            if isinstance(dtend, datetime): end_d = dtend.date()
+            else: end_d = start_d + timedelta(days=1)
             
-            # Gestion Vacances
-            if "vacances" in summary:
-                dtstart = component.get('dtstart').dt
-                dtend = component.get('dtend').dt
-                if isinstance(dtstart, datetime): start_d = dtstart.date()
-                else: start_d = dtstart
-                if isinstance(dtend, datetime): end_d = dtend.date()
-                else: end_d = start_d + timedelta(days=1)
-                
-                curr = start_d
-                while curr < end_d:
-                    vacation_days.add(curr.strftime('%Y-%m-%d'))
-                    curr += timedelta(days=1)
-                existing_events.append(component)
-                continue
-
-            # Gestion Historique
-            if "🍽️" in summary or "resto u'" in summary:
-                dtstart = component.get('dtstart').dt
-                if isinstance(dtstart, datetime):
-                    event_date = dtstart.astimezone(TZ).date() if dtstart.tzinfo else dtstart.date()
-                else: event_date = dtstart
-                if event_date < TODAY: existing_events.append(component)
-                continue
-            
-            # Gestion Cours
+            curr = start_d
+            while curr < end_d:
+                vacation_days.add(curr.strftime('%Y-%m-%d'))
+                curr += timedelta(days=1)
             existing_events.append(component)
-            dtstart = component.get('dtstart').dt
-            dtend = component.get('dtend').dt
-            if not isinstance(dtstart, datetime): continue 
-            dtstart = get_aware_datetime(dtstart)
-            dtend = get_aware_datetime(dtend)
-            day_key = dtstart.strftime('%Y-%m-%d')
-            if day_key not in busy_slots: busy_slots[day_key] = []
-            busy_slots[day_key].append((dtstart, dtend))
-
-    for day in busy_slots: busy_slots[day].sort(key=lambda x: x[0])
-    return busy_slots, existing_events, vacation_days
-
-def calculate_smart_slot(date_obj, meal_type, busy_slots_today):
-    if meal_type == "midi":
-        open_time = TZ.localize(datetime.combine(date_obj, time(11, 0)))
-        close_time = TZ.localize(datetime.combine(date_obj, time(13, 45)))
-        default_start = TZ.localize(datetime.combine(date_obj, time(11, 45)))
+            continue
+
+        # Gestion Historique
+        if "🍽️" in summary or "resto u'" in summary:
+            dtstart = component.dtstart
+            if isinstance(dtstart, datetime):
+                event_date = dtstart.astimezone(TZ).date() if dtstart.tzinfo else dtstart.date()
+            else: event_date = dtstart
+            if event_date < today: existing_events.append(component)
+            continue
+        
+        # Gestion Cours
+        existing_events.append(component)
+        dtstart = component.dtstart
+        dtend = component.dtend
+        if not isinstance(dtstart, datetime): continue 
+        busy_slots.append((get_aware_datetime(dtstart), get_aware_datetime(dtend)))
+
+    return Occupation.depuis_datetimes(busy_slots), existing_events, vacation_days
+
+def calculate_smart_slot(date_obj, meal_type, occupation):
+    """Premier créneau libre pour le repas ce jour-là (début, fin), ou None."""
+    return ACTIVITES_REPAS[meal_type].fenetre(date_obj, occupation, TZ)
+
+def telecharger_page(resto, entree):
+    """
+    GET conditionnel de la page du restaurant (ETag / Last-Modified du cache).
+    Renvoie (reponse, contenu) : contenu None si 304 ou erreur, reponse None si injoignable.
+    """
+    entetes = entetes_conditionnels(entree) if entree_valide(entree) else {}
+    debut = chrono.perf_counter()
+    try:
+        r = session.get(resto['url'], headers=entetes, timeout=TIMEOUT_HTTP)
+    except requests.RequestException as e:
+        print(f"Erreur : {resto['name']} injoignable ({e})")
+        return None, None
+    print(f"🌐 {resto['name']} : HTTP {r.status_code} en {chrono.perf_counter() - debut:.1f}s")
+    return r, (r.content if r.status_code == 200 else None)
+
+def extraire_menus(contenu):
+    """Menus d'une page : [{"date": "AAAA-MM-JJ", "repas": nom du repas, "categories": [[titre, [plats]]]}]."""
+    return [m.vers_dict() for m in extraire(contenu)]
+
+def menus_restaurant(resto, entree, today, hors_ligne=False):
+    """
+    Menus à venir du restaurant et entrée de cache mise à jour. Page inchangée (304 ou
+    même hash) : menus repris du cache, sans parser la page.
+    """
+    if hors_ligne:
+        return (menus_a_venir(entree, today) if entree else []), entree
+
+    r, contenu = telecharger_page(resto, entree or {})
+    if r is not None and r.status_code == 304 and entree_valide(entree):
+        entree["verifie_le"] = datetime.now().isoformat(timespec="seconds")
+        return menus_a_venir(entree, today), entree
+
+    if contenu is None:
+        # Page indisponible : on se rabat sur la dernière version connue
+        if entree and entree.get("version") == VERSION_EXTRACTION:
+            print(f"📦 {resto['name']} : menus repris du cache")
+            return menus_a_venir(entree, today), entree
+        return [], entree
+
+    if entree and entree.get("version") == VERSION_EXTRACTION and entree["sha256"] == hash_contenu(contenu):
+        entree = nouvelle_entree(r, contenu, entree["menus"])
     else:
-        open_time = TZ.localize(datetime.combine(date_obj, time(18, 30)))
-        close_time = TZ.localize(datetime.combine(date_obj, time(20, 0)))
-        default_start = open_time 
-
-    last_event_before = None
-    first_event_after = None
-
-    for start, end in busy_slots_today:
-        if end <= close_time and end >= open_time - timedelta(hours=3): 
-            if last_event_before is None or end > last_event_before: last_event_before = end
-        if start >= open_time:
-            if first_event_after is None or start < first_event_after: first_event_after = start
-
-    meal_start = default_start
-    if meal_type == "midi":
-        if last_event_before:
-            potential_start = last_event_before + timedelta(minutes=5)
-            if potential_start < default_start: meal_start = default_start
-            else: meal_start = potential_start
+        entree = nouvelle_entree(r, contenu, extraire_menus(contenu))
+    return menus_a_venir(entree, today), entree
+
+def construire_repas(resto, menu, occupation, cache):
+    """Texte ICS du repas (filtré et placé dans un créneau libre), ou None."""
+    current_date = datetime.strptime(menu["date"], '%Y-%m-%d')
+    day_key = menu["date"]
+    meal_name = menu["repas"]
+    meal_type = type_repas(meal_name)
+
+    raw_lines = []
+    for cat_title, items in menu["categories"]:
+        if cat_title: raw_lines.append(f"--- {cat_title.upper()} ---")
+        for it in items:
+            raw_lines.append(f"• {it}")
+
+    # Règles Vaurouzé / Bartholdi (plats et en-têtes retirés, arrêt) : voir filtres_texte.json
+    final_lines = regles_restaurant(resto['name'], meal_type).filtrer(raw_lines)
+
+    # Si vide après nettoyage, on ignore l'événement
+    real_content = [l for l in final_lines if l.startswith("•")]
+    if not real_content:
+        return None
+
+    # --- Création Event ---
+    slot = calculate_smart_slot(current_date.date(), meal_type, occupation)
+    if not slot: return None
     
-    if meal_start >= close_time: return None
-    meal_end = meal_start + timedelta(minutes=45)
-    if first_event_after:
-        max_end = first_event_after - timedelta(minutes=5)
-        if max_end < meal_end: meal_end = max_end
-
-    if meal_end > close_time: meal_end = close_time
-    if meal_start >= meal_end: return None
-    return meal_start, meal_end
+    return cache.evenement([
+        ('summary', f"🍽️ {resto['name']} ({meal_name.capitalize()})"),
+        ('description', "\n".join(final_lines).strip()),
+        ('location', resto['name']),
+        ('dtstart', slot[0]),
+        ('dtend', slot[1]),
+        ('uid', f"{day_key}_{resto['name'].replace(' ','')}_{meal_type}"),
+    ])
+
+def recuperer_repas(occupation, cache, today, hors_ligne=MODE_HORS_LIGNE):
+    """Repas des restaurants (texte ICS) placés dans les créneaux libres de `occupation`."""
+    cache_pages = charger_cache(CACHE_MENUS_FILE)
+
+    # Toutes les pages en parallèle : la durée est celle du restaurant le plus lent
+    def traiter(resto):
+        return menus_restaurant(resto, cache_pages.get(resto['url']), today, hors_ligne)
+    with ThreadPoolExecutor(max_workers=max(1, min(TELECHARGEMENTS_SIMULTANES, len(RESTAURANTS)))) as pool:
+        resultats = list(pool.map(traiter, RESTAURANTS))
+
+    if not hors_ligne:
+        for resto, (_, entree) in zip(RESTAURANTS, resultats):
+            if entree: cache_pages[resto['url']] = entree
+        purger(cache_pages, today)
+        sauver_cache(cache_pages, CACHE_MENUS_FILE)
+
+    repas = []
+    for resto, (menus, _) in zip(RESTAURANTS, resultats):
+        try:
+            for menu in menus:
+                ics = construire_repas(resto, menu, occupation, cache)
+                if ics: repas.append(ics)
+        except Exception as e:
+            print(f"Erreur : {e}")
+    return repas
+
+def etape_menus(flux):
+    """Étape de transformation (voir transformations.py) : remplace les repas futurs du flux."""
+    today = datetime.now(TZ).date()
+    occupation, events_to_keep, vacation_days = analyser_evenements(flux.evenements, today)
+    cache = CacheICS(CACHE_ICS_FILE)
+    repas = recuperer_repas(occupation, cache, today, MODE_HORS_LIGNE)
+    cache.sauver()
+    print(cache.rapport())
+    flux.evenements = events_to_keep + [evenement_depuis_octets(r) for r in repas]
+    print(f"✅ {len(repas)} repas ajoutés.")
 
 def main():
     print(f"--- Ajout Menus (Nettoyage Entête Varouzé Soir) ---")
     
-    busy_slots, events_to_keep, vacation_days = load_calendar_data(ICS_FILE)
+    today = datetime.now(TZ).date()
+    occupation, events_to_keep, vacation_days = load_calendar_data(ICS_FILE, today)
     
-    cal = Calendar()
-    cal.add('prodid', '-//Smart CROUS Menu//mxm.dk//')
-    cal.add('version', '2.0')
-    for ev in events_to_keep: cal.add_component(ev)
-
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    count_added = 0
-
-    for resto in RESTAURANTS:
-        try:
-            r = requests.get(resto['url'], headers=headers)
-            if r.status_code != 200: continue
-            soup = BeautifulSoup(r.content, 'html.parser')
-            
-            for menu_div in soup.find_all('div', class_='menu'):
-                date_node = menu_div.find('time', class_='menu_date_title')
-                if not date_node: continue
-                current_date = parse_date(date_node.text)
-                if not current_date: continue
-                day_key = current_date.strftime('%Y-%m-%d')
-                
-                busy_today = busy_slots.get(day_key, [])
-                
-                for meal in menu_div.find_all('div', class_='meal'):
-                    title_node = meal.find('div', class_='meal_title')
-                    if not title_node: continue
-                    meal_name = clean_text(title_node.text).lower()
-                    is_dinner = "dîner" in meal_name or "diner" in meal_name or "soir" in meal_name
-                    meal_type = "soir" if is_dinner else "midi"
-
-                    foodies = meal.find('ul', class_='meal_foodies')
-                    if not foodies: continue
-                    
-                    raw_lines = []
-                    for cat in foodies.find_all('li', recursive=False):
-                        cat_title = ""
-                        if cat.contents: cat_title = BeautifulSoup(str(cat.contents[0]), "html.parser").get_text().strip()
-                        if cat_title: raw_lines.append(f"--- {cat_title.upper()} ---")
-                        for item in cat.find_all('li'):
-                            it = clean_text(item.text)
-                            if it: raw_lines.append(f"• {it}")
-
-                    final_lines = []
-                    stop_processing = False 
-                    
-                    for line in raw_lines:
-                        line_lower = line.lower()
-                        line_content = line.replace('•', '').strip().lower()
-
-                        # --- RÈGLE UNIVERSELLE VAUROUZÉ ---
-                        if "vaurouzé" in resto['name'].lower():
-                            # Vérification stricte des éléments bannis (Entête, Pizzas, etc.)
-                            if line_content in VAUROUZE_GLOBAL_BANLIST:
-                                continue
-                            if "petit vaurouze" in line_lower:
-                                continue
-
-                        # --- Règle Vaurouzé Midi classique ---
-                        if "vaurouzé" in resto['name'].lower() and meal_type == "midi":
-                            if "salle personnels administratifs" in line_lower: stop_processing = True
-                        
-                        if stop_processing: break
-
-                        # --- Règle Bartholdi ---
-                        if "bartholdi" in resto['name'].lower():
-                            if any(b in line_lower for b in BARTHOLDI_INFO_BANLIST): continue
-
-                        final_lines.append(line)
-
-                    # Si vide après nettoyage, on ignore l'événement
-                    real_content = [l for l in final_lines if l.startswith("•")]
-                    if not real_content:
-                        continue
-
-                    # --- Création Event ---
-                    slot = calculate_smart_slot(current_date, meal_type, busy_today)
-                    if not slot: continue
-                    
-                    event = Event()
-                    event.add('summary', f"🍽️ {resto['name']} ({meal_name.capitalize()})")
-                    event.add('description', "\n".join(final_lines).strip())
-                    event.add('location', resto['name'])
-                    event.add('dtstart', slot[0])
-                    event.add('dtend', slot[1])
-                    event.add('uid', f"{day_key}_{resto['name'].replace(' ','')}_{meal_type}")
-                    cal.add_component(event)
-                    count_added += 1
-
-        except Exception as e:
-            print(f"Erreur : {e}")
+    # Événements conservés (bruts) puis repas ajoutés ; écrits en une fois à la fin
+    # Un repas identique à un passage précédent n'est pas re-sérialisé
+    cache = CacheICS(CACHE_ICS_FILE)
+    repas = recuperer_repas(occupation, cache, today, MODE_HORS_LIGNE)
+    events_out = events_to_keep + repas
 
     if not os.path.exists(WORK_DIR): os.makedirs(WORK_DIR)
-    with open(ICS_FILE, 'wb') as f: f.write(cal.to_ical())
-    print(f"\n✅ TERMINÉ : {count_added} repas ajoutés.")
+    octets = ecrire_ics(ICS_FILE, '-//Smart CROUS Menu//mxm.dk//', events_out)
+    cache.sauver()
+    print(cache.rapport(octets))
+    print(f"\n✅ TERMINÉ : {len(repas)} repas ajoutés.")
 
 if __name__ == "__main__":
+    if "--hors-ligne" in sys.argv: MODE_HORS_LIGNE = True
     main()
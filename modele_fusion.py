@@ -0,0 +1,104 @@
+"""
+modele_fusion.py
+- Modèle interne de la fusion : des enregistrements compacts (__slots__) plutôt que les
+  VEVENT lus (texte brut + propriétés) gardés en mémoire par le moteur.
+- CoursADE : un événement ADE dont les dates sont converties une seule fois, au chargement
+  (secondes depuis l'epoch + minutes depuis minuit, heure de Paris) ; titres et salles sont
+  internés (une seule chaîne pour toutes les occurrences) ; la description n'est décodée
+  qu'à la première lecture (jamais pour les cours passés).
+- Les objets icalendar ne sont créés qu'à l'écriture (voir FusionADE / OrphelinJSON dans
+  moteur_fusion.py).
+"""
+
+import re
+import sys
+from datetime import datetime
+
+import pytz
+
+from flux_ics import decoder_texte, iter_vevents
+
+PARIS_TZ = pytz.timezone("Europe/Paris")
+
+# ADE ajoute la date d'export dans chaque description : elle change à chaque téléchargement,
+# elle n'entre donc ni dans les empreintes ni dans la description écrite (moteur_fusion.py),
+# ni dans l'empreinte du téléchargement (script_planning_fac.py)
+EXPORT_ADE = re.compile(r"\n?\(Export[ée] le\s*:[^)]*\)")
+
+
+def sans_date_export(description):
+    return EXPORT_ADE.sub("", description or "")
+
+
+def make_paris_aware(dt):
+    """
+    Transforme n'importe quelle date (UTC, Naive, ou déjà Paris)
+    en une date correctement localisée sur Europe/Paris.
+    """
+    if not isinstance(dt, datetime):
+        # C'est une date (All day), on la laisse telle quelle
+        return dt
+
+    # Si la date n'a pas d'info de fuseau (Naive), on suppose que c'est l'heure locale (JSON)
+    if dt.tzinfo is None:
+        # localize gère parfaitement le passage été/hiver pour une heure locale donnée
+        return PARIS_TZ.localize(dt)
+
+    # Si la date a déjà un fuseau (ex: UTC venant de l'ADE), on la convertit vers Paris
+    return dt.astimezone(PARIS_TZ)
+
+
+class CoursADE:
+    """Un événement ADE prêt pour la fusion."""
+
+    __slots__ = ("uid", "titre", "lieu", "debut", "fin", "jour", "minute_debut", "minute_fin", "_description")
+
+    def __init__(self, uid, titre, lieu, debut, fin, description=""):
+        """`debut` / `fin` : datetimes Paris, ou dates (journée entière). `description` : texte ou ligne brute."""
+        self.uid = uid
+        self.titre = sys.intern(titre)
+        self.lieu = sys.intern(lieu)
+        if fin is None:
+            fin = debut
+        if isinstance(debut, datetime):
+            self.debut = int(debut.timestamp())
+            self.fin = int(fin.timestamp())
+            self.jour = debut.date()
+            self.minute_debut = debut.hour * 60 + debut.minute
+            self.minute_fin = fin.hour * 60 + fin.minute
+        else:
+            self.debut, self.fin = debut, fin
+            self.jour = debut
+            self.minute_debut = self.minute_fin = 0
+        self._description = description
+
+    @classmethod
+    def depuis_vevent(cls, ev):
+        """Depuis un EvenementICS (flux_ics) ; la description reste brute jusqu'à sa lecture."""
+        return cls(ev.uid, ev.summary, ev.location, make_paris_aware(ev.dtstart),
+                   make_paris_aware(ev.dtend), ev.ligne("DESCRIPTION"))
+
+    @property
+    def journee(self):
+        return not isinstance(self.debut, int)
+
+    @property
+    def dtstart(self):
+        """Début en heure de Paris (datetime recréée à la demande) ou date."""
+        return self.debut if self.journee else datetime.fromtimestamp(self.debut, PARIS_TZ)
+
+    @property
+    def dtend(self):
+        return self.fin if self.journee else datetime.fromtimestamp(self.fin, PARIS_TZ)
+
+    @property
+    def description(self):
+        d = self._description
+        if not isinstance(d, str):
+            d = self._description = decoder_texte(d)
+        return d
+
+
+def lire_ade(chemin):
+    """Événements d'un ADECal.ics, lus en flux et convertis en CoursADE."""
+    return [CoursADE.depuis_vevent(ev) for ev in iter_vevents(chemin)]
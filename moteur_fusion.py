@@ -0,0 +1,589 @@
+"""
+moteur_fusion.py
+- Fusion ADE + Hyperplanning exposée comme un moteur réutilisable (MoteurFusion), au lieu
+  d'un script qui fait tout à l'import.
+- Le moteur garde en mémoire le calendrier ADE lu, l'index du JSON et l'historique :
+  on ne recharge que la source qui a changé avant de relancer la fusion.
+- surveiller() : mode démon qui surveille ADECal.ics et edt_IG1_complet.json, attend que
+  les fichiers soient stables (debounce) et relance la fusion en journalisant sa latence.
+- Les événements passés sont gelés en segments mensuels (historique_gele.py) : seule la
+  partie récente de la sortie précédente est relue, et l'écriture recopie les segments.
+- Les événements reconstruits passent par un cache de texte ICS indexé par l'empreinte de
+  leurs entrées (cache_ics.py) : to_ical() n'est appelé que pour un contenu jamais vu.
+- Force explicitement le Timezone Europe/Paris sur chaque événement (pytz).
+"""
+
+import re
+import json
+import hashlib
+import os
+import sys
+import time as chrono
+from itertools import chain
+from datetime import datetime, date, time, timedelta
+from icalendar import Event
+import pytz # Nécessite pip install pytz
+from flux_ics import ecrire_ics, evenement_depuis_octets
+from appariement import Apparieur, CoursJSON, IndexCours, MODE_TOLERANCE
+from cache_ics import CacheICS
+from filtres_texte import regles_description
+from historique_gele import SegmentsHistorique, lire_partie_recente
+from modele_fusion import PARIS_TZ, lire_ade, make_paris_aware, sans_date_export
+from transformations import FluxPlanning, appliquer, afficher_rapport
+
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+
+# ---------------- CONFIG ----------------
+ICS_FILE = "ADECal.ics"
+JSON_FILE = "edt_IG1_complet.json"
+OUTPUT_ICS = "planning_fusion.ics"
+LOG_FILE = "fusion_log.txt"
+ETAT_FILE = "fusion_etat.json"  # empreintes du dernier passage (mode incrémental)
+DOSSIER_HISTORIQUE = "historique_fusion"  # segments mensuels des événements passés
+CACHE_ICS_FILE = "cache_ics_fusion.json.gz"  # texte ICS par empreinte d'entrées (taille bornée)
+META_ADE_SUFFIXE = ".meta.json"  # écrit par script_planning_fac.py à côté de l'ICS (ADECal.meta.json)
+PRODID = "-//Fusion ADE Strict//FR"
+
+# Appariement ADE <-> JSON (voir appariement.py) : écart toléré sur le début et la fin,
+# ou MODE_CHEVAUCHEMENT pour retenir le cours du JSON qui recouvre le mieux le créneau ADE.
+MODE_APPARIEMENT = MODE_TOLERANCE
+TOLERANCE_MINUTES = 5
+
+# Mode incrémental : seuls les événements dont les entrées (VEVENT ADE, cours JSON retenu)
+# ont changé depuis le dernier passage sont reconstruits ; sortie non réécrite si identique.
+# Si le dernier téléchargement d'ADE n'a rien changé (ADECal.meta.json), que le JSON non plus
+# et qu'on est toujours le même jour, la fusion (et les étapes qui la suivent) est sautée.
+FUSION_INCREMENTALE = True
+VERSION_EMPREINTE = 2  # à incrémenter si la façon de construire les événements change
+
+# Mode démon
+INTERVALLE_SURVEILLANCE = 1.0  # secondes entre deux vérifications des fichiers
+DELAI_DEBOUNCE = 2.0  # un fichier doit rester inchangé ce temps-là avant de relancer la fusion
+
+# FUSEAU HORAIRE STRICT : PARIS_TZ et make_paris_aware sont dans modele_fusion.py
+
+# ---------------- UTILITAIRES ----------------
+
+def parse_json_horaire(horaire_str):
+    m = re.search(r"de\s*(\d{1,2})h(\d{2})\s*à\s*(\d{1,2})h(\d{2})", horaire_str or "")
+    if not m: return None, None
+    h1, m1, h2, m2 = map(int, m.groups())
+    return time(h1, m1), time(h2, m2)
+
+def parse_json_date(date_str):
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+        try: return datetime.strptime(date_str, fmt).date()
+        except: continue
+    return None
+
+def normalize_text(s):
+    return (s or "").strip().lower()
+
+def clean_menu_description(text):
+    # Règles dans filtres_texte.json (en-têtes et plats retirés des descriptions)
+    if not text: return ""
+    return "\n".join(regles_description().filtrer(text.splitlines()))
+
+def extract_prof_from_ics_description(desc):
+    if not desc: return ""
+    for line in desc.splitlines():
+        line = line.strip()
+        if len(line) <= 60 and re.search(r"[A-Za-zÀ-ÖØ-öø-ÿ]", line):
+            lower = line.lower()
+            if "pizza" in lower or "burger" in lower: continue
+            return line
+    return ""
+
+def empreinte_json(entree):
+    """Empreinte d'un cours du JSON (le numéro de semaine, relatif, est ignoré)."""
+    if entree is None: return ""
+    return json.dumps({k: v for k, v in entree.items() if k != "semaine"}, sort_keys=True, ensure_ascii=False)
+
+def empreinte_entrees(*morceaux):
+    return hashlib.sha1("\x1f".join(str(m) for m in morceaux).encode("utf-8")).hexdigest()
+
+def cle_unique(uid, deja_vues):
+    """UID, suffixé si plusieurs événements partagent le même."""
+    cle, n = uid, 1
+    while cle in deja_vues:
+        n += 1
+        cle = f"{uid}#{n}"
+    return cle
+
+def date_historique(dt):
+    """Date (Paris) d'un événement daté-heure ; None pour un événement sur la journée."""
+    return dt.date() if isinstance(dt, datetime) else None
+
+# ---------------- ÉVÉNEMENTS DE SORTIE ----------------
+# Ce que la fusion décide pour chaque événement futur, sans objet icalendar :
+# l'Event n'est construit (vers_ical) que si son texte n'est ni dans l'état ni dans le cache.
+
+class FusionADE:
+    """Cours ADE, éventuellement apparié à un cours JSON."""
+
+    __slots__ = ("cours", "json", "en_vacances")
+
+    def __init__(self, cours, json, en_vacances):
+        self.cours = cours  # CoursADE
+        self.json = json  # entrée JSON appariée ou None
+        self.en_vacances = en_vacances
+
+    def description(self):
+        cours = self.cours
+        # Même texte que celui de l'empreinte : un événement réutilisé est identique à un reconstruit
+        raw_description = sans_date_export(cours.description)
+        # --- NETTOYAGE MENU ---
+        description_cleaned = clean_menu_description(raw_description)
+        if self.en_vacances:
+            if "menu" in description_cleaned.lower() or "repas" in cours.titre.lower():
+                description_cleaned = ""
+
+        if self.json:
+            desc = [f"✅ Salle mise à jour via JSON"]
+            if self.json["professeur"]:
+                desc.append(f"Prof (JSON) : {self.json['professeur']}")
+            if description_cleaned:
+                 desc.append(f"{description_cleaned}")
+        else:
+            desc = []
+            if description_cleaned: desc.append(description_cleaned)
+
+            prof = extract_prof_from_ics_description(raw_description)
+            if prof and prof not in description_cleaned:
+                 desc.append(f"Prof ICS: {prof}")
+        return "\n".join(desc)
+
+    def vers_ical(self):
+        cours = self.cours
+        ev = Event()
+        ev.add("uid", cours.uid)
+
+        # IMPORTANT: On injecte les objets datetime qui ont tzinfo=<DstTzInfo 'Europe/Paris' ...>
+        ev.add("dtstart", cours.dtstart)
+        ev.add("dtend", cours.dtend)
+        ev.add("summary", cours.titre)
+        ev.add("location", self.json["salle"] if self.json else cours.lieu)
+        ev.add("description", self.description())
+        return ev
+
+
+class OrphelinJSON:
+    """Cours présent uniquement dans le JSON."""
+
+    __slots__ = ("cours", "dtstart", "dtend")
+
+    def __init__(self, cours, dtstart, dtend):
+        self.cours = cours  # CoursJSON
+        self.dtstart = dtstart
+        self.dtend = dtend
+
+    def vers_ical(self):
+        j = self.cours.entree
+        ev = Event()
+        ev.add("uid", f"JSON-{self.cours.idx}")
+        ev.add("dtstart", self.dtstart)
+        ev.add("dtend", self.dtend)
+
+        # MODIFICATION ICI : Ajout du ⚠️ pour les cours orphelins
+        ev.add("summary", "⚠️ " + j["cours"])
+
+        ev.add("location", j["salle"])
+        ev.add("description", "⚠️ Cours uniquement dans le JSON")
+        return ev
+
+# ---------------- MOTEUR ----------------
+
+class MoteurFusion:
+    """Fusion ADE + JSON avec les sources gardées en mémoire entre deux exécutions."""
+
+    def __init__(self, dossier=DOSSIER, ics_file=ICS_FILE, json_file=JSON_FILE,
+                 output_ics=OUTPUT_ICS, log_file=LOG_FILE,
+                 mode_appariement=MODE_APPARIEMENT, tolerance_minutes=TOLERANCE_MINUTES,
+                 incremental=FUSION_INCREMENTALE, etat_file=ETAT_FILE,
+                 dossier_historique=DOSSIER_HISTORIQUE, cache_file=CACHE_ICS_FILE):
+        self.ics_path = os.path.join(dossier, ics_file)
+        self.json_path = os.path.join(dossier, json_file)
+        self.output_path = os.path.join(dossier, output_ics)
+        self.log_path = os.path.join(dossier, log_file)
+        self.etat_path = os.path.join(dossier, etat_file)
+        self.mode_appariement = mode_appariement
+        self.incremental = incremental
+        self.tolerance_minutes = tolerance_minutes
+        self.segments = SegmentsHistorique(os.path.join(dossier, dossier_historique))
+        self.cache = CacheICS(os.path.join(dossier, cache_file))
+
+        self.evenements_ade = None  # [CoursADE]
+        self.vacation_days = set()
+        self.json_data = None
+        self.cours_json = []  # [CoursJSON] des entrées valides, dans l'ordre du JSON
+        self.json_index = IndexCours()
+        # Partie récente (non gelée) de la dernière sortie : [(date ou None, texte ICS brut)]
+        self.sortie = None
+        self.mtime_sortie = None
+        self.etat = None  # voir charger_etat
+        self.stats_appariement = None  # compteurs de l'appariement du dernier passage
+
+    # --- CHARGEMENT ---
+
+    def charger_ade(self, evenements=None):
+        """`evenements` : CoursADE déjà lus (flux ADE partagé par plusieurs fusions, voir fusion_lot.py)."""
+        if evenements is None:
+            if not os.path.exists(self.ics_path): raise FileNotFoundError(f"Manque {self.ics_path}")
+            evenements = lire_ade(self.ics_path)
+        self.evenements_ade = evenements
+
+        # ---------------- SCAN VACANCES ----------------
+        self.vacation_days = set()
+        print("🏖️ Scan des vacances...")
+        for cours in self.evenements_ade:
+            if "vacances" in normalize_text(cours.titre):
+                # Pour les vacances, on veut juste la date, pas l'heure
+                self.vacation_days.add(cours.jour)
+
+    def charger_json(self):
+        if not os.path.exists(self.json_path): raise FileNotFoundError(f"Manque {self.json_path}")
+        with open(self.json_path, "r", encoding="utf-8") as f:
+            self.json_data = json.load(f)
+
+        cours = []
+        for idx, j in enumerate(self.json_data):
+            d = parse_json_date(j["date"])
+            start_t, end_t = parse_json_horaire(j["horaire"])
+            if not d or not start_t or not end_t: continue
+            # Salles, profs et matières reviennent toute l'année : une seule chaîne de chaque
+            for champ in ("cours", "professeur", "salle"):
+                if isinstance(j.get(champ), str):
+                    j[champ] = sys.intern(j[champ])
+
+            # On indexe par date et heure locale (celle du JSON), en minutes depuis minuit
+            debut = start_t.hour * 60 + start_t.minute
+            fin = end_t.hour * 60 + end_t.minute
+            cours.append((d, CoursJSON(idx, j, debut, fin, jour=d)))
+        self.cours_json = [c for _, c in cours]
+        self.json_index = IndexCours.construire(cours)
+
+    def charger_historique(self):
+        """
+        Relit la partie récente de la sortie précédente (elle a pu être complétée par les
+        menus, l'anglais...) : ce qui suit les segments gelés. Si la sortie ne commence pas
+        par les segments (premier passage, fichier remplacé), elle est relue en entier et
+        les segments sont reconstruits.
+        """
+        print("📚 Chargement de l'historique...")
+        self.sortie = []
+        self.mtime_sortie = None
+        if os.path.exists(self.output_path):
+            try:
+                recents, complet = lire_partie_recente(self.output_path, self.segments)
+                if complet:
+                    print("🧊 Sortie non reconnue : reconstruction des segments de l'historique.")
+                    self.segments.reinitialiser()
+                self.sortie = [(date_historique(ev.dtstart), ev.brut) for ev in recents]
+                self.mtime_sortie = os.path.getmtime(self.output_path)
+            except: pass
+
+    def geler_historique(self, today):
+        """Ajoute aux segments les événements de la partie récente qui sont désormais passés."""
+        passes = [(d, brut) for d, brut in self.sortie if d is not None and d < today]
+        if passes:
+            self.segments.geler(passes)
+            print(f"🧊 {len(passes)} événements passés gelés "
+                  f"({len(self.segments.index['mois'])} segments mensuels).")
+        self.sortie = [(d, brut) for d, brut in self.sortie if d is None or d >= today]
+
+    def historique_a_recharger(self):
+        if self.sortie is None:
+            return True
+        mtime = os.path.getmtime(self.output_path) if os.path.exists(self.output_path) else None
+        return mtime != self.mtime_sortie
+
+    # --- ÉTAT INCRÉMENTAL ---
+
+    def charger_etat(self):
+        """Empreintes et texte ICS des événements fusionnés au dernier passage."""
+        self.etat = {"evenements": {}, "empreinte_sortie": None}
+        if not self.incremental or not os.path.exists(self.etat_path):
+            return
+        try:
+            with open(self.etat_path, "r", encoding="utf-8") as f:
+                etat = json.load(f)
+            if etat.get("version") == VERSION_EMPREINTE:
+                self.etat = etat
+        except (OSError, ValueError) as e:
+            print(f"⚠️ État de fusion illisible, reconstruction complète : {e}")
+
+    def signature_sources(self, today):
+        """
+        Ce dont dépend la sortie : contenu d'ADE (empreinte sans date d'export, écrite par
+        script_planning_fac.py), fichiers sources, jour et règles de nettoyage.
+        None si l'ICS n'a pas de méta-données de téléchargement.
+        """
+        meta_path = os.path.splitext(self.ics_path)[0] + META_ADE_SUFFIXE
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not meta.get("sha256"):
+            return None
+        fichiers = [[os.path.getsize(p), os.path.getmtime(p)] if os.path.exists(p) else None
+                    for p in (self.ics_path, self.json_path)]
+        return {"ade": meta["sha256"], "ade_modifie": meta.get("modifie"), "fichiers": fichiers,
+                "jour": today.isoformat(), "regles": regles_description().signature}
+
+    def sources_inchangees(self, signature):
+        """Vrai si le téléchargement n'a rien changé et que la dernière fusion a porté sur ces sources."""
+        if not self.incremental or signature is None or signature["ade_modifie"] is not False:
+            return False
+        derniere = self.etat.get("sources")
+        return (derniere is not None and os.path.exists(self.output_path)
+                and {k: v for k, v in derniere.items() if k != "ade_modifie"}
+                == {k: v for k, v in signature.items() if k != "ade_modifie"})
+
+    def derniere_fusion(self):
+        """Résultat de la dernière fusion (avant les étapes), repris de l'état : [(date, texte ICS brut)]."""
+        bruts = [e["ics"].encode("utf-8") for e in self.etat["evenements"].values()]
+        return [(date_historique(make_paris_aware(ev.dtstart)), ev.brut)
+                for ev in map(evenement_depuis_octets, bruts)]
+
+    def sauver_etat(self):
+        if not self.incremental:
+            return
+        tmp = self.etat_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(self.etat, version=VERSION_EMPREINTE), f, ensure_ascii=False)
+        os.replace(tmp, self.etat_path)
+
+    def _serialiser(self, cle, empreinte, evenement, nouveaux, stats):
+        """
+        Texte ICS de l'événement `cle` : réutilisé tel quel si ses entrées n'ont pas changé
+        depuis le dernier passage, sinon reconstruit (SEQUENCE + 1, LAST-MODIFIED mis à jour).
+        """
+        ancien = self.etat["evenements"].get(cle) if self.incremental else None
+        if ancien is not None and ancien["empreinte"] == empreinte:
+            nouveaux[cle] = ancien
+            stats["reutilises"] += 1
+            return ancien["ics"].encode("utf-8")
+
+        # Mêmes entrées => même texte ICS : sérialisé seulement si ce contenu n'est pas en cache
+        brut = self.cache.serialiser(f"{VERSION_EMPREINTE}:{empreinte}", evenement.vers_ical)
+        if self.incremental:
+            # SEQUENCE et LAST-MODIFIED sont propres à ce passage : ajoutés au texte en cache
+            sequence = ancien["sequence"] + 1 if ancien is not None else 0
+            fin = b"END:VEVENT\r\n"
+            brut = (brut[:-len(fin)] + b"SEQUENCE:%d\r\nLAST-MODIFIED:%s\r\n"
+                    % (sequence, datetime.now(pytz.utc).strftime("%Y%m%dT%H%M%SZ").encode("ascii")) + fin)
+            nouveaux[cle] = {"empreinte": empreinte, "sequence": sequence, "ics": brut.decode("utf-8")}
+        stats["recalcules"] += 1
+        return brut
+
+    # --- FUSION ---
+
+    def fusionner(self, today=None):
+        """
+        Renvoie (cours_avenir, log_lines) à partir des sources en mémoire.
+        cours_avenir : [(date, texte ICS brut)] ; l'historique, lui, est dans les segments gelés.
+        """
+        today = today or date.today()
+
+        # ---------------- 1. HISTORIQUE (INTACT) ----------------
+        # Les événements passés sont dans les segments gelés (voir geler_historique) :
+        # ils seront recopiés tels quels à l'écriture, sans être relus ni re-sérialisés.
+
+        # ---------------- 2. FUTUR (FUSION + CLEAN) ----------------
+        apparieur = Apparieur(self.json_index, self.mode_appariement, self.tolerance_minutes)
+        log_lines = []
+        used_json = set()
+        cours_avenir = []
+        # Seuls les événements dont les entrées ont changé sont reconstruits
+        nouveaux = {}
+        stats = {"reutilises": 0, "recalcules": 0}
+
+        # Les règles de nettoyage font partie des entrées : les changer reconstruit les événements
+        signature_regles = regles_description().signature
+
+        print("🚀 Traitement du futur (Mode Strict Paris Time)...")
+
+        for cours in self.evenements_ade:
+            # Les cours passés sont écartés sur la date seule, avant toute conversion
+            course_date = cours.jour
+            if course_date < today: continue
+
+            # --- CONVERSION CRITIQUE ---
+            # On force tout en "Europe/Paris" explicite.
+            dtstart_paris, dtend_paris = cours.dtstart, cours.dtend
+            summary = cours.titre
+            raw_description = cours.description
+
+            # --- FUSION ---
+            # On utilise l'heure locale de Paris pour la clé de recherche
+            choix = apparieur.apparier(course_date, cours.minute_debut, cours.minute_fin,
+                                       summary, raw_description)
+            best_json = choix.entree if choix else None
+            if choix:
+                used_json.add(choix.idx)
+                log_lines.append(f"MATCH: {summary} + Salle {best_json['salle']}")
+            en_vacances = course_date in self.vacation_days
+
+            empreinte = empreinte_entrees(
+                "ADE", cours.uid, summary, "" if best_json else cours.lieu, sans_date_export(raw_description),
+                signature_regles,
+                dtstart_paris.isoformat(), dtend_paris.isoformat(), en_vacances,
+                empreinte_json(best_json),
+            )
+            cle = cle_unique(cours.uid, nouveaux)
+            cours_avenir.append((date_historique(dtstart_paris),
+                                 self._serialiser(cle, empreinte, FusionADE(cours, best_json, en_vacances),
+                                                  nouveaux, stats)))
+
+        # --- ORPHELINS JSON (Futur uniquement) ---
+        orphelins = 0
+        for c in self.cours_json:
+            if c.idx in used_json or c.jour < today: continue
+
+            # Localisation stricte vers Paris de l'heure locale du JSON
+            dtstart_paris = make_paris_aware(datetime.combine(c.jour, time(c.debut // 60, c.debut % 60)))
+            dtend_paris = make_paris_aware(datetime.combine(c.jour, time(c.fin // 60, c.fin % 60)))
+
+            uid = f"JSON-{c.idx}"
+            empreinte = empreinte_entrees("JSON", uid, dtstart_paris.isoformat(),
+                                          dtend_paris.isoformat(), empreinte_json(c.entree))
+            cle = cle_unique(uid, nouveaux)
+            cours_avenir.append((date_historique(dtstart_paris),
+                                 self._serialiser(cle, empreinte, OrphelinJSON(c, dtstart_paris, dtend_paris),
+                                                  nouveaux, stats)))
+            orphelins += 1
+
+        print(apparieur.rapport(orphelins))
+        self.stats_appariement = dict(apparieur.stats, orphelins=orphelins, evenements=len(cours_avenir))
+        if self.incremental:
+            print(f"♻️ Incrémental : {stats['reutilises']} événements réutilisés, "
+                  f"{stats['recalcules']} reconstruits.")
+            self.etat["evenements"] = nouveaux
+        return cours_avenir, log_lines
+
+    # ---------------- SAUVEGARDE ----------------
+
+    def ecrire(self, cours_avenir, log_lines):
+        """
+        Écrit la sortie ; renvoie False (sans rien écrire) si elle serait identique à la précédente.
+        `log_lines` à None : le journal de la dernière fusion est gardé.
+        """
+        # Note : On laisse la librairie icalendar gérer l'écriture des Timezones
+        # car nos objets datetime sont désormais "aware" (ils contiennent l'info Paris).
+        # Tout est déjà sérialisé : segments recopiés, futur réutilisé ou reconstruit.
+        h = hashlib.sha256(self.segments.signature().encode("utf-8"))
+        for _, brut in cours_avenir:
+            h.update(brut)
+        empreinte_sortie = h.hexdigest()
+        if (self.incremental and empreinte_sortie == self.etat.get("empreinte_sortie")
+                and os.path.exists(self.output_path)):
+            print("✅ Aucun changement : planning_fusion.ics n'est pas réécrit.")
+            print(self.cache.rapport(0))
+            self.cache.sauver()
+            self.sauver_etat()
+            return False
+
+        # Segments d'abord : la prochaine lecture saute directement à la partie récente
+        self.sortie = cours_avenir
+        octets = ecrire_ics(self.output_path, PRODID,
+                            chain(self.segments.octets(), (brut for _, brut in cours_avenir)))
+        print(self.cache.rapport(octets))
+        self.cache.sauver()
+
+        # La partie récente de la sortie devient celle de la prochaine fusion (sans la relire)
+        self.mtime_sortie = os.path.getmtime(self.output_path)
+        self.etat["empreinte_sortie"] = empreinte_sortie
+        self.sauver_etat()
+
+        if log_lines is not None:
+            with open(self.log_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(log_lines))
+        return True
+
+    def executer(self, recharger_ade=False, recharger_json=False, transformations=(), forcer=False):
+        """
+        Charge ce qui manque (ou ce qu'on demande de recharger), fusionne et écrit.
+        `transformations` : étapes (transformations.py) appliquées au flux fusionné avant
+        l'unique écriture de la sortie, puis étapes de publication.
+        Si les sources n'ont pas changé depuis la dernière fusion du jour (voir
+        sources_inchangees), seule la fusion est sautée, sauf avec `forcer` : les étapes
+        (menus, anglais, publication) repartent de la dernière fusion, leurs entrées à elles
+        (pages CROUS, groupes_cours.json) ont pu changer. Sans étape, renvoie None.
+        """
+        if self.etat is None: self.charger_etat()
+        today = date.today()
+        signature = self.signature_sources(today)
+        inchangees = not forcer and self.sources_inchangees(signature)
+        if inchangees and not transformations:
+            print("⏭️ ADECal.ics et le JSON n'ont pas changé depuis la dernière fusion : rien à refaire.")
+            return None
+
+        if self.historique_a_recharger(): self.charger_historique()
+        self.geler_historique(today)
+        if inchangees:
+            print("⏭️ ADECal.ics et le JSON n'ont pas changé : fusion sautée, étapes rejouées.")
+            cours_avenir, log_lines = self.derniere_fusion(), None
+        else:
+            if recharger_ade or self.evenements_ade is None: self.charger_ade()
+            if recharger_json or self.json_data is None: self.charger_json()
+            cours_avenir, log_lines = self.fusionner(today)
+            # Enregistré avec l'état par ecrire()
+            self.etat["sources"] = signature
+        if not transformations:
+            self.ecrire(cours_avenir, log_lines)
+        else:
+            flux = FluxPlanning.depuis_octets([brut for _, brut in cours_avenir], self.output_path)
+            resultats = appliquer(flux, transformations)
+            cours_avenir = [(date_historique(make_paris_aware(ev.dtstart)), ev.brut)
+                            for ev in flux.evenements]
+            flux.ecrit = self.ecrire(cours_avenir, log_lines)
+            resultats.update(appliquer(flux, transformations, apres_ecriture=True))
+            afficher_rapport(resultats)
+        print(f"\n✅ Terminé. {len(cours_avenir)} cours futurs traités.")
+        return len(cours_avenir)
+
+# ---------------- MODE DÉMON ----------------
+
+def _mtime(chemin):
+    return os.path.getmtime(chemin) if os.path.exists(chemin) else None
+
+def surveiller(moteur=None, intervalle=INTERVALLE_SURVEILLANCE, debounce=DELAI_DEBOUNCE):
+    """
+    Garde le moteur en mémoire et relance la fusion quand ADECal.ics ou le JSON change.
+    Les changements rapprochés sont regroupés : on attend `debounce` secondes sans
+    nouvelle modification avant de relancer.
+    """
+    moteur = moteur or MoteurFusion()
+    moteur.executer()
+
+    vus = {"ade": _mtime(moteur.ics_path), "json": _mtime(moteur.json_path)}
+    en_attente = set()
+    dernier_changement = None
+    print(f"👀 Surveillance de {moteur.ics_path} et {moteur.json_path} (Ctrl+C pour arrêter)...")
+
+    try:
+        while True:
+            chrono.sleep(intervalle)
+            actuels = {"ade": _mtime(moteur.ics_path), "json": _mtime(moteur.json_path)}
+            for source, mtime in actuels.items():
+                if mtime != vus[source]:
+                    vus[source] = mtime
+                    en_attente.add(source)
+                    dernier_changement = chrono.monotonic()
+
+            if not en_attente or chrono.monotonic() - dernier_changement < debounce:
+                continue
+
+            debut = chrono.perf_counter()
+            sources = ", ".join(sorted(en_attente))
+            try:
+                moteur.executer(recharger_ade="ade" in en_attente,
+                                recharger_json="json" in en_attente)
+                duree = chrono.perf_counter() - debut
+                print(f"⏱️ [{datetime.now():%H:%M:%S}] Fusion relancée ({sources}) en {duree * 1000:.0f} ms")
+            except Exception as e:
+                print(f"⚠️ Échec de la fusion ({sources}) : {e}")
+            en_attente.clear()
+    except KeyboardInterrupt:
+        print("\n🛑 Surveillance arrêtée.")
@@ -0,0 +1,204 @@
+"""
+pipeline_planning.py
+- Déclare les étapes de la chaîne sous forme de graphe de dépendances.
+- Exécute chaque étape dans le même processus : plus de nouvel interpréteur ni de
+  ré-import de selenium / icalendar / bs4 à chaque étape.
+- Lance en parallèle les étapes indépendantes (ex : ADE et Hyperplanning) et démarre
+  chaque étape dès que ses entrées sont prêtes, sans time.sleep fixe.
+- Les étapes parallèles appellent la fonction main() de leur script (chargé comme un
+  module). Les scripts exécutés comme __main__ (runpy) passent un par un : runpy
+  remplace sys.modules["__main__"] et sys.argv[0] pour tout le processus.
+- Affiche la durée et le statut de chaque étape.
+"""
+
+import importlib.util
+import os
+import runpy
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+DOSSIER_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+
+# Statuts possibles d'une étape
+OK = "ok"
+ECHEC = "échec"
+IGNOREE = "ignorée"
+
+_verrou_runpy = threading.Lock()
+
+
+def _chemin_script(script):
+    chemin = os.path.join(DOSSIER_SCRIPTS, script)
+    if not os.path.exists(chemin):
+        raise FileNotFoundError(f"Le fichier {script} est introuvable.")
+    return chemin
+
+
+def depuis_script(script, fonction="main"):
+    """Fonction d'étape qui charge `script` comme un module (pas comme __main__) et appelle `fonction`."""
+    def lancer():
+        nom_module = "_etape_" + os.path.splitext(script)[0].replace(" ", "_").replace("-", "_")
+        spec = importlib.util.spec_from_file_location(nom_module, _chemin_script(script))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        getattr(module, fonction)()
+    return lancer
+
+
+class Etape:
+    """
+    Une étape du pipeline : un script et la liste des étapes dont il dépend.
+    `apres` : étapes qui doivent être terminées avant celle-ci, quel que soit leur statut.
+    """
+
+    def __init__(self, nom, script, depend_de=(), fonction=None, apres=()):
+        self.nom = nom
+        self.script = script
+        self.depend_de = tuple(depend_de)
+        self.apres = tuple(apres)
+        # Si fourni, on appelle directement la fonction au lieu d'exécuter le script
+        self.fonction = fonction
+
+    def executer(self):
+        if self.fonction is not None:
+            self.fonction()
+            return
+        chemin = _chemin_script(self.script)
+        # runpy touche à l'état global du processus : une seule étape runpy à la fois
+        with _verrou_runpy:
+            runpy.run_path(chemin, run_name="__main__")
+
+
+# ---------------- GRAPHE PAR DÉFAUT ----------------
+# Fusion, menus, anglais et publication en une seule étape : le planning est lu et
+# écrit une seule fois (voir chaine_planning.py et transformations.py).
+ETAPES = [
+    Etape("hyperplanning", "script - V2.py", fonction=depuis_script("script - V2.py")),
+    Etape("ade", "script_planning_fac.py", fonction=depuis_script("script_planning_fac.py")),
+    Etape("planning", "chaine_planning.py", depend_de=("hyperplanning", "ade")),
+]
+
+# Ancien enchaînement, un script par étape (chacun relit et réécrit planning_fusion.ics).
+# Comme dans script_maitre_planning.py, la copie suit l'étape anglais même si elle échoue.
+ETAPES_SCRIPTS = [
+    Etape("hyperplanning", "script - V2.py", fonction=depuis_script("script - V2.py")),
+    Etape("ade", "script_planning_fac.py", fonction=depuis_script("script_planning_fac.py")),
+    Etape("fusion", "fusion_planning-V2.py", depend_de=("hyperplanning", "ade")),
+    Etape("menus", "menu_cantine.py", depend_de=("fusion",)),
+    Etape("anglais", "anglais_planning.py", depend_de=("menus",)),
+    Etape("copie", "Copie_planning.py", depend_de=("menus",), apres=("anglais",)),
+]
+
+
+def verifier_graphe(etapes):
+    """Vérifie que les dépendances existent et qu'il n'y a pas de cycle."""
+    noms = {e.nom for e in etapes}
+    for e in etapes:
+        for dep in e.depend_de + e.apres:
+            if dep not in noms:
+                raise ValueError(f"L'étape {e.nom} dépend de {dep}, qui n'existe pas.")
+
+    restantes = {e.nom: set(e.depend_de + e.apres) for e in etapes}
+    while restantes:
+        pretes = [n for n, deps in restantes.items() if not deps]
+        if not pretes:
+            raise ValueError(f"Cycle détecté entre : {', '.join(sorted(restantes))}")
+        for n in pretes:
+            del restantes[n]
+        for deps in restantes.values():
+            deps.difference_update(pretes)
+
+
+def _lancer(etape):
+    """Exécute une étape et renvoie (statut, durée, erreur)."""
+    print(f"▶️ Exécution de {etape.script} ...")
+    debut = time.perf_counter()
+    try:
+        etape.executer()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            return ECHEC, time.perf_counter() - debut, f"SystemExit({e.code})"
+    except BaseException as e:
+        traceback.print_exc()
+        return ECHEC, time.perf_counter() - debut, f"{type(e).__name__}: {e}"
+    return OK, time.perf_counter() - debut, None
+
+
+def executer_pipeline(etapes=None, max_workers=None):
+    """
+    Exécute le graphe d'étapes. Une étape démarre dès que toutes ses dépendances
+    ont réussi ; si l'une d'elles échoue, l'étape est ignorée.
+    Renvoie un dict {nom: {"statut", "duree", "erreur"}}.
+    """
+    etapes = ETAPES if etapes is None else etapes
+    verifier_graphe(etapes)
+    par_nom = {e.nom: e for e in etapes}
+    resultats = {}
+    en_cours = {}
+
+    # Les scripts utilisent des chemins relatifs au dossier du projet : un seul chdir,
+    # avant de lancer les threads, et le dossier de l'appelant est rétabli à la fin
+    dossier_appelant = os.getcwd()
+    os.chdir(DOSSIER_SCRIPTS)
+
+    def prochaines():
+        """Étapes prêtes à démarrer ; marque comme ignorées celles qui ne le seront jamais."""
+        pretes = []
+        change = True
+        while change:
+            change = False
+            for e in etapes:
+                if e.nom in resultats or e.nom in en_cours.values() or e in pretes:
+                    continue
+                statuts = [resultats.get(d, {}).get("statut") for d in e.depend_de]
+                if any(s in (ECHEC, IGNOREE) for s in statuts):
+                    resultats[e.nom] = {"statut": IGNOREE, "duree": 0.0,
+                                        "erreur": "dépendance en échec"}
+                    print(f"⏭️ {e.script} ignoré (dépendance en échec).")
+                    # Une étape ignorée peut en faire ignorer d'autres
+                    change = True
+                elif all(s == OK for s in statuts) and all(a in resultats for a in e.apres):
+                    pretes.append(e)
+        return pretes
+
+    debut_total = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or len(etapes)) as pool:
+            for e in prochaines():
+                en_cours[pool.submit(_lancer, e)] = e.nom
+
+            while en_cours:
+                terminees, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+                for fut in terminees:
+                    nom = en_cours.pop(fut)
+                    statut, duree, erreur = fut.result()
+                    resultats[nom] = {"statut": statut, "duree": duree, "erreur": erreur}
+                    if statut == OK:
+                        print(f"✅ {par_nom[nom].script} terminé en {duree:.1f}s.\n")
+                    else:
+                        print(f"⚠️ Erreur lors de l’exécution de {par_nom[nom].script} : {erreur}")
+                for e in prochaines():
+                    en_cours[pool.submit(_lancer, e)] = e.nom
+    finally:
+        os.chdir(dossier_appelant)
+
+    afficher_rapport(etapes, resultats, time.perf_counter() - debut_total)
+    return resultats
+
+
+def afficher_rapport(etapes, resultats, duree_totale):
+    print("\n📊 Rapport du pipeline :")
+    for e in etapes:
+        r = resultats.get(e.nom, {"statut": IGNOREE, "duree": 0.0, "erreur": None})
+        icone = {"ok": "✅", "échec": "❌"}.get(r["statut"], "⏭️")
+        ligne = f"  {icone} {e.nom:<14} {r['duree']:>7.1f}s  {r['statut']}"
+        if r["erreur"]:
+            ligne += f" ({r['erreur']})"
+        print(ligne)
+    print(f"  ⏱️ Total : {duree_totale:.1f}s")
+
+
+if __name__ == "__main__":
+    executer_pipeline()
@@ -0,0 +1,86 @@
+"""
+regles_groupes.py
+- Règles d'affectation de groupe : (cours, dates) -> suffixe ajouté au titre (GrA, GrB,
+  Online...). Lues dans groupes_cours.json, pour n'importe quel cours et n'importe quel groupe.
+- Un cours est désigné par son titre exact ("cours") ou par une expression régulière
+  ("motif", qui doit couvrir tout le titre).
+- Les dates sont indexées (dictionnaire date -> règles) : pour un événement, on ne regarde
+  que les règles de son jour, et aucune s'il n'y en a pas. Les titres qu'aucune règle ne
+  vise sont écartés avant même de lire la date de l'événement (peut_concerner).
+- En cas de conflit, la première règle (puis le premier groupe) du fichier l'emporte.
+"""
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+FICHIER_REGLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "groupes_cours.json")
+FORMAT_DATE = "%d/%m/%Y"
+
+_moteurs = {}  # chemin -> (mtime, MoteurGroupes)
+
+
+class RegleGroupe:
+    """Un cours (titre exact ou motif) et le suffixe de groupe à lui ajouter."""
+
+    __slots__ = ("cours", "motif", "suffixe")
+
+    def __init__(self, suffixe, cours=None, motif=None):
+        self.cours = cours
+        self.motif = re.compile(motif) if motif else None
+        self.suffixe = suffixe
+
+    def concerne(self, titre):
+        if self.motif is not None:
+            return self.motif.fullmatch(titre) is not None
+        return titre == self.cours
+
+
+class MoteurGroupes:
+    """Index date -> règles applicables ce jour-là, dans l'ordre de priorité."""
+
+    def __init__(self, regles_brutes):
+        self.index = {}
+        self.titres = set()  # cours désignés par leur titre exact
+        motifs = []
+        for regle in regles_brutes.get("regles", []):
+            for groupe in regle.get("groupes", []):
+                r = RegleGroupe(groupe["suffixe"], regle.get("cours"), regle.get("motif"))
+                if r.motif is not None:
+                    motifs.append(f"(?:{r.motif.pattern})")
+                else:
+                    self.titres.add(r.cours)
+                for d in groupe.get("dates", []):
+                    jour = datetime.strptime(d, FORMAT_DATE).date()
+                    self.index.setdefault(jour, []).append(r)
+        self.motifs = re.compile("|".join(motifs)) if motifs else None
+        self.dernier_jour = max(self.index) if self.index else None
+        self.signature = hashlib.sha1(json.dumps(regles_brutes, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def peut_concerner(self, titre):
+        """Faux si aucune règle ne vise ce titre, quelle que soit la date."""
+        titre = titre.strip()
+        return titre in self.titres or (self.motifs is not None and self.motifs.fullmatch(titre) is not None)
+
+    def nouveau_titre(self, titre, jour):
+        """Titre complété du suffixe du groupe de ce jour, ou None s'il n'y a rien à changer."""
+        regles = self.index.get(jour)
+        if not regles:
+            return None
+        titre = titre.strip()
+        for r in regles:
+            if r.concerne(titre):
+                return None if titre.endswith(r.suffixe) else f"{titre} {r.suffixe}"
+        return None
+
+
+def charger_moteur(chemin=FICHIER_REGLES):
+    """Moteur compilé pour le fichier de règles (recompilé seulement s'il a changé)."""
+    mtime = os.path.getmtime(chemin)
+    connu = _moteurs.get(chemin)
+    if connu is None or connu[0] != mtime:
+        with open(chemin, "r", encoding="utf-8") as f:
+            _moteurs[chemin] = (mtime, MoteurGroupes(json.load(f)))
+    return _moteurs[chemin][1]
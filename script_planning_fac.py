@@ -1,70 +1,196 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import time
+import hashlib
+import json
 import os
 import shutil
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modele_fusion import sans_date_export
 
 # --- CONFIGURATION ---
 dossier_telechargement = r"C:\Users\Administrateur\..."
 nom_final = "ADECal.ics"  # nom du fichier permanent
 nom_temp = "ADECal (1).ics"  # nom du fichier téléchargé par défaut depuis le site
+nom_meta = "ADECal.meta.json"  # ETag / Last-Modified / hash du dernier téléchargement
 url = "https://planning.univ-lemans.fr/jsp/custom/modules/plannings/anonymous_cal.jsp?resources=2975&projectId=8&calType=ical&nbWeeks=35"
 
-# --- PRÉPARATION ---
-if not os.path.exists(dossier_telechargement):
-    os.makedirs(dossier_telechargement)
+# Téléchargement HTTP direct (le navigateur ne sert plus que de secours)
+TIMEOUT_HTTP = (5, 30)  # (connexion, lecture) en secondes
+UTILISER_NAVIGATEUR_EN_SECOURS = True
 
 chemin_temp = os.path.join(dossier_telechargement, nom_temp)
 chemin_final = os.path.join(dossier_telechargement, nom_final)
-
-# Configuration Chrome
-options = Options()
-# options.add_argument("--headless")  # à activer si besoin
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-
-prefs = {
-    "download.default_directory": dossier_telechargement,
-    "download.prompt_for_download": False,
-    "download.directory_upgrade": True,
-    "safebrowsing.enabled": True
-}
-options.add_experimental_option("prefs", prefs)
-
-driver = webdriver.Chrome(options=options)
-
-try:
-    print("-> Ouverture du site...")
-    driver.get(url)
-
-    print("⏳ Téléchargement en cours...")
-    # Attente du téléchargement : boucle jusqu'à ce que le fichier apparaisse
-    timeout = 15  # secondes max
-    start = time.time()
-
-    while not os.path.exists(chemin_temp):
-        if time.time() - start > timeout:
-            raise TimeoutError("Le fichier n’a pas été téléchargé dans le délai imparti.")
-        time.sleep(1)
-
-    print(f"✅ Nouveau fichier téléchargé : {chemin_temp}")
-
-    # On remplace l'ancien ADECal.ics uniquement après téléchargement réussi
+chemin_meta = os.path.join(dossier_telechargement, nom_meta)
+
+# Session partagée : connexions réutilisées (keep-alive) entre les appels
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+session.headers.update({"User-Agent": "Mozilla/5.0"})
+
+
+def charger_meta():
+    if not os.path.exists(chemin_meta):
+        return {}
+    try:
+        with open(chemin_meta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def ecrire_atomique(chemin, contenu):
+    """Écrit dans un fichier temporaire puis le renomme : jamais de fichier à moitié écrit."""
+    tmp = chemin + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(contenu)
+    os.replace(tmp, chemin)
+
+
+def empreinte_ics(contenu):
+    """
+    sha256 du calendrier sans la date d'export qu'ADE ajoute à chaque description :
+    elle change à chaque téléchargement, même quand aucun cours n'a bougé.
+    """
+    deplie = contenu.replace(b"\r\n ", b"").replace(b"\r\n\t", b"").replace(b"\n ", b"")
+    return hashlib.sha256(sans_date_export(deplie.decode("utf-8", "replace")).encode("utf-8")).hexdigest()
+
+
+def sauver_meta(meta):
+    ecrire_atomique(chemin_meta, json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+def telecharger_http():
+    """
+    Télécharge l'ICS avec un GET conditionnel (If-None-Match / If-Modified-Since).
+    Renvoie True si ADECal.ics a changé, False s'il est identique au précédent (à la date
+    d'export près). Le résultat est gardé dans ADECal.meta.json ("modifie") : la fusion
+    (MoteurFusion.executer) ne refait rien si le calendrier n'a pas changé.
+    """
+    meta = charger_meta()
+    entetes = {}
     if os.path.exists(chemin_final):
-        os.remove(chemin_final)
-        print("🗑️ Ancien ADECal.ics supprimé.")
-
-    shutil.move(chemin_temp, chemin_final)
-    print(f"💾 Nouveau fichier enregistré sous : {chemin_final}")
-
-    # Supprime le fichier temporaire
-    if os.path.exists(chemin_temp):
-        os.remove(chemin_temp)
-        print(f"🗑️ Fichier temporaire supprimé : {chemin_temp}")
-
-except Exception as e:
-    print(f"⚠️ Erreur : {e}")
-
-finally:
-    driver.quit()
-
+        if meta.get("etag"):
+            entetes["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            entetes["If-Modified-Since"] = meta["last_modified"]
+
+    print("-> Téléchargement HTTP de l'ICS...")
+    r = session.get(url, headers=entetes, timeout=TIMEOUT_HTTP)
+    maintenant = datetime.now().isoformat(timespec="seconds")
+
+    if r.status_code == 304:
+        meta["verifie_le"] = maintenant
+        meta["modifie"] = False
+        sauver_meta(meta)
+        print("✅ ADECal.ics inchangé (304), rien à télécharger.")
+        return False
+
+    r.raise_for_status()
+    if b"BEGIN:VCALENDAR" not in r.content[:512]:
+        raise ValueError("La réponse ne ressemble pas à un fichier ICS.")
+
+    empreinte = empreinte_ics(r.content)
+    modifie = empreinte != meta.get("sha256") or not os.path.exists(chemin_final)
+    if modifie:
+        ecrire_atomique(chemin_final, r.content)
+        meta["modifie_le"] = maintenant
+        print(f"💾 Nouveau fichier enregistré sous : {chemin_final} ({len(r.content)} octets)")
+    else:
+        print("✅ ADECal.ics inchangé (même contenu), fichier conservé.")
+
+    meta.update({
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "sha256": empreinte,
+        "verifie_le": maintenant,
+        "modifie": modifie,
+    })
+    sauver_meta(meta)
+    return modifie
+
+
+def telecharger_via_navigateur():
+    """Ancienne méthode : Chrome télécharge le fichier, qu'on déplace ensuite en place."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    # Configuration Chrome
+    options = Options()
+    # options.add_argument("--headless")  # à activer si besoin
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    prefs = {
+        "download.default_directory": dossier_telechargement,
+        "download.prompt_for_download": False,
+        "download.directory_upgrade": True,
+        "safebrowsing.enabled": True
+    }
+    options.add_experimental_option("prefs", prefs)
+
+    driver = webdriver.Chrome(options=options)
+
+    try:
+        print("-> Ouverture du site...")
+        driver.get(url)
+
+        print("⏳ Téléchargement en cours...")
+        # Attente du téléchargement : boucle jusqu'à ce que le fichier apparaisse
+        timeout = 15  # secondes max
+        start = time.time()
+
+        while not os.path.exists(chemin_temp):
+            if time.time() - start > timeout:
+                raise TimeoutError("Le fichier n’a pas été téléchargé dans le délai imparti.")
+            time.sleep(1)
+
+        print(f"✅ Nouveau fichier téléchargé : {chemin_temp}")
+
+        # On remplace l'ancien ADECal.ics uniquement après téléchargement réussi
+        if os.path.exists(chemin_final):
+            os.remove(chemin_final)
+            print("🗑️ Ancien ADECal.ics supprimé.")
+
+        shutil.move(chemin_temp, chemin_final)
+        print(f"💾 Nouveau fichier enregistré sous : {chemin_final}")
+
+        # Supprime le fichier temporaire
+        if os.path.exists(chemin_temp):
+            os.remove(chemin_temp)
+            print(f"🗑️ Fichier temporaire supprimé : {chemin_temp}")
+
+        # Le contenu n'est plus celui décrit par l'ancien ETag
+        with open(chemin_final, "rb") as f:
+            sauver_meta({
+                "sha256": empreinte_ics(f.read()),
+                "verifie_le": datetime.now().isoformat(timespec="seconds"),
+                "modifie_le": datetime.now().isoformat(timespec="seconds"),
+                "modifie": True,
+            })
+
+    except Exception as e:
+        print(f"⚠️ Erreur : {e}")
+
+    finally:
+        driver.quit()
+
+
+def main():
+    # --- PRÉPARATION ---
+    if not os.path.exists(dossier_telechargement):
+        os.makedirs(dossier_telechargement)
+
+    try:
+        telecharger_http()
+    except Exception as e:
+        print(f"⚠️ Téléchargement HTTP échoué : {e}")
+        if UTILISER_NAVIGATEUR_EN_SECOURS:
+            print("-> Passage au téléchargement via le navigateur...")
+            telecharger_via_navigateur()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+serveur_flux.py
+- Petit serveur HTTP du flux ICS (remplace la copie dans wwwroot) : le calendrier publié est
+  gardé en mémoire, avec sa version gzip précalculée.
+- ETag fort (SHA-256 du contenu) : un client qui renvoie If-None-Match reçoit un 304 sans
+  corps tant que le planning n'a pas changé. Cache-Control et Last-Modified sont envoyés.
+- Le fichier publié est surveillé : quand le pipeline en écrit une nouvelle version
+  (remplacement atomique), les octets servis sont remplacés d'un coup, sans coupure.
+Usage : python serveur_flux.py [port]
+"""
+
+import gzip
+import hashlib
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---------------- CONFIG ----------------
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+FICHIER_PUBLIE = os.path.join(DOSSIER, "planning_fusion.ics")
+CHEMIN_URL = "/planning_fusion.ics"
+HOTE = "0.0.0.0"
+PORT = 8080
+MAX_AGE = 300  # secondes pendant lesquelles un client peut garder sa copie sans redemander
+INTERVALLE_SURVEILLANCE = 1.0  # secondes entre deux vérifications du fichier publié
+TYPE_CONTENU = "text/calendar; charset=utf-8"
+
+
+class VersionFlux:
+    """Une version publiée : octets bruts et gzip, ETags, date. Jamais modifiée après création."""
+
+    __slots__ = ("octets", "gzip", "etag", "etag_gzip", "modifie_le", "last_modified")
+
+    def __init__(self, octets, modifie_le=None):
+        self.octets = octets
+        self.gzip = gzip.compress(octets, compresslevel=9, mtime=0)
+        empreinte = hashlib.sha256(octets).hexdigest()
+        self.etag = f'"{empreinte}"'
+        # Représentation différente -> ETag différent (RFC 9110)
+        self.etag_gzip = f'"{empreinte}-gz"'
+        self.modifie_le = int(modifie_le if modifie_le is not None else time.time())
+        self.last_modified = formatdate(self.modifie_le, usegmt=True)
+
+
+class FluxCalendrier:
+    """Calendrier servi. La version courante est remplacée par une seule affectation."""
+
+    def __init__(self, chemin=FICHIER_PUBLIE):
+        self.chemin = chemin
+        self.version = None
+        self._signature = None  # (mtime_ns, taille) du fichier déjà chargé
+        self.remplacements = 0
+
+    def publier(self, octets, modifie_le=None):
+        """Remplace les octets servis (sans effet si le contenu est identique)."""
+        nouvelle = VersionFlux(octets, modifie_le)
+        if self.version is not None and nouvelle.etag == self.version.etag:
+            return False
+        self.version = nouvelle
+        self.remplacements += 1
+        return True
+
+    def recharger(self):
+        """Relit le fichier publié s'il a changé. Renvoie True si la version servie a changé."""
+        try:
+            st = os.stat(self.chemin)
+        except FileNotFoundError:
+            return False
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return False
+        with open(self.chemin, "rb") as f:
+            octets = f.read()
+        self._signature = signature
+        change = self.publier(octets, st.st_mtime)
+        if change:
+            print(f"🔄 Nouvelle version servie ({len(octets)} octets, ETag {self.version.etag[1:13]})")
+        return change
+
+    def surveiller(self, intervalle=INTERVALLE_SURVEILLANCE, arret=None):
+        """Boucle de surveillance du fichier publié (à lancer dans un thread)."""
+        arret = arret or threading.Event()
+        while not arret.wait(intervalle):
+            try:
+                self.recharger()
+            except OSError as e:
+                print(f"⚠️ Lecture de {self.chemin} impossible : {e}")
+
+
+def _etag_correspond(if_none_match, etags):
+    """If-None-Match (liste d'ETags, éventuellement faibles W/, ou *) contient-il un des nôtres ?"""
+    if if_none_match.strip() == "*":
+        return True
+    for candidat in if_none_match.split(","):
+        candidat = candidat.strip()
+        if candidat.startswith("W/"):
+            candidat = candidat[2:]
+        if candidat in etags:
+            return True
+    return False
+
+
+def _accepte_gzip(accept_encoding):
+    for codage in accept_encoding.split(","):
+        nom, _, params = codage.strip().partition(";")
+        if nom.strip().lower() in ("gzip", "x-gzip"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class GestionnaireFlux(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # connexions gardées ouvertes entre deux requêtes
+    flux = None  # FluxCalendrier, fixé par creer_serveur
+    journaliser = True
+
+    def do_HEAD(self):
+        self.do_GET(corps=False)
+
+    def do_GET(self, corps=True):
+        if self.path.split("?", 1)[0] != CHEMIN_URL:
+            self._repondre(404, b"Introuvable\n", {"Content-Type": "text/plain; charset=utf-8"}, corps)
+            return
+        version = self.flux.version  # lue une seule fois : cohérente même si un remplacement arrive
+        if version is None:
+            self._repondre(503, b"Planning pas encore disponible\n",
+                           {"Content-Type": "text/plain; charset=utf-8", "Retry-After": "5"}, corps)
+            return
+
+        en_gzip = _accepte_gzip(self.headers.get("Accept-Encoding", ""))
+        etag = version.etag_gzip if en_gzip else version.etag
+        entetes = {"ETag": etag, "Last-Modified": version.last_modified,
+                   "Cache-Control": f"public, max-age={MAX_AGE}, must-revalidate",
+                   "Vary": "Accept-Encoding"}
+
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            inchange = _etag_correspond(if_none_match, (version.etag, version.etag_gzip))
+        else:
+            inchange = self._non_modifie_depuis(version)
+        if inchange:
+            self._repondre(304, b"", entetes, corps)
+            return
+
+        entetes["Content-Type"] = TYPE_CONTENU
+        if en_gzip:
+            entetes["Content-Encoding"] = "gzip"
+        self._repondre(200, version.gzip if en_gzip else version.octets, entetes, corps)
+
+    def _non_modifie_depuis(self, version):
+        valeur = self.headers.get("If-Modified-Since")
+        if not valeur:
+            return False
+        try:
+            return version.modifie_le <= parsedate_to_datetime(valeur).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def _repondre(self, statut, contenu, entetes, corps=True):
+        self.send_response(statut)
+        for nom, valeur in entetes.items():
+            self.send_header(nom, valeur)
+        if statut != 304:
+            self.send_header("Content-Length", str(len(contenu)))
+        self.end_headers()
+        if corps and statut != 304:
+            self.wfile.write(contenu)
+
+    def log_message(self, format, *args):
+        if self.journaliser:
+            super().log_message(format, *args)
+
+
+def creer_serveur(flux, hote=HOTE, port=PORT, journaliser=True):
+    """Serveur HTTP (un thread par connexion) qui sert `flux`."""
+    gestionnaire = type("Gestionnaire", (GestionnaireFlux,), {"flux": flux, "journaliser": journaliser})
+    serveur = ThreadingHTTPServer((hote, port), gestionnaire)
+    serveur.daemon_threads = True
+    return serveur
+
+
+def main(port=PORT):
+    flux = FluxCalendrier()
+    if not flux.recharger():
+        print(f"⚠️ {flux.chemin} introuvable : le flux répondra 503 jusqu'à sa publication.")
+    threading.Thread(target=flux.surveiller, daemon=True).start()
+    serveur = creer_serveur(flux, port=port)
+    print(f"🌐 Flux ICS servi sur http://{HOTE}:{port}{CHEMIN_URL}")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Serveur arrêté.")
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else PORT)
@@ -0,0 +1,105 @@
+"""
+test_appariement.py
+- Vérifications de appariement.py (IndexCours, Apparieur) :
+    * à ±0 min, le même cours JSON est retenu que par l'ancien appariement à clé exacte ;
+    * bornes de la tolérance et du mode chevauchement ;
+    * ordre des règles (enseignement, matière, prof, seul candidat) et compteurs.
+Usage : python -m pytest test_appariement.py (ou python test_appariement.py)
+"""
+
+import random
+from datetime import date
+
+from appariement import Apparieur, CoursJSON, IndexCours, MODE_CHEVAUCHEMENT, MODE_TOLERANCE
+from bench_appariement import ancien_choix, construire_index, generer, MATIERES
+
+JOUR = date(2025, 9, 1)
+
+
+def index_de(cours):
+    """`cours` : [(debut, fin, matiere, prof)] le même jour."""
+    js = [{"date": JOUR.isoformat(), "cours": m, "professeur": p, "salle": "S", "_debut": d, "_fin": f}
+          for d, f, m, p in cours]
+    return js, construire_index(js)
+
+
+def choix_indices(apparieur, ade):
+    return [None if c is None else c.idx for c in
+            (apparieur.apparier(*evenement) for evenement in ade)]
+
+
+def test_tolerance_zero_comme_ancien():
+    ade, js = generer(120)
+    apparieur = Apparieur(construire_index(js), MODE_TOLERANCE, 0)
+    assert choix_indices(apparieur, ade) == ancien_choix(ade, js)
+
+
+def test_tolerance_zero_comme_ancien_avec_doublons():
+    # Plusieurs cours JSON sur le même créneau : c'est l'ordre du JSON qui départage
+    rnd = random.Random(5)
+    js, ade = [], []
+    for _ in range(400):
+        debut = rnd.choice([480, 600, 810])
+        matiere = rnd.choice(MATIERES)
+        prof = rnd.choice(["", "M. Prof1", "M. Prof2"])
+        js.append({"date": JOUR.isoformat(), "cours": matiere, "professeur": prof, "salle": "S",
+                   "_debut": debut, "_fin": debut + 120})
+    for _ in range(300):
+        debut = rnd.choice([480, 600, 810, 900])
+        titre = rnd.choice(["TD ESGT " + rnd.choice(MATIERES), "Enseignement ESGT", "TP Divers"])
+        ade.append((JOUR, debut, debut + 120, titre, rnd.choice(["", "L1 Prépa\nM. Prof2"])))
+    apparieur = Apparieur(construire_index(js), MODE_TOLERANCE, 0)
+    assert choix_indices(apparieur, ade) == ancien_choix(ade, js)
+
+
+def test_bornes_tolerance():
+    _, index = index_de([(600, 720, "Analyse", "")])
+    assert [c.idx for c in index.candidats(JOUR, 595, 715, MODE_TOLERANCE, 5)] == [0]
+    assert [c.idx for c in index.candidats(JOUR, 605, 725, MODE_TOLERANCE, 5)] == [0]
+    assert index.candidats(JOUR, 594, 720, MODE_TOLERANCE, 5) == []
+    assert index.candidats(JOUR, 600, 726, MODE_TOLERANCE, 5) == []
+    assert index.candidats(JOUR, 601, 720, MODE_TOLERANCE, 0) == []
+    assert index.candidats(date(2025, 9, 2), 600, 720, MODE_TOLERANCE, 5) == []
+
+
+def test_tolerance_plus_proche_d_abord():
+    _, index = index_de([(605, 725, "Analyse", ""), (600, 720, "Analyse", ""), (598, 718, "Analyse", "")])
+    assert [c.idx for c in index.candidats(JOUR, 600, 720, MODE_TOLERANCE, 5)] == [1, 2, 0]
+
+
+def test_chevauchement():
+    # Un cours long commencé tôt doit être trouvé (duree_max), un cours adjacent non
+    _, index = index_de([(480, 720, "Analyse", ""), (720, 840, "Analyse", ""), (690, 750, "Analyse", "")])
+    assert [c.idx for c in index.candidats(JOUR, 660, 720, MODE_CHEVAUCHEMENT)] == [0, 2]
+    assert [c.idx for c in index.candidats(JOUR, 700, 760, MODE_CHEVAUCHEMENT)] == [2, 1, 0]
+    assert index.candidats(JOUR, 840, 900, MODE_CHEVAUCHEMENT) == []
+
+
+def test_regles_et_compteurs():
+    _, index = index_de([(600, 720, "Géométrie 2", "M. Prof7"), (600, 720, "Analyse", "M. Prof3")])
+    apparieur = Apparieur(index, MODE_TOLERANCE, 0)
+    assert apparieur.apparier(JOUR, 600, 720, "Enseignement ESGT", "").idx == 0
+    assert apparieur.apparier(JOUR, 600, 720, "TD ESGT Analyse", "").idx == 1
+    assert apparieur.apparier(JOUR, 600, 720, "TD ESGT Divers", "L1\nM. Prof3").idx == 1
+    # Deux candidats, aucune règle : pas de match
+    assert apparieur.apparier(JOUR, 600, 720, "TD ESGT Divers", "") is None
+
+    _, seul = index_de([(600, 720, "Analyse", "")])
+    apparieur_seul = Apparieur(seul, MODE_TOLERANCE, 5)
+    assert apparieur_seul.apparier(JOUR, 605, 720, "TP Divers", "").idx == 0
+    assert apparieur.stats == {"match": 3, "sans_match": 1, "ecart_horaire": 0,
+                               "enseignement": 1, "matiere": 1, "prof": 1, "seul_candidat": 0}
+    assert apparieur_seul.stats["seul_candidat"] == 1 and apparieur_seul.stats["ecart_horaire"] == 1
+
+
+def test_jetons_precalcules():
+    c = CoursJSON(0, {"cours": "TD de Géométrie 2", "professeur": "  M. Prof7 "}, 0, 60)
+    assert c.jetons == frozenset({"géométrie"}) and c.prof_norm == "m. prof7"
+    assert IndexCours().candidats(JOUR, 0, 60) == []
+
+
+if __name__ == "__main__":
+    for nom, test in list(globals().items()):
+        if nom.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {nom}")
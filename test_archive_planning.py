@@ -0,0 +1,166 @@
+"""
+test_archive_planning.py
+- Vérifications de archive_planning.py (Instantane, ArchivePlanning) :
+    * découpage / recomposition d'un planning octet pour octet (doublons d'UID, LF,
+      octets non UTF-8, fichier sans VEVENT) ;
+    * difference puis appliquer redonne exactement le nouveau planning ;
+    * reconstruire est exact pour chaque publication, de part et d'autre des images ;
+    * changements comparé aux plannings reconstruits ; publications sans changement.
+Usage : python -m pytest test_archive_planning.py (ou python test_archive_planning.py)
+"""
+
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+from archive_planning import ArchivePlanning, INTERVALLE_IMAGES, Instantane
+
+ENTETE = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Test//FR\r\n"
+PIED = b"END:VCALENDAR\r\n"
+DEBUT = datetime(2026, 9, 1, 8, 0)
+
+
+def vevent(uid, texte, nl=b"\r\n"):
+    return nl.join([b"BEGIN:VEVENT", b"UID:" + uid.encode(), b"SUMMARY:" + texte, b"END:VEVENT"]) + nl
+
+
+def planning(evenements, entete=ENTETE):
+    return entete + b"".join(vevent(uid, texte) for uid, texte in evenements) + PIED
+
+
+def evolutions(n, graine=3):
+    """n plannings successifs, tous différents : ajouts, suppressions, modifications, déplacements."""
+    rnd = random.Random(graine)
+    evenements = [(f"U{i}", f"Cours {i}".encode()) for i in range(30)]
+    entete, suivant, versions = ENTETE, 30, []
+    while len(versions) < n:
+        for _ in range(rnd.randint(1, 4)):
+            action = rnd.random()
+            if action < 0.25:
+                evenements.insert(rnd.randint(0, len(evenements)), (f"U{suivant}", f"Nouveau {suivant}".encode()))
+                suivant += 1
+            elif action < 0.45 and evenements:
+                evenements.pop(rnd.randrange(len(evenements)))
+            elif action < 0.8 and evenements:
+                i = rnd.randrange(len(evenements))
+                evenements[i] = (evenements[i][0], evenements[i][1] + rnd.choice([b" GrA", " é".encode(), b"\xff"]))
+            elif evenements:
+                evenements.insert(rnd.randint(0, len(evenements) - 1), evenements.pop(rnd.randrange(len(evenements))))
+        if rnd.random() < 0.1:
+            entete = ENTETE + b"X-WR-CALNAME:Version %d\r\n" % len(versions)
+        contenu = planning(evenements, entete)
+        if not versions or contenu != versions[-1]:
+            versions.append(contenu)
+    return versions
+
+
+def test_instantane_octet_pour_octet():
+    cas = [
+        planning([("A", b"a"), ("B", b"b"), ("A", b"doublon"), ("A", b"encore")]),
+        ENTETE + vevent("A", b"lf", b"\n") + b"\r\n" + vevent("B", "é\xff".encode("latin-1")) + PIED,
+        ENTETE + PIED,
+        b"",
+    ]
+    for contenu in cas:
+        assert Instantane.depuis_octets(contenu).en_octets() == contenu
+    assert Instantane.depuis_octets(cas[0]).cles == ["A", "B", "A#1", "A#2"]
+
+
+def test_difference_puis_appliquer():
+    versions = evolutions(60, graine=8)
+    for avant, apres in zip(versions, versions[1:]):
+        etat = Instantane.depuis_octets(avant)
+        etat.appliquer(etat.difference(Instantane.depuis_octets(apres)))
+        assert etat.en_octets() == apres
+    # Liste des clés entièrement renversée
+    a = Instantane.depuis_octets(planning([(f"U{i}", b"x") for i in range(10)]))
+    b = Instantane.depuis_octets(planning([(f"U{i}", b"x") for i in reversed(range(10))]))
+    a.appliquer(a.difference(b))
+    assert a.en_octets() == b.en_octets()
+
+
+def archiver_tout(dossier, versions, intervalle=INTERVALLE_IMAGES):
+    """Archive chaque version (et quelques republications identiques) ; renvoie [(horodatage, contenu)]."""
+    archive = ArchivePlanning(dossier, intervalle)
+    source = os.path.join(dossier, "planning_fusion.ics")
+    publies, instant = [], DEBUT
+    for i, contenu in enumerate(versions):
+        for _ in range(2 if i % 7 == 3 else 1):
+            with open(source, "wb") as f:
+                f.write(contenu)
+            archive.archiver(source, instant)
+            publies.append((instant, contenu))
+            instant += timedelta(hours=6)
+    return archive, publies
+
+
+def test_reconstruire_a_travers_les_images():
+    versions = evolutions(2 * INTERVALLE_IMAGES + 5)
+    dossier = tempfile.mkdtemp()
+    try:
+        archive, publies = archiver_tout(dossier, versions)
+        assert archive.derniere_version() == len(versions) - 1
+        images = sorted(n for n in os.listdir(os.path.join(dossier, "versions")) if ".image." in n)
+        assert images == [f"{v:06d}.image.json.gz" for v in (0, INTERVALLE_IMAGES, 2 * INTERVALLE_IMAGES)]
+
+        # Relu depuis le disque, sans le cache de l'objet
+        relue = ArchivePlanning(dossier)
+        assert relue.reconstruire(DEBUT - timedelta(seconds=1)) is None
+        for instant, contenu in publies:
+            assert relue.reconstruire(instant) == contenu
+            assert relue.reconstruire(instant + timedelta(hours=5)) == contenu
+        # Les versions qui touchent une image, de part et d'autre
+        for v in (INTERVALLE_IMAGES - 1, INTERVALLE_IMAGES, INTERVALLE_IMAGES + 1, 2 * INTERVALLE_IMAGES):
+            assert relue.instantane(v).en_octets() == versions[v]
+    finally:
+        shutil.rmtree(dossier)
+
+
+def test_petit_intervalle_et_republication():
+    versions = evolutions(25, graine=5)
+    dossier = tempfile.mkdtemp()
+    try:
+        archive, publies = archiver_tout(dossier, versions, intervalle=3)
+        assert len(archive.entrees()) == len(publies) > len(versions)
+        relue = ArchivePlanning(dossier, intervalle_images=3)
+        for instant, contenu in publies:
+            assert relue.reconstruire(instant) == contenu
+        # Republication identique : même version, aucun fichier écrit
+        nb_fichiers = len(os.listdir(os.path.join(dossier, "versions")))
+        entree, delta = archive.archiver(os.path.join(dossier, "planning_fusion.ics"), publies[-1][0] + timedelta(1))
+        assert delta is None and entree["version"] == len(versions) - 1
+        assert len(os.listdir(os.path.join(dossier, "versions"))) == nb_fichiers
+    finally:
+        shutil.rmtree(dossier)
+
+
+def test_changements():
+    versions = evolutions(2 * INTERVALLE_IMAGES + 5, graine=13)
+    dossier = tempfile.mkdtemp()
+    try:
+        archive, publies = archiver_tout(dossier, versions)
+        rnd = random.Random(1)
+        for _ in range(60):
+            (t1, c1), (t2, c2) = sorted(rnd.sample(publies, 2))
+            a, b = Instantane.depuis_octets(c1), Instantane.depuis_octets(c2)
+            diff = archive.changements(t1, t2)
+            assert diff["ajoutes"] == sorted(set(b.cles) - set(a.cles))
+            assert diff["supprimes"] == sorted(set(a.cles) - set(b.cles))
+            communs = set(a.cles) & set(b.cles)
+            # Modifiés : au moins ceux dont le texte diffère, jamais hors des UID communs
+            assert {c for c in communs if a.evenements[c] != b.evenements[c]} <= set(diff["modifies"]) <= communs
+        # Avant la première publication : tout est ajouté
+        tout = archive.changements(DEBUT - timedelta(1), publies[0][0])
+        assert tout["ajoutes"] == sorted(Instantane.depuis_octets(versions[0]).cles)
+        assert archive.changements(publies[0][0], publies[0][0]) == {"ajoutes": [], "supprimes": [], "modifies": []}
+    finally:
+        shutil.rmtree(dossier)
+
+
+if __name__ == "__main__":
+    for nom, test in list(globals().items()):
+        if nom.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {nom}")
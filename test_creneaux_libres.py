@@ -0,0 +1,112 @@
+"""
+test_creneaux_libres.py
+- Vérifications de creneaux_libres.py :
+    * fusion des intervalles occupés (chevauchants, adjacents, vides) ;
+    * bornes de fenetre_libre : fenêtre collée à un cours, marge, durée raccourcie ;
+    * comparaison avec un parcours minute par minute sur des journées aléatoires ;
+    * placer_sur_periode en heure de Paris, y compris au changement d'heure.
+Usage : python -m pytest test_creneaux_libres.py (ou python test_creneaux_libres.py)
+"""
+
+import random
+from datetime import date, datetime, time
+
+import pytz
+
+from creneaux_libres import Activite, Occupation, placer_sur_periode
+
+PARIS_TZ = pytz.timezone("Europe/Paris")
+
+
+def reference(occupes, debut, fin, duree, marge, duree_min):
+    """Première fenêtre libre, minute par minute."""
+    def libre(t):
+        return not any(d - marge <= t < f + marge for d, f in occupes if f > d)
+
+    for s in range(debut, fin):
+        if not libre(s) or (s > debut and libre(s - 1)):
+            continue
+        fin_libre = s
+        while fin_libre < fin and libre(fin_libre):
+            fin_libre += 1
+        if fin_libre - s >= duree_min:
+            return s, min(s + duree, fin_libre)
+    return None
+
+
+def test_fusion_des_intervalles():
+    occ = Occupation([(50, 60), (10, 20), (20, 30), (15, 25), (40, 40), (55, 70)])
+    assert (occ.debuts, occ.fins) == ([10, 50], [30, 70])
+    occ.ajouter([(30, 35), (80, 90)])
+    assert (occ.debuts, occ.fins) == ([10, 50, 80], [35, 70, 90])
+
+
+def test_bornes():
+    occ = Occupation([(600, 660), (720, 780)])
+    # Fenêtre qui commence pile à la fin d'un cours / finit pile à son début
+    assert occ.fenetre_libre(660, 720, 60) == (660, 720)
+    assert occ.fenetre_libre(540, 600, 60) == (540, 600)
+    assert occ.fenetre_libre(540, 601, 60) == (540, 600)
+    # Marge : il ne reste que 50 min entre les deux cours
+    assert occ.fenetre_libre(600, 780, 60, marge=5) is None
+    assert occ.fenetre_libre(600, 780, 60, marge=5, duree_min=50) == (665, 715)
+    assert occ.fenetre_libre(600, 780, 60, marge=5, duree_min=51) is None
+    # Ouverture au milieu d'un cours, fermeture au milieu du suivant
+    assert occ.fenetre_libre(630, 750, 45, marge=5) == (665, 710)
+    # Rien d'occupé / fenêtre vide
+    assert Occupation().fenetre_libre(0, 45, 45) == (0, 45)
+    assert Occupation().fenetre_libre(0, 44, 45) is None
+    assert occ.fenetre_libre(700, 700, 1) is None
+
+
+def test_comme_le_parcours_minute_par_minute():
+    rnd = random.Random(11)
+    for _ in range(800):
+        occupes = []
+        for _ in range(rnd.randint(0, 6)):
+            d = rnd.randint(0, 240)
+            occupes.append((d, d + rnd.randint(0, 60)))
+        debut = rnd.randint(0, 200)
+        fin = debut + rnd.randint(0, 120)
+        duree = rnd.randint(1, 60)
+        duree_min = rnd.randint(1, duree)
+        marge = rnd.choice([0, 0, 5, 10])
+        attendu = reference(occupes, debut, fin, duree, marge, duree_min)
+        assert Occupation(occupes).fenetre_libre(debut, fin, duree, marge, duree_min) == attendu, \
+            (occupes, debut, fin, duree, marge, duree_min)
+
+
+def test_placer_sur_periode_heure_de_paris():
+    # Semaine du passage à l'heure d'hiver (dimanche 25/10/2026)
+    cours = [(PARIS_TZ.localize(datetime(2026, 10, j, 10, 15)), PARIS_TZ.localize(datetime(2026, 10, j, 12, 15)))
+             for j in (23, 26)]
+    midi = Activite("midi", time(11, 30), time(14, 0), 45, marge=5)
+    creneaux = placer_sur_periode(midi, Occupation.depuis_datetimes(cours),
+                                  date(2026, 10, 23), date(2026, 10, 27), PARIS_TZ, jours_semaine={0, 1, 4})
+    assert sorted(creneaux) == [date(2026, 10, 23), date(2026, 10, 26), date(2026, 10, 27)]
+    heures = {j: (d.strftime("%H:%M"), f.strftime("%H:%M")) for j, (d, f) in creneaux.items()}
+    assert heures == {date(2026, 10, 23): ("12:20", "13:05"),
+                      date(2026, 10, 26): ("12:20", "13:05"),
+                      date(2026, 10, 27): ("11:30", "12:15")}
+    # Heure d'été avant le 25/10, heure d'hiver après
+    assert creneaux[date(2026, 10, 23)][0].utcoffset().total_seconds() == 7200
+    assert creneaux[date(2026, 10, 26)][0].utcoffset().total_seconds() == 3600
+
+
+def test_au_plus_tot_et_journee_pleine():
+    cours = [(PARIS_TZ.localize(datetime(2026, 11, 2, 8)), PARIS_TZ.localize(datetime(2026, 11, 2, 20)))]
+    occ = Occupation.depuis_datetimes(cours)
+    soir = Activite("soir", time(18, 30), time(21, 0), 45, marge=5, duree_min=30)
+    d, f = soir.fenetre(date(2026, 11, 2), occ, PARIS_TZ)
+    assert (d.strftime("%H:%M"), f.strftime("%H:%M")) == ("20:05", "20:50")
+    tard = Activite("tard", time(18, 0), time(23, 0), 30, au_plus_tot=time(21, 0))
+    d, _ = tard.fenetre(date(2026, 11, 2), occ, PARIS_TZ)
+    assert d.strftime("%H:%M") == "21:00"
+    assert Activite("matin", time(9, 0), time(12, 0), 30).fenetre(date(2026, 11, 2), occ, PARIS_TZ) is None
+
+
+if __name__ == "__main__":
+    for nom, test in list(globals().items()):
+        if nom.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {nom}")
@@ -0,0 +1,160 @@
+"""
+test_regles_groupes.py
+- Vérifications de regles_groupes.py et du remplacement de SUMMARY en place (flux_ics.py,
+  anglais_planning.py) :
+    * peut_concerner n'écarte jamais un titre que nouveau_titre changerait ;
+    * priorité des règles, motifs, suffixe déjà présent ;
+    * ligne SUMMARY remplacée : paramètres gardés, repliée à 75 octets sans couper un
+      caractère, échappée, VALARM intacte, fins de ligne LF conservées ;
+    * anglais_planning.main : seules les lignes SUMMARY visées changent dans le fichier.
+Usage : python -m pytest test_regles_groupes.py (ou python test_regles_groupes.py)
+"""
+
+import os
+import random
+import re
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+
+import pytz
+from icalendar import Calendar
+
+import anglais_planning
+from flux_ics import position_propriete, remplacer_propriete
+from regles_groupes import FORMAT_DATE, MoteurGroupes
+
+PARIS_TZ = pytz.timezone("Europe/Paris")
+J1, J2, J3 = date(2026, 11, 3), date(2026, 11, 10), date(2026, 11, 17)
+
+
+def moteur_de_test(jours=(J1, J2, J3)):
+    j1, j2, j3 = (j.strftime(FORMAT_DATE) for j in jours)
+    return MoteurGroupes({"regles": [
+        {"cours": "TD ESGT Anglais", "groupes": [
+            {"suffixe": "GrA", "dates": [j1]},
+            {"suffixe": "GrB", "dates": [j1, j2]},
+            {"suffixe": "Online", "dates": [j3]}]},
+        {"motif": r"TP ESGT (Espagnol|Allemand)( \d)?", "groupes": [
+            {"suffixe": "Labo", "dates": [j2]}]},
+    ]})
+
+
+def test_regles():
+    m = moteur_de_test()
+    assert m.peut_concerner("  TD ESGT Anglais ") and m.peut_concerner("TP ESGT Allemand 2")
+    assert not m.peut_concerner("TD ESGT Anglais renforcé") and not m.peut_concerner("TP ESGT Espagnol avancé")
+    # Première règle / premier groupe du fichier prioritaire
+    assert m.nouveau_titre("TD ESGT Anglais", J1) == "TD ESGT Anglais GrA"
+    assert m.nouveau_titre("TD ESGT Anglais", J2) == "TD ESGT Anglais GrB"
+    assert m.nouveau_titre("TD ESGT Anglais GrB", J2) is None
+    assert m.nouveau_titre("TP ESGT Espagnol", J2) == "TP ESGT Espagnol Labo"
+    assert m.nouveau_titre("TP ESGT Espagnol", J1) is None
+    assert m.nouveau_titre("TD ESGT Anglais", J1 + timedelta(days=1)) is None
+    assert m.dernier_jour == J3
+    assert MoteurGroupes({}).dernier_jour is None and not MoteurGroupes({}).peut_concerner("x")
+
+
+def test_prefiltre_sans_faux_negatif():
+    m = moteur_de_test()
+    rnd = random.Random(2)
+    mots = ["TD", "TP", "ESGT", "Anglais", "Espagnol", "Allemand", "2", "GrB", "renforcé", ""]
+    for _ in range(3000):
+        titre = " ".join(rnd.choice(mots) for _ in range(rnd.randint(1, 4))).strip()
+        for jour in (J1, J2, J3):
+            if m.nouveau_titre(titre, jour) is not None:
+                assert m.peut_concerner(titre), titre
+
+
+def vevent(summary_ligne, alarme=False, nl=b"\r\n"):
+    lignes = [b"BEGIN:VEVENT", b"UID:1", b"DTSTART:20261103T080000Z", summary_ligne, b"LOCATION:C03"]
+    if alarme:
+        lignes += [b"BEGIN:VALARM", b"ACTION:DISPLAY", b"SUMMARY:Rappel", b"END:VALARM"]
+    lignes.append(b"END:VEVENT")
+    return nl.join(l for l in lignes if l is not None) + nl
+
+
+def summary_lu(bloc):
+    cal = Calendar.from_ical(b"BEGIN:VCALENDAR\r\n" + bloc.replace(b"\n", b"\r\n").replace(b"\r\r\n", b"\r\n")
+                             + b"END:VCALENDAR\r\n")
+    return [str(c["SUMMARY"]) for c in cal.walk("VEVENT")][0]
+
+
+def test_remplacer_summary():
+    # Paramètres conservés, le reste du bloc identique
+    bloc = vevent(b"SUMMARY;LANGUAGE=fr:TD ESGT Anglais", alarme=True)
+    nouveau = remplacer_propriete(bloc, "SUMMARY", "TD ESGT Anglais GrA")
+    assert nouveau == bloc.replace(b"SUMMARY;LANGUAGE=fr:TD ESGT Anglais", b"SUMMARY;LANGUAGE=fr:TD ESGT Anglais GrA")
+    # Échappement et repliage (75 octets, caractères UTF-8 entiers)
+    titre = "TD ESGT Anglais, oral; écrit " + "é" * 60
+    nouveau = remplacer_propriete(bloc, "SUMMARY", titre)
+    assert summary_lu(nouveau) == titre
+    assert all(len(l) <= 75 for l in nouveau.split(b"\r\n"))
+    for l in nouveau.split(b"\r\n"):
+        l.decode("utf-8")
+    assert b"SUMMARY:Rappel" in nouveau
+    # Ancienne valeur repliée sur plusieurs lignes : entièrement remplacée
+    plie = vevent(b"SUMMARY:TD ESGT Anglais " + b"x" * 70 + b"\r\n suite\r\n\tfin")
+    assert summary_lu(remplacer_propriete(plie, "SUMMARY", "Court")) == "Court"
+    assert b"suite" not in remplacer_propriete(plie, "SUMMARY", "Court")
+
+
+def test_summary_absent_et_fins_lf():
+    bloc = vevent(None, alarme=True)
+    nouveau = remplacer_propriete(bloc, "SUMMARY", "Ajouté")
+    assert nouveau.index("SUMMARY:Ajouté".encode()) < nouveau.index(b"BEGIN:VALARM")
+    assert summary_lu(nouveau) == "Ajouté"
+    lf = vevent(b"SUMMARY:TD ESGT Anglais", nl=b"\n")
+    nouveau = remplacer_propriete(lf, "SUMMARY", "TD ESGT Anglais GrB")
+    assert b"\r" not in nouveau and nouveau == lf.replace(b"Anglais\n", b"Anglais GrB\n")
+    # La propriété d'un sous-composant n'est jamais prise pour celle du VEVENT
+    assert position_propriete(vevent(None, alarme=True), "SUMMARY") is None
+
+
+def test_anglais_main_ne_change_que_les_summary():
+    demain = datetime.now(PARIS_TZ).date() + timedelta(days=1)
+    jours = (demain, demain + timedelta(days=7), demain + timedelta(days=14))
+    moteur = moteur_de_test(jours)
+    titres = ["TD ESGT Anglais", "TD ESGT Analyse", "TP ESGT Allemand 2", "TD ESGT Anglais GrB"]
+    blocs = []
+    for n in range(40):
+        jour = jours[n % 3] if n % 4 else demain - timedelta(days=10)  # quelques cours passés
+        debut = PARIS_TZ.localize(datetime.combine(jour, datetime.min.time().replace(hour=8 + n % 8)))
+        blocs.append(b"BEGIN:VEVENT\r\nUID:E%d\r\nDTSTART:%s\r\nSUMMARY:%s\r\nDESCRIPTION:D\\, %d\r\nEND:VEVENT\r\n"
+                     % (n, debut.astimezone(pytz.utc).strftime("%Y%m%dT%H%M%SZ").encode(),
+                        titres[n % len(titres)].encode(), n))
+    contenu = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + b"".join(blocs) + b"END:VCALENDAR\r\n"
+
+    dossier = tempfile.mkdtemp()
+    chemin = os.path.join(dossier, "planning_fusion.ics")
+    with open(chemin, "wb") as f:
+        f.write(contenu)
+    ancien_fichier, ancien_moteur = anglais_planning.FILENAME, anglais_planning.charger_moteur
+    anglais_planning.FILENAME, anglais_planning.charger_moteur = chemin, lambda: moteur
+    try:
+        anglais_planning.main()
+        with open(chemin, "rb") as f:
+            resultat = f.read()
+    finally:
+        anglais_planning.FILENAME, anglais_planning.charger_moteur = ancien_fichier, ancien_moteur
+        shutil.rmtree(dossier)
+
+    # Référence : titres attendus calculés sur les événements lus par icalendar
+    now = datetime.now(PARIS_TZ)
+    attendus = []
+    for ev in Calendar.from_ical(contenu).walk("VEVENT"):
+        titre, debut = str(ev["SUMMARY"]), ev["DTSTART"].dt.astimezone(PARIS_TZ)
+        nouveau = moteur.nouveau_titre(titre, debut.date()) if debut >= now else None
+        attendus.append(nouveau or titre)
+    assert [str(ev["SUMMARY"]) for ev in Calendar.from_ical(resultat).walk("VEVENT")] == attendus
+    assert attendus != [str(ev["SUMMARY"]) for ev in Calendar.from_ical(contenu).walk("VEVENT")]
+    # Tout le reste est recopié octet pour octet
+    sans_summary = re.compile(rb"SUMMARY:[^\r]*\r\n")
+    assert sans_summary.sub(b"", resultat) == sans_summary.sub(b"", contenu)
+
+
+if __name__ == "__main__":
+    for nom, test in list(globals().items()):
+        if nom.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {nom}")
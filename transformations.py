@@ -0,0 +1,71 @@
+"""
+transformations.py
+- Étapes de transformation branchées sur le flux d'événements produit par la fusion :
+  le planning n'est lu qu'une fois (par la fusion) et écrit une seule fois, à la fin.
+- Une étape reçoit le FluxPlanning et remplace ou modifie sa liste d'événements
+  (ex : menus, groupes d'anglais). Les étapes de publication passent après l'écriture.
+- Chaque étape est chronométrée et peut être désactivée.
+"""
+
+import time
+import traceback
+
+from flux_ics import evenement_depuis_octets
+from pipeline_planning import OK, ECHEC, IGNOREE
+
+
+class FluxPlanning:
+    """Événements futurs en mémoire (EvenementICS) ; l'historique gelé reste sur disque."""
+
+    def __init__(self, evenements, chemin_sortie=None):
+        self.evenements = evenements
+        self.chemin_sortie = chemin_sortie
+        self.ecrit = None  # après l'écriture : False si la sortie était déjà à jour
+
+    @classmethod
+    def depuis_octets(cls, bruts, chemin_sortie=None):
+        return cls([evenement_depuis_octets(b) for b in bruts], chemin_sortie)
+
+
+class Transformation:
+    """Une étape : fonction(flux), activable, avant ou après l'écriture finale."""
+
+    def __init__(self, nom, fonction, active=True, apres_ecriture=False):
+        self.nom = nom
+        self.fonction = fonction
+        self.active = active
+        self.apres_ecriture = apres_ecriture
+
+
+def appliquer(flux, transformations, apres_ecriture=False):
+    """
+    Exécute, dans l'ordre, les étapes de la phase demandée (avant / après écriture).
+    Une étape en échec n'arrête pas la chaîne. Renvoie {nom: {"statut", "duree", "erreur"}}.
+    """
+    resultats = {}
+    for t in transformations:
+        if t.apres_ecriture != apres_ecriture:
+            continue
+        if not t.active:
+            resultats[t.nom] = {"statut": IGNOREE, "duree": 0.0, "erreur": "désactivée"}
+            continue
+        print(f"▶️ Étape {t.nom} ...")
+        debut = time.perf_counter()
+        try:
+            t.fonction(flux)
+            resultats[t.nom] = {"statut": OK, "duree": time.perf_counter() - debut, "erreur": None}
+        except Exception as e:
+            traceback.print_exc()
+            resultats[t.nom] = {"statut": ECHEC, "duree": time.perf_counter() - debut,
+                                "erreur": f"{type(e).__name__}: {e}"}
+    return resultats
+
+
+def afficher_rapport(resultats):
+    print("\n📊 Étapes de transformation :")
+    for nom, r in resultats.items():
+        icone = {OK: "✅", ECHEC: "❌"}.get(r["statut"], "⏭️")
+        ligne = f"  {icone} {nom:<14} {r['duree'] * 1000:>8.1f} ms  {r['statut']}"
+        if r["erreur"]:
+            ligne += f" ({r['erreur']})"
+        print(ligne)